@@ -0,0 +1,65 @@
+"""
+Read-only fast path for the book list endpoint.
+
+A book list row is ids, integers and strings, which `.values_list()`
+already returns in the form BookSerializer would produce. FastReadSerializer
+therefore zips the tuples straight into dicts, skipping model instantiation
+and DRF's per-field machinery. BookSerializer stays in charge of writes.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from rest_framework.response import Response
+
+
+# Fields whose database value is already their JSON representation
+PLAIN_FIELDS = (models.IntegerField, models.CharField, models.TextField, models.BooleanField)
+
+
+class FastReadSerializer:
+    """Render rows of `model` as dicts with the given `fields`, in order."""
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = list(fields)
+        for name in self.fields:
+            field = model._meta.get_field(name)
+            if field.is_relation:
+                # values_list('author') yields the raw key, like PrimaryKeyRelatedField
+                field = field.target_field
+            if not isinstance(field, PLAIN_FIELDS):
+                raise ImproperlyConfigured(
+                    f'{model.__name__}.{name} needs converting; use a ModelSerializer.'
+                )
+
+        names = tuple(self.fields)
+        self.render_row = lambda row: dict(zip(names, row))
+
+    def values(self, queryset):
+        """Narrow `queryset` to the tuples render_row expects."""
+        return queryset.values_list(*self.fields)
+
+    def render(self, rows):
+        render_row = self.render_row
+        return [render_row(row) for row in rows]
+
+    def serialize(self, queryset):
+        return self.render(self.values(queryset))
+
+
+class FastListMixin:
+    """
+    Serve the `list` action from a FastReadSerializer.
+
+    Views set `fast_serializer`; pagination, filtering, search and ordering
+    work unchanged because they only ever see the values_list queryset.
+    """
+    fast_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.fast_serializer.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.fast_serializer.render(page))
+
+        return Response(self.fast_serializer.render(queryset))
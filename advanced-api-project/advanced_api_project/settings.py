@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -68,6 +69,35 @@ DATABASES = {
 }
 
 
+# Cache
+# Shared by every worker: ETags and cached payloads are keyed on version
+# counters that any process may bump. Create the table with
+# `python manage.py createcachetable`.
+# The database backend culls itself down to MAX_ENTRIES on every write and
+# defaults to 300, which a few hundred distinct facet filters would churn
+# through. Set DJANGO_REDIS_URL to use Redis, which skips the row count on
+# each write.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {
+            # One facet result per filter combination, plus the version keys
+            'MAX_ENTRIES': 100_000,
+            # Cull a tenth of the entries when full rather than a third
+            'CULL_FREQUENCY': 10,
+        },
+    }
+}
+
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['DJANGO_REDIS_URL'],
+    }
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -108,4 +138,14 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        # orjson when installed, stdlib json otherwise
+        'advanced_api_project.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'advanced_api_project.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
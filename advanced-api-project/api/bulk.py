@@ -0,0 +1,237 @@
+"""
+Batch validation and writes for the bulk book endpoints.
+
+Every batch is validated as a whole: field types with DRF fields, years
+with the same rule BookSerializer uses, author existence with one query
+and (title, author) uniqueness with one query. Nothing is written unless
+every item is valid; errors are reported per item index.
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Author, Book, build_search_text
+from .serializers import check_publication_year
+from .signals import deferred_book_signals, sync_books_written
+
+
+MAX_BULK_ITEMS = 5000
+
+FIELDS = {
+    'title': serializers.CharField(max_length=255),
+    'publication_year': serializers.IntegerField(),
+    'author': serializers.IntegerField(),
+}
+
+
+class BulkError(Exception):
+    """Raised with a list of `{'index': i, 'errors': {...}}` entries."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _check_batch(items, key='items'):
+    if not isinstance(items, list):
+        raise BulkError([{'index': None, 'errors': {key: ['Expected a list.']}}])
+    if len(items) > MAX_BULK_ITEMS:
+        raise BulkError([{'index': None, 'errors': {
+            key: [f'At most {MAX_BULK_ITEMS} items per request.']
+        }}])
+
+
+def _coerce(item, partial, names=FIELDS):
+    """Type-check one item; returns (data, errors)."""
+    if not isinstance(item, dict):
+        return {}, {'non_field_errors': ['Expected an object.']}
+
+    data, errors = {}, {}
+    for name in names:
+        if name not in item:
+            if not partial:
+                errors[name] = ['This field is required.']
+            continue
+        try:
+            data[name] = FIELDS[name].run_validation(item[name])
+        except serializers.ValidationError as exc:
+            errors[name] = exc.detail
+    return data, errors
+
+
+def _check_year(data, item_errors, current_year):
+    if 'publication_year' in data:
+        try:
+            check_publication_year(data['publication_year'], current_year)
+        except serializers.ValidationError as exc:
+            item_errors['publication_year'] = exc.detail
+
+
+def clean_books(items, current_year, names=tuple(FIELDS)):
+    """
+    The per-item rules that need no database: types, lengths and years.
+
+    Pure, so importers can run it in worker processes. Returns
+    `(rows, errors)` keyed by item index.
+    """
+    rows, errors = {}, {}
+    for index, item in enumerate(items):
+        data, item_errors = _coerce(item, partial=False, names=names)
+        _check_year(data, item_errors, current_year)
+        if item_errors:
+            errors[index] = item_errors
+        else:
+            rows[index] = data
+    return rows, errors
+
+
+def check_books(rows, errors, exclude_ids=()):
+    """
+    Apply the cross-row rules to fully populated `rows` ({index: data}).
+    Runs at most two queries: authors, then (title, author) conflicts.
+    Returns `{author_id: name}` for the referenced authors.
+    """
+    author_ids = {data['author'] for data in rows.values()}
+    authors = dict(Author.objects.filter(pk__in=author_ids).values_list('pk', 'name'))
+
+    seen = {}
+    for index, data in rows.items():
+        if data['author'] not in authors:
+            errors.setdefault(index, {})['author'] = [
+                f'Invalid pk "{data["author"]}" - object does not exist.'
+            ]
+        pair = (data['title'], data['author'])
+        if pair in seen:
+            errors.setdefault(index, {})['non_field_errors'] = [
+                f'Duplicates item {seen[pair]} in this request.'
+            ]
+        seen.setdefault(pair, index)
+
+    existing = Book.objects.filter(
+        title__in={title for title, _ in seen}, author_id__in=author_ids
+    ).exclude(pk__in=exclude_ids).values_list('title', 'author_id')
+    for pair in set(existing) & seen.keys():
+        errors.setdefault(seen[pair], {})['non_field_errors'] = [
+            'The fields title, author must make a unique set.'
+        ]
+    return authors
+
+
+def _raise_if(errors):
+    if errors:
+        raise BulkError([
+            {'index': index, 'errors': item_errors}
+            for index, item_errors in sorted(errors.items())
+        ])
+
+
+def _write(func):
+    try:
+        with transaction.atomic(), deferred_book_signals():
+            return func()
+    except IntegrityError:
+        raise BulkError([{'index': None, 'errors': {
+            'non_field_errors': ['A concurrent write conflicted with this batch.']
+        }}])
+
+
+def validate_new_books(items):
+    """
+    Validate a list of book dicts without writing anything.
+
+    Returns `(rows, errors, authors)`: cleaned data for the valid items and
+    errors for the rest, both keyed by item index, plus `{author_id: name}`.
+    """
+    rows, errors = clean_books(items, timezone.now().year)
+    authors = check_books(rows, errors) if rows else {}
+    return {index: data for index, data in rows.items() if index not in errors}, errors, authors
+
+
+def build_books(rows, authors):
+    """Unsaved Book instances for validated rows, search_text included."""
+    return [
+        Book(
+            title=data['title'],
+            publication_year=data['publication_year'],
+            author_id=data['author'],
+            search_text=build_search_text(data['title'], authors[data['author']]),
+        )
+        for data in rows.values()
+    ]
+
+
+def bulk_create_books(items):
+    _check_batch(items)
+    rows, errors, authors = validate_new_books(items)
+    _raise_if(errors)
+    books = build_books(rows, authors)
+
+    def write():
+        created = Book.objects.bulk_create(books, batch_size=500)
+        sync_books_written({book.author_id for book in created}, saved=created)
+        return created
+
+    return _write(write)
+
+
+def bulk_update_books(items):
+    _check_batch(items)
+    ids = {item.get('id') for item in items if isinstance(item, dict)}
+    instances = Book.objects.in_bulk([pk for pk in ids if isinstance(pk, int)])
+
+    current_year = timezone.now().year
+    rows, errors, targets = {}, {}, {}
+    for index, item in enumerate(items):
+        data, item_errors = _coerce(item, partial=True)
+        _check_year(data, item_errors, current_year)
+        pk = item.get('id') if isinstance(item, dict) else None
+        book = instances.get(pk) if isinstance(pk, int) else None
+        if book is None and not item_errors:
+            item_errors = {'id': ['No book with this id.']}
+        if item_errors:
+            errors[index] = item_errors
+            continue
+        targets[index] = book
+        rows[index] = {
+            'title': data.get('title', book.title),
+            'publication_year': data.get('publication_year', book.publication_year),
+            'author': data.get('author', book.author_id),
+        }
+
+    authors = check_books(rows, errors, exclude_ids=instances.keys()) if rows else {}
+    _raise_if(errors)
+
+    previous_authors = {book.author_id for book in targets.values()}
+    for index, book in targets.items():
+        data = rows[index]
+        book.title = data['title']
+        book.publication_year = data['publication_year']
+        book.author_id = data['author']
+        book.search_text = build_search_text(book.title, authors[book.author_id])
+    books = list(targets.values())
+
+    def write():
+        Book.objects.bulk_update(
+            books, ['title', 'publication_year', 'author', 'search_text'], batch_size=500
+        )
+        sync_books_written(previous_authors | {book.author_id for book in books}, saved=books)
+        return books
+
+    return _write(write)
+
+
+def bulk_delete_books(ids):
+    _check_batch(ids, key='ids')
+    found = dict(Book.objects.filter(pk__in=[pk for pk in ids if isinstance(pk, int)])
+                 .values_list('pk', 'author_id'))
+    _raise_if({
+        index: {'id': ['No book with this id.']}
+        for index, pk in enumerate(ids) if not isinstance(pk, int) or pk not in found
+    })
+
+    def write():
+        Book.objects.filter(pk__in=found).delete()
+        sync_books_written(set(found.values()), deleted_ids=found.keys())
+        return len(found)
+
+    return _write(write)
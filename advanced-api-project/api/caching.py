@@ -0,0 +1,98 @@
+"""
+The books version and the ETags built on it.
+
+BOOKS_VERSION changes on every committed book write (see signals). Three
+things are keyed on it: the ETags that ConditionalGetMixin sends for book
+lists and details, the cached facet counts, and the suggest index that
+each process keeps in memory, which compares its own version with the
+current one to decide whether it is still up to date.
+
+The version lives in the cache, so every worker must share that cache
+(see check_shared_cache). A version is a random token rather than a
+number. A counter that was evicted therefore never comes back with a
+value that a stale ETag, facet entry or index still carries.
+"""
+import hashlib
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import quote_etag
+from rest_framework.response import Response
+
+
+BOOKS_VERSION = 'books'
+
+
+def get_version(name):
+    """Return the current value of the named version counter."""
+    return cache.get_or_set(f'version:{name}', lambda: uuid4().hex, timeout=None)
+
+
+def bump_version(name):
+    """Replace the named version counter and return its new value."""
+    version = uuid4().hex
+    cache.set(f'version:{name}', version, timeout=None)
+    return version
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Every worker's ETags, facets and suggest index follow one version."""
+    if settings.CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache':
+        return []
+    return [checks.Error(
+        'The default cache is local to each process, so workers never see '
+        'book writes made elsewhere and keep serving stale ETags, facet '
+        'counts and suggestions.',
+        hint='Use a shared backend such as DatabaseCache or RedisCache.',
+        id='api.E001',
+    )]
+
+
+class ConditionalGetMixin:
+    """
+    Send an ETag derived from `version_key` and answer 304 while it holds.
+
+    Books carry no modification timestamp, so there is no Last-Modified.
+    """
+    version_key = BOOKS_VERSION
+    cache_max_age = 60
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.conditional_response(
+            request, lambda: Response(self.get_serializer(instance).data), instance.pk,
+        )
+
+    def conditional_response(self, request, render, *parts):
+        user = request.user
+        parts = [
+            *parts,
+            request.get_full_path(),
+            user.pk if user.is_authenticated else 'anon',
+            get_version(self.version_key),
+        ]
+        etag = quote_etag(hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest())
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = render()
+        response['ETag'] = etag
+        if user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, max_age=self.cache_max_age)
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
@@ -0,0 +1,82 @@
+"""
+Faceted list responses.
+
+With `?facets=1` a list endpoint returns its usual results together with
+per-facet counts over the filtered queryset:
+
+    {"results": [...], "facets": {"publication_year": [{"value": 2020, "count": 2}]}}
+
+Each facet is one grouped query. Counts are cached under the normalized
+filter set and the books version counter, so any book write invalidates them.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .caching import get_version
+
+
+FACET_TIMEOUT = 60 * 5
+
+# Parameters that never change which rows are counted
+IGNORED_PARAMS = {'facets', 'ordering', 'format'}
+
+
+def normalize_filters(query_params):
+    """Stable representation of the filters in a QueryDict."""
+    return tuple(sorted(
+        (key, tuple(sorted(values)))
+        for key, values in query_params.lists()
+        if key not in IGNORED_PARAMS
+    ))
+
+
+class FacetedListMixin:
+    """
+    Add facet counts to `list` when the request asks for them.
+
+    `facet_fields` maps facet name to a `(value_lookup, label_lookup)`
+    pair; `label_lookup` may be None.
+    """
+    facet_fields = {}
+    facet_version_key = None
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if 'facets' not in request.query_params:
+            return response
+
+        response.data = {
+            'results': response.data,
+            'facets': self.get_facets(request),
+        }
+        return response
+
+    def get_facets(self, request):
+        filters = normalize_filters(request.query_params)
+        version = get_version(self.facet_version_key) if self.facet_version_key else None
+        digest = hashlib.md5(repr(filters).encode(), usedforsecurity=False).hexdigest()
+        key = f'facets:{type(self).__name__}:{version}:{digest}'
+
+        facets = cache.get(key)
+        if facets is None:
+            facets = self.compute_facets(self.filter_queryset(self.get_queryset()))
+            cache.set(key, facets, FACET_TIMEOUT)
+        return facets
+
+    def compute_facets(self, queryset):
+        queryset = queryset.order_by()
+        facets = {}
+        for name, (value_lookup, label_lookup) in self.facet_fields.items():
+            lookups = [value_lookup] + ([label_lookup] if label_lookup else [])
+            rows = queryset.values(*lookups).annotate(count=Count('pk')).order_by(value_lookup)
+            facets[name] = [
+                {
+                    'value': row[value_lookup],
+                    **({'label': row[label_lookup]} if label_lookup else {}),
+                    'count': row['count'],
+                }
+                for row in rows
+            ]
+        return facets
@@ -0,0 +1,46 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from advanced_api_project.renderers import ORJSONRenderer
+from api.models import Author, Book
+from api.serializers import BookSerializer
+
+
+def measure(func):
+    """Return (cpu_seconds, peak_bytes_allocated) for func."""
+    # Timed and traced separately: tracemalloc slows allocation-heavy code.
+    start = time.process_time()
+    func()
+    elapsed = time.process_time() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+class Command(BaseCommand):
+    help = 'Compares JSONRenderer and ORJSONRenderer on serialized books'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        # Unsaved instances with explicit ids serialize without touching the DB.
+        author = Author(id=1, name='Benchmark Author')
+        books = [
+            Book(id=i, title=f'Book {i}', publication_year=1900 + i % 120, author=author)
+            for i in range(options['count'])
+        ]
+        payload = BookSerializer(books, many=True).data
+
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            cpu, peak = measure(lambda: renderer.render(payload))
+            self.stdout.write(
+                f'{type(renderer).__name__:<16} cpu={cpu * 1000:8.1f}ms '
+                f'peak_alloc={peak / 1024:10.1f}KiB bytes={len(renderer.render(payload))}'
+            )
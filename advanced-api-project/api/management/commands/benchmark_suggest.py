@@ -0,0 +1,51 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.search import PrefixIndex
+
+
+class Command(BaseCommand):
+    help = 'Measures prefix-index suggest latency on a synthetic catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1_000_000)
+        parser.add_argument('--queries', type=int, default=2_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+            for _ in range(50_000)
+        ]
+
+        def text():
+            return ' '.join(rng.choices(vocabulary, k=rng.randint(3, 6)))
+
+        index = PrefixIndex()
+        start = time.perf_counter()
+        index.load((i, text()) for i in range(options['books']))
+        self.stdout.write(f'built {len(index)} books in {time.perf_counter() - start:.1f}s')
+
+        queries = []
+        for _ in range(options['queries']):
+            words = rng.sample(vocabulary, 2)
+            queries.append(rng.choice([words[0][:2], words[0][:4], f'{words[0]} {words[1][:2]}']))
+
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, 10)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+
+        def percentile(p):
+            return timings[min(len(timings) - 1, int(len(timings) * p))]
+
+        self.stdout.write(
+            f'suggest latency: p50={percentile(0.5):.3f}ms '
+            f'p99={percentile(0.99):.3f}ms max={timings[-1]:.3f}ms'
+        )
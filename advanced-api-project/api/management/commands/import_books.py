@@ -0,0 +1,178 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.bulk import build_books, check_books, clean_books
+from api.models import Author, Book
+from api.signals import deferred_book_signals, sync_books_written
+
+
+def read_rows(path, fmt):
+    """Stream dicts from a CSV file with a header row or from NDJSON."""
+    with open(path, newline='', encoding='utf-8') as source:
+        if fmt == 'csv':
+            yield from csv.DictReader(source)
+            return
+        for number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise CommandError(f'{path}:{number}: invalid JSON ({exc})')
+
+
+def author_name(row):
+    name = row.get('author') if isinstance(row, dict) else None
+    name = name.strip() if isinstance(name, str) else ''
+    return name if len(name) <= Author._meta.get_field('name').max_length else ''
+
+
+def validate_chunk(chunk, current_year):
+    """
+    The database-free checks for one chunk, safe to run in a worker process.
+    Returns `(rows, errors)` keyed by position in the chunk; rows carry the
+    author's name until the writer resolves it to an id.
+    """
+    rows, errors = clean_books(chunk, current_year, names=('title', 'publication_year'))
+    for index, row in enumerate(chunk):
+        name = author_name(row)
+        if not name:
+            errors.setdefault(index, {})['author'] = ['This field is required.']
+        elif index in rows:
+            rows[index]['author_name'] = name
+    return {index: data for index, data in rows.items() if index not in errors}, errors
+
+
+def validated_chunks(chunks, validate, workers):
+    """
+    Yield `(chunk size, validate(chunk))` in input order.
+
+    With more than one worker, chunks are validated in a process pool while
+    the caller writes earlier results; at most two chunks per worker are in
+    flight, so memory stays bounded however large the input is.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield len(chunk), validate(chunk)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=django.setup) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), executor.submit(validate, chunk)))
+            if len(pending) >= workers * 2:
+                size, future = pending.popleft()
+                yield size, future.result()
+        while pending:
+            size, future = pending.popleft()
+            yield size, future.result()
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports books from CSV or NDJSON rows with title, publication_year and '
+        'author (a name; missing authors are created). Rows are validated with '
+        'the bulk API rules and inserted in chunks, one transaction per chunk.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ndjson'],
+                            help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--checkpoint',
+                            help='Progress file, defaults to <path>.checkpoint')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip the rows recorded in the checkpoint file')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes validating chunks; this process does all writes')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        chunk_size = options['chunk_size']
+
+        done = self.load_checkpoint(checkpoint) if options['resume'] else 0
+        rows = islice(read_rows(path, fmt), done, None)
+        if done:
+            self.stdout.write(f'resuming after row {done}')
+
+        self.author_ids = dict(Author.objects.values_list('name', 'pk'))
+        imported = skipped = 0
+        start = time.perf_counter()
+
+        chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+        validate = partial(validate_chunk, current_year=timezone.now().year)
+        for size, (valid, errors) in validated_chunks(chunks, validate, options['workers']):
+            created = self.write_chunk(valid, errors)
+            for index, item_errors in sorted(errors.items()):
+                self.stderr.write(f'row {done + index + 1}: {json.dumps(item_errors)}')
+
+            done += size
+            imported += created
+            skipped += len(errors)
+            self.save_checkpoint(checkpoint, done)
+
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{done} rows read, {imported} imported, '
+                              f'{imported / elapsed:.0f} rows/sec')
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} books, skipped {skipped} rows in {elapsed:.1f}s '
+            f'({imported / elapsed if elapsed else 0:.0f} rows/sec)'
+        ))
+
+    def write_chunk(self, rows, errors):
+        """Resolve authors, run the database checks and insert; returns books created."""
+        with transaction.atomic(), deferred_book_signals():
+            self.create_authors({data['author_name'] for data in rows.values()})
+            for data in rows.values():
+                data['author'] = self.author_ids[data.pop('author_name')]
+            authors = check_books(rows, errors) if rows else {}
+            valid = {index: data for index, data in rows.items() if index not in errors}
+            books = Book.objects.bulk_create(build_books(valid, authors), batch_size=500)
+            sync_books_written({book.author_id for book in books}, saved=books)
+        return len(books)
+
+    def create_authors(self, names):
+        """Add the authors in `names` that are not in the name -> id map yet."""
+        names -= self.author_ids.keys()
+        if not names:
+            return
+        Author.objects.bulk_create(
+            [Author(name=name) for name in names], ignore_conflicts=True
+        )
+        self.author_ids.update(
+            Author.objects.filter(name__in=names).values_list('name', 'pk')
+        )
+
+    @staticmethod
+    def load_checkpoint(checkpoint):
+        try:
+            with open(checkpoint) as handle:
+                return json.load(handle)['rows']
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def save_checkpoint(checkpoint, rows):
+        # Written after the chunk commits; a crash in between re-reads that
+        # chunk on resume and its rows are then skipped as duplicates.
+        with open(f'{checkpoint}.tmp', 'w') as handle:
+            json.dump({'rows': rows}, handle)
+        os.replace(f'{checkpoint}.tmp', checkpoint)
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+
+def populate_summaries(apps, schema_editor):
+    Author = apps.get_model('api', 'Author')
+    AuthorSummary = apps.get_model('api', 'AuthorSummary')
+    stats = Author.objects.order_by().annotate(
+        book_count=Count('books'),
+        first_year=Min('books__publication_year'),
+        last_year=Max('books__publication_year'),
+    ).values_list('pk', 'book_count', 'first_year', 'last_year')
+    AuthorSummary.objects.bulk_create(
+        AuthorSummary(author_id=pk, book_count=count, first_publication_year=first,
+                      last_publication_year=last)
+        for pk, count, first, last in stats
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_author_name_alter_book_title'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorSummary',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='api.author')),
+                ('book_count', models.PositiveIntegerField(default=0)),
+                ('first_publication_year', models.IntegerField(blank=True, null=True)),
+                ('last_publication_year', models.IntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
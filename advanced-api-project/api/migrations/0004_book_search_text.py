@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:23
+
+from django.db import migrations, models
+
+
+def populate_search_text(apps, schema_editor):
+    Book = apps.get_model('api', 'Book')
+    books = list(Book.objects.select_related('author'))
+    for book in books:
+        book.search_text = f"{book.title} {book.author.name}".lower()
+    Book.objects.bulk_update(books, ['search_text'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_authorsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='search_text',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+    ]
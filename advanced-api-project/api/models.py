@@ -1,4 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Max, Min
+
+def build_search_text(title, author_name):
+    """Lowercased title and author name, searched instead of joining Author."""
+    return f"{title} {author_name}".lower()
+
 
 class Author(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -6,6 +12,23 @@ class Author(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            # Read by the post_save receivers in signals.py
+            self._renamed = self.pk is not None and not Author.objects.filter(
+                pk=self.pk, name=self.name
+            ).exists()
+
+            # Rewritten before saving so post_save receivers see the new text,
+            # and in the same transaction so a failed save leaves it alone.
+            if self._renamed:
+                books = list(self.books.only('pk', 'title'))
+                for book in books:
+                    book.search_text = build_search_text(book.title, self.name)
+                Book.objects.bulk_update(books, ['search_text'])
+
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['name']
 
@@ -18,10 +41,61 @@ class Book(models.Model):
         on_delete=models.CASCADE,
         related_name='books'
     )
+    # Denormalized "title author" text, maintained on save
+    search_text = models.CharField(max_length=512, blank=True, default='', editable=False)
 
     def __str__(self):
         return f"{self.title} ({self.publication_year})"
 
+    def save(self, *args, **kwargs):
+        self.search_text = build_search_text(self.title, self.author.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['title']
         unique_together = ['title', 'author']
+
+
+
+class AuthorSummary(models.Model):
+    """
+    Materialized per-author book statistics for the author catalog.
+    Refreshed by signals whenever a Book is saved or deleted.
+    """
+    author = models.OneToOneField(
+        Author,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='summary'
+    )
+    book_count = models.PositiveIntegerField(default=0)
+    first_publication_year = models.IntegerField(null=True, blank=True)
+    last_publication_year = models.IntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.author} ({self.book_count} books)"
+
+    @classmethod
+    def refresh(cls, author_ids=None):
+        """Recompute summaries for the given authors (all when None) in one aggregate query."""
+        authors = Author.objects.all()
+        if author_ids is not None:
+            authors = authors.filter(pk__in=author_ids)
+
+        stats = authors.order_by().annotate(
+            book_count=Count('books'),
+            first_publication_year=Min('books__publication_year'),
+            last_publication_year=Max('books__publication_year'),
+        ).values_list('pk', 'book_count', 'first_publication_year', 'last_publication_year')
+
+        cls.objects.bulk_create(
+            [cls(author_id=pk, book_count=count, first_publication_year=first,
+                 last_publication_year=last)
+             for pk, count, first, last in stats],
+            update_conflicts=True,
+            unique_fields=['author'],
+            update_fields=['book_count', 'first_publication_year', 'last_publication_year'],
+        )
@@ -0,0 +1,173 @@
+"""
+In-memory prefix index over Book.search_text for autocomplete.
+
+Tokens are kept in a sorted list so a prefix maps to a contiguous range
+found with two bisects; each token points at the set of book ids that
+contain it. The index is built lazily from the database on first use and
+then kept current by the Book/Author signals in this process, once their
+transactions commit. It remembers the books version it reflects, so a write
+made by another process is picked up by a rebuild on the next suggest.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from .caching import BOOKS_VERSION, get_version
+from .models import Book
+
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class PrefixIndex:
+    """Sorted-token prefix index mapping tokens to document ids."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.tokens = []        # sorted distinct tokens
+            self.postings = {}      # token -> set of ids
+            self.documents = {}     # id -> tuple of tokens
+
+    def __len__(self):
+        return len(self.documents)
+
+    def load(self, items):
+        """Bulk load `(id, text)` pairs, replacing the current contents."""
+        postings = {}
+        documents = {}
+        for doc_id, text in items:
+            doc_tokens = tuple(dict.fromkeys(tokenize(text)))
+            documents[doc_id] = doc_tokens
+            for token in doc_tokens:
+                postings.setdefault(token, set()).add(doc_id)
+
+        with self._lock:
+            self.tokens = sorted(postings)
+            self.postings = postings
+            self.documents = documents
+
+    def add(self, doc_id, text):
+        with self._lock:
+            self.remove(doc_id)
+            doc_tokens = tuple(dict.fromkeys(tokenize(text)))
+            self.documents[doc_id] = doc_tokens
+            for token in doc_tokens:
+                ids = self.postings.get(token)
+                if ids is None:
+                    ids = self.postings[token] = set()
+                    insort(self.tokens, token)
+                ids.add(doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            for token in self.documents.pop(doc_id, ()):
+                ids = self.postings[token]
+                ids.discard(doc_id)
+                if not ids:
+                    del self.postings[token]
+                    del self.tokens[bisect_left(self.tokens, token)]
+
+    def _prefix_range(self, prefix):
+        start = bisect_left(self.tokens, prefix)
+        # '\U0010ffff' sorts after every character a token can continue with
+        end = bisect_left(self.tokens, prefix + '\U0010ffff', start)
+        return start, end
+
+    def search(self, query, limit=10):
+        """
+        Ids of documents where every query term prefixes some token.
+
+        Scanning starts from the term with the fewest matching tokens;
+        an exact token match sorts first within its prefix range.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            ranges = sorted(
+                ((term, self._prefix_range(term)) for term in terms),
+                key=lambda item: item[1][1] - item[1][0],
+            )
+            (_, (start, end)), others = ranges[0], [term for term, _ in ranges[1:]]
+
+            results = []
+            seen = set()
+            for index in range(start, end):
+                for doc_id in self.postings[self.tokens[index]]:
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                    doc_tokens = self.documents[doc_id]
+                    if all(any(t.startswith(term) for t in doc_tokens) for term in others):
+                        results.append(doc_id)
+                        if len(results) == limit:
+                            return results
+            return results
+
+
+class BookSearchIndex(PrefixIndex):
+    """PrefixIndex over Book.search_text, built lazily from the database."""
+
+    built = False
+    version = None
+    built_at = 0.0
+    # Bounds how long a write this process missed can go unnoticed, should
+    # another process bump the version between apply()'s read and bump.
+    max_age = 60 * 15
+
+    def is_current(self, version):
+        return (
+            self.built and self.version == version
+            and time.monotonic() - self.built_at < self.max_age
+        )
+
+    def ensure_built(self):
+        version = get_version(BOOKS_VERSION)
+        if not self.is_current(version):
+            self.rebuild(version)
+
+    def rebuild(self, version=None):
+        # Read first: a write committed during the load bumps it again
+        if version is None:
+            version = get_version(BOOKS_VERSION)
+        rows = Book.objects.values_list('pk', 'search_text').iterator(chunk_size=10_000)
+        self.load(rows)
+        self.version = version
+        self.built_at = time.monotonic()
+        self.built = True
+
+    def apply(self, previous, version, saved=(), deleted_ids=()):
+        """
+        Apply committed writes that moved the books version from `previous`
+        to `version`; `saved` holds `(id, search_text)` pairs. An index that
+        had not seen `previous` is left for the next suggest to rebuild.
+        """
+        with self._lock:
+            if not self.built or self.version != previous:
+                return
+            for pk in deleted_ids:
+                self.remove(pk)
+            for pk, search_text in saved:
+                self.add(pk, search_text)
+            self.version = version
+
+    def clear(self):
+        super().clear()
+        self.built = False
+
+    def suggest(self, query, limit=10):
+        self.ensure_built()
+        return self.search(query, limit)
+
+
+book_index = BookSearchIndex()
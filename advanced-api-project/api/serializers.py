@@ -1,7 +1,27 @@
 from rest_framework import serializers
 from django.utils import timezone
+from advanced_api_project.fast_serializers import FastReadSerializer
 from .models import Author, Book
 
+def check_publication_year(value, current_year):
+    """
+    Publication year rules shared by BookSerializer and the bulk endpoints.
+    Raises serializers.ValidationError when the year is out of range.
+    """
+    if value > current_year:
+        raise serializers.ValidationError(
+            f"Publication year cannot be in the future. Current year is {current_year}."
+        )
+
+    # Books published before 1000 AD might be questionable
+    if value < 1000:
+        raise serializers.ValidationError(
+            "Publication year should be after 1000 AD."
+        )
+
+    return value
+
+
 class BookSerializer(serializers.ModelSerializer):
     """Serializer for the Book model with custom validation."""
     
@@ -12,21 +32,7 @@ class BookSerializer(serializers.ModelSerializer):
     
     def validate_publication_year(self, value):
         """Custom validation to ensure publication year is not in the future."""
-        current_year = timezone.now().year
-        
-        if value > current_year:
-            raise serializers.ValidationError(
-                f"Publication year cannot be in the future. Current year is {current_year}."
-            )
-        
-        # Optional: Add validation for reasonable past years
-        # Books published before 1000 AD might be questionable
-        if value < 1000:
-            raise serializers.ValidationError(
-                "Publication year should be after 1000 AD."
-            )
-        
-        return value
+        return check_publication_year(value, timezone.now().year)
     
     def validate(self, data):
         """Optional: Add additional cross-field validation."""
@@ -38,6 +44,10 @@ class BookSerializer(serializers.ModelSerializer):
         
         return data
 
+# Read-only fast path producing BookSerializer's output, for list endpoints
+book_list_serializer = FastReadSerializer(Book, ['id', 'title', 'publication_year', 'author'])
+
+
 class AuthorSerializer(serializers.ModelSerializer):
     """Serializer for the Author model with nested books."""
     
@@ -58,4 +68,21 @@ class AuthorSerializer(serializers.ModelSerializer):
         if len(value.strip()) < 2:
             raise serializers.ValidationError("Author name must be at least 2 characters long.")
         
-        return value.strip()
\ No newline at end of file
+        return value.strip()
+
+
+class AuthorCatalogSerializer(AuthorSerializer):
+    """AuthorSerializer plus the materialized book statistics."""
+
+    book_count = serializers.IntegerField(source='summary.book_count', read_only=True)
+    first_publication_year = serializers.IntegerField(
+        source='summary.first_publication_year', read_only=True
+    )
+    last_publication_year = serializers.IntegerField(
+        source='summary.last_publication_year', read_only=True
+    )
+
+    class Meta(AuthorSerializer.Meta):
+        fields = AuthorSerializer.Meta.fields + [
+            'book_count', 'first_publication_year', 'last_publication_year'
+        ]
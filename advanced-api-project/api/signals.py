@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import BOOKS_VERSION, bump_version, get_version
+from .models import Author, AuthorSummary, Book
+from .search import book_index
+
+
+# Set while a bulk operation runs; it syncs derived data once at the end.
+_deferred = ContextVar('book_signals_deferred', default=False)
+
+
+@contextmanager
+def deferred_book_signals():
+    """Skip the per-row Book receivers below for the duration of the block."""
+    token = _deferred.set(True)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+
+
+def sync_books_written(author_ids, saved=(), deleted_ids=()):
+    """
+    Bulk equivalent of the Book receivers, for writes that bypass them.
+    Summaries are refreshed in the caller's transaction; the version bump and
+    index update wait for it to commit.
+    """
+    AuthorSummary.refresh(set(author_ids))
+    saved = [(book.pk, book.search_text) for book in saved]
+    deleted_ids = list(deleted_ids)
+    transaction.on_commit(lambda: books_committed(saved, deleted_ids))
+
+
+def books_committed(saved=(), deleted_ids=()):
+    """
+    Bump the books version and apply committed writes to this process's
+    suggest index. `saved` yields `(id, search_text)` pairs and is only read
+    when the index needs them.
+    """
+    previous = get_version(BOOKS_VERSION)
+    version = bump_version(BOOKS_VERSION)
+    book_index.apply(previous, version, saved, deleted_ids)
+
+
+@receiver(post_save, sender=Book)
+def book_saved(sender, instance, **kwargs):
+    if _deferred.get():
+        return
+    saved = [(instance.pk, instance.search_text)]
+    transaction.on_commit(lambda: books_committed(saved=saved))
+
+
+@receiver(post_delete, sender=Book)
+def book_deleted(sender, instance, **kwargs):
+    if _deferred.get():
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: books_committed(deleted_ids=[pk]))
+
+
+@receiver(post_save, sender=Author)
+def create_author_summary(sender, instance, created, **kwargs):
+    if created:
+        AuthorSummary.objects.get_or_create(author=instance)
+
+
+@receiver(pre_save, sender=Book)
+def remember_previous_author(sender, instance, **kwargs):
+    """Moving a book to another author must refresh both summaries."""
+    if _deferred.get():
+        return
+    instance._previous_author_id = None
+    if instance.pk is not None:
+        instance._previous_author_id = (
+            Book.objects.filter(pk=instance.pk).values_list('author_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Book)
+def refresh_summary_on_save(sender, instance, **kwargs):
+    if _deferred.get():
+        return
+    author_ids = {instance.author_id, getattr(instance, '_previous_author_id', None)}
+    AuthorSummary.refresh(author_ids - {None})
+
+
+@receiver(post_delete, sender=Book)
+def refresh_summary_on_delete(sender, instance, origin=None, **kwargs):
+    # When the author itself is being deleted its summary goes with it.
+    if _deferred.get() or isinstance(origin, Author):
+        return
+    AuthorSummary.refresh([instance.author_id])
+
+
+@receiver(post_save, sender=Author)
+def author_renamed(sender, instance, created, **kwargs):
+    """
+    A rename rewrites search_text with bulk_update, which sends no signals,
+    and changes the author name in book payloads and facets.
+    """
+    if created or not getattr(instance, '_renamed', False):
+        return
+    books = Book.objects.filter(author=instance.pk).values_list('pk', 'search_text')
+    transaction.on_commit(lambda: books_committed(saved=books))
@@ -2,11 +2,29 @@
 Unit tests for the Book API endpoints.
 Tests CRUD operations, filtering, searching, ordering, and permissions.
 """
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import Author, Book
+from .bulk import bulk_create_books
+from .caching import BOOKS_VERSION, bump_version
+from .models import Author, AuthorSummary, Book
+from .search import book_index
+from .serializers import BookSerializer, book_list_serializer
+
+
+# Query counts below are the app's own; the shared cache backend would add its
+# queries to them.
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
 
 
 class BookAPITestCase(TestCase):
@@ -363,4 +381,405 @@ class PermissionTests(TestCase):
                     response.status_code, 
                     status.HTTP_401_UNAUTHORIZED,
                     f"{endpoint} should not require authentication"
-                )
\ No newline at end of file
+                )
+
+class ConditionalGetTests(TestCase):
+    """Tests for ETag handling on the read-only book endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = Author.objects.create(name="Test Author")
+        self.book = Book.objects.create(
+            title="Test Book",
+            publication_year=2020,
+            author=self.author
+        )
+
+    def test_unchanged_list_returns_304(self):
+        """A matching If-None-Match short-circuits the list endpoint."""
+        etag = self.client.get('/api/books/')['ETag']
+        response = self.client.get('/api/books/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_write_invalidates_etag(self):
+        """Saving any book bumps the version and changes the ETag."""
+        etag = self.client.get(f'/api/books/{self.book.id}/')['ETag']
+        self.book.title = "Renamed Book"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.save()
+
+        response = self.client.get(f'/api/books/{self.book.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], "Renamed Book")
+
+    def test_filters_get_distinct_etags(self):
+        """Different query strings never share a validator."""
+        first = self.client.get('/api/books/?publication_year=2020')['ETag']
+        second = self.client.get('/api/books/?publication_year=2021')['ETag']
+
+        self.assertNotEqual(first, second)
+
+
+class FastListSerializerTests(TestCase):
+    """Differential test for the BookListView fast path."""
+
+    def setUp(self):
+        author = Author.objects.create(name="Test Author")
+        for year in (1999, 2005, 2020):
+            Book.objects.create(title=f"Book {year}", publication_year=year, author=author)
+
+    def test_matches_model_serializer(self):
+        """Fast path output is identical to BookSerializer(many=True)."""
+        queryset = Book.objects.all()
+        self.assertEqual(
+            book_list_serializer.serialize(queryset),
+            [dict(item) for item in BookSerializer(queryset, many=True).data]
+        )
+
+    def test_export_streams_filtered_ndjson(self):
+        """GET /api/books/export/ streams one JSON object per matching book."""
+        response = self.client.get('/api/books/export/?publication_year=2005')
+        lines = b''.join(response.streaming_content).splitlines()
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['title'], "Book 2005")
+
+
+class AuthorCatalogTests(TestCase):
+    """Tests for the author catalog and its materialized summaries."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author1 = Author.objects.create(name="First Author")
+        self.author2 = Author.objects.create(name="Second Author")
+        self.book = Book.objects.create(title="Early", publication_year=1990, author=self.author1)
+        Book.objects.create(title="Late", publication_year=2010, author=self.author1)
+
+    def test_catalog_includes_statistics(self):
+        """Each author carries nested books plus count and year range."""
+        response = self.client.get('/api/authors/catalog/')
+        first, second = response.data
+
+        self.assertEqual(len(first['books']), 2)
+        self.assertEqual(first['book_count'], 2)
+        self.assertEqual((first['first_publication_year'], first['last_publication_year']), (1990, 2010))
+        self.assertEqual(second['book_count'], 0)
+        self.assertIsNone(second['first_publication_year'])
+
+    def test_catalog_query_count_is_fixed(self):
+        """More authors must not mean more queries."""
+        with self.assertNumQueries(2):
+            self.client.get('/api/authors/catalog/')
+
+        for i in range(10):
+            author = Author.objects.create(name=f"Extra Author {i}")
+            Book.objects.create(title=f"Extra {i}", publication_year=2000, author=author)
+
+        with self.assertNumQueries(2):
+            self.client.get('/api/authors/catalog/')
+
+    def test_summary_follows_moves_and_deletes(self):
+        """Reassigning or deleting a book refreshes the affected summaries."""
+        self.book.author = self.author2
+        self.book.save()
+        self.assertEqual(AuthorSummary.objects.get(author=self.author1).book_count, 1)
+        self.assertEqual(AuthorSummary.objects.get(author=self.author2).first_publication_year, 1990)
+
+        self.book.delete()
+        self.assertEqual(AuthorSummary.objects.get(author=self.author2).book_count, 0)
+
+        self.author1.delete()
+        self.assertFalse(AuthorSummary.objects.filter(author_id=self.author1.id).exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FacetTests(TestCase):
+    """Tests for ?facets=1 on the book list."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author1 = Author.objects.create(name="Ann")
+        self.author2 = Author.objects.create(name="Ben")
+        Book.objects.create(title="Alpha", publication_year=2020, author=self.author1)
+        Book.objects.create(title="Beta", publication_year=2020, author=self.author2)
+        Book.objects.create(title="Gamma", publication_year=2021, author=self.author1)
+
+    def test_plain_list_is_unchanged(self):
+        """Without the flag the response is still a bare list."""
+        response = self.client.get('/api/books/')
+        self.assertIsInstance(response.data, list)
+
+    def test_facets_follow_filters(self):
+        """Facet counts are computed over the filtered queryset."""
+        response = self.client.get(f'/api/books/?facets=1&author={self.author1.id}')
+
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['facets']['publication_year'], [
+            {'value': 2020, 'count': 1},
+            {'value': 2021, 'count': 1},
+        ])
+        self.assertEqual(response.data['facets']['author'], [
+            {'value': self.author1.id, 'label': "Ann", 'count': 2},
+        ])
+
+    def test_facets_cached_until_book_write(self):
+        """Warm facet requests skip the grouped queries; writes invalidate them."""
+        self.client.get('/api/books/?facets=1')
+        with self.assertNumQueries(1):
+            self.client.get('/api/books/?facets=1&ordering=-title')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title="Delta", publication_year=2022, author=self.author2)
+        response = self.client.get('/api/books/?facets=1')
+        years = [facet['value'] for facet in response.data['facets']['publication_year']]
+        self.assertIn(2022, years)
+
+    def test_author_rename_refreshes_facets_and_etags(self):
+        """Book payloads, searches and facet labels show the author's name."""
+        url = '/api/books/?facets=1&search=ann'
+        etag = self.client.get(url)['ETag']
+        self.author1.name = "Anna"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author1.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        labels = [facet['label'] for facet in response.data['facets']['author']]
+        self.assertIn("Anna", labels)
+
+
+class BookSuggestTests(TestCase):
+    """Tests for search_text and the /api/books/suggest/ prefix index."""
+
+    def setUp(self):
+        book_index.clear()
+        self.client = APIClient()
+        self.author = Author.objects.create(name="Guido Rossum")
+        self.book = Book.objects.create(title="Python Tricks", publication_year=2017, author=self.author)
+        Book.objects.create(title="Pythonic Patterns", publication_year=2019, author=self.author)
+
+    def suggest(self, query):
+        response = self.client.get('/api/books/suggest/', {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['title'] for item in response.data]
+
+    def test_search_text_is_maintained(self):
+        """search_text is denormalized on save and on author rename."""
+        self.assertEqual(self.book.search_text, "python tricks guido rossum")
+        self.author.name = "Guido van Rossum"
+        self.author.save()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.search_text, "python tricks guido van rossum")
+
+    def test_prefix_suggestions(self):
+        """Exact tokens rank first and every term must prefix some token."""
+        self.assertEqual(self.suggest('python'), ["Python Tricks", "Pythonic Patterns"])
+        self.assertEqual(self.suggest('pyth pat'), ["Pythonic Patterns"])
+        self.assertEqual(self.suggest('guid'), ["Python Tricks", "Pythonic Patterns"])
+        self.assertEqual(self.suggest(''), [])
+
+    def test_index_updates_incrementally(self):
+        """Writes after the first build are applied without a rebuild."""
+        self.suggest('python')
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title="Zen of Python", publication_year=2004, author=self.author)
+            self.book.delete()
+            self.author.name = "Tim Peters"
+            self.author.save()
+
+        with patch.object(book_index, 'rebuild') as rebuild:
+            self.assertEqual(self.suggest('zen'), ["Zen of Python"])
+            self.assertEqual(self.suggest('tricks'), [])
+            self.assertEqual(len(self.suggest('tim')), 2)
+        rebuild.assert_not_called()
+
+    def test_uncommitted_writes_stay_out_of_the_index(self):
+        """Rolled back writes never reach the index."""
+        self.suggest('python')
+        with self.captureOnCommitCallbacks() as callbacks:
+            Book.objects.create(title="Zen of Python", publication_year=2004, author=self.author)
+        self.assertEqual(self.suggest('zen'), [])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_writes_from_other_processes_rebuild_the_index(self):
+        """A books version this process did not bump makes the index rebuild."""
+        self.suggest('python')
+        # What this process sees of a write committed by another one
+        Book.objects.bulk_create([Book(title="Zen of Python", publication_year=2004,
+                                       author=self.author, search_text="zen of python")])
+        bump_version(BOOKS_VERSION)
+
+        self.assertEqual(self.suggest('zen'), ["Zen of Python"])
+
+    def test_failed_rename_keeps_search_text(self):
+        """The search_text rewrite rolls back with a rename that fails."""
+        Author.objects.create(name="Tim Peters")
+        self.author.name = "Tim Peters"
+        with self.assertRaises(IntegrityError):
+            self.author.save()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.search_text, "python tricks guido rossum")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BookBulkTests(TestCase):
+    """Tests for POST/PATCH/DELETE /api/books/bulk/."""
+
+    def setUp(self):
+        cache.clear()
+        book_index.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='bulk', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.author = Author.objects.create(name="Ursula Le Guin")
+        self.other = Author.objects.create(name="Iain Banks")
+        self.book = Book.objects.create(title="The Dispossessed", publication_year=1974, author=self.author)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post('/api/books/bulk/', [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_create_batch_in_constant_queries(self):
+        """Validation and insert cost the same number of queries for any batch size."""
+        items = [
+            {'title': f"Culture {i}", 'publication_year': 1987 + i % 30, 'author': self.other.pk}
+            for i in range(200)
+        ]
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/books/bulk/', items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 200)
+
+        summary = AuthorSummary.objects.get(author=self.other)
+        self.assertEqual(summary.book_count, 200)
+        self.assertEqual(Book.objects.get(title="Culture 3").search_text, "culture 3 iain banks")
+
+    def test_errors_are_reported_per_item(self):
+        """One bad item rejects the batch and every error carries its index."""
+        items = [
+            {'title': "Lavinia", 'publication_year': 2008, 'author': self.author.pk},
+            {'title': "The Dispossessed", 'publication_year': 1974, 'author': self.author.pk},
+            {'title': "Future Book", 'publication_year': 9999, 'author': self.author.pk},
+            {'title': "Lavinia", 'publication_year': 2008, 'author': self.author.pk},
+            {'title': "Orphan", 'publication_year': 2000, 'author': 0},
+            {'publication_year': 2000},
+        ]
+        response = self.client.post('/api/books/bulk/', items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {entry['index']: entry['errors'] for entry in response.data['errors']}
+        self.assertEqual(sorted(errors), [1, 2, 3, 4, 5])
+        self.assertIn('non_field_errors', errors[1])
+        self.assertIn('publication_year', errors[2])
+        self.assertIn('non_field_errors', errors[3])
+        self.assertIn('author', errors[4])
+        self.assertEqual(set(errors[5]), {'title', 'author'})
+        self.assertFalse(Book.objects.filter(title="Lavinia").exists())
+
+    def test_update_batch(self):
+        """Partial updates move books between authors and refresh both summaries."""
+        response = self.client.patch('/api/books/bulk/', [
+            {'id': self.book.pk, 'author': self.other.pk, 'title': "The Dispossessed (2nd ed.)"},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.author, self.other)
+        self.assertEqual(self.book.publication_year, 1974)
+        self.assertEqual(self.book.search_text, "the dispossessed (2nd ed.) iain banks")
+        self.assertEqual(AuthorSummary.objects.get(author=self.author).book_count, 0)
+        self.assertEqual(AuthorSummary.objects.get(author=self.other).book_count, 1)
+
+        response = self.client.patch('/api/books/bulk/', [{'id': 0, 'title': "Nope"}], format='json')
+        self.assertEqual(response.data['errors'][0]['errors'], {'id': ['No book with this id.']})
+
+    def test_delete_batch(self):
+        """Deletes drop books from the index and bump the list version."""
+        self.assertEqual(book_index.suggest('dispossessed'), [self.book.pk])
+        etag = self.client.get('/api/books/')['ETag']
+
+        response = self.client.delete('/api/books/bulk/', {'ids': [self.book.pk, 0]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete('/api/books/bulk/', {'ids': [self.book.pk]}, format='json')
+        self.assertEqual(response.data, {'deleted': 1})
+        self.assertFalse(Book.objects.exists())
+        self.assertEqual(book_index.suggest('dispossessed'), [])
+        self.assertNotEqual(self.client.get('/api/books/')['ETag'], etag)
+
+    def test_rolled_back_batch_leaves_index_and_version(self):
+        """Nothing derived from a batch is touched until it commits."""
+        self.assertEqual(book_index.suggest('lavinia'), [])
+        etag = self.client.get('/api/books/')['ETag']
+        items = [{'title': "Lavinia", 'publication_year': 2008, 'author': self.author.pk}]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                bulk_create_books(items)
+                raise RuntimeError('rolled back')
+
+        self.assertEqual(book_index.suggest('lavinia'), [])
+        self.assertEqual(self.client.get('/api/books/', HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+
+class ImportBooksCommandTests(TestCase):
+    """Tests for the import_books management command."""
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Ursula Le Guin")
+        Book.objects.create(title="The Dispossessed", publication_year=1974, author=self.author)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+        return path
+
+    def run_import(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_books', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import_creates_authors_and_skips_invalid_rows(self):
+        path = self.write('books.csv', (
+            "title,publication_year,author\n"
+            "Lavinia,2008,Ursula Le Guin\n"
+            "Excession,1996,Iain Banks\n"
+            "The Dispossessed,1974,Ursula Le Guin\n"
+            "Someday,9999,Iain Banks\n"
+        ))
+        out, err = self.run_import(path, '--chunk-size', '2', '--workers', '2')
+
+        self.assertIn('Imported 2 books, skipped 2 rows', out)
+        self.assertIn('rows/sec', out)
+        self.assertIn('row 3:', err)
+        self.assertIn('row 4:', err)
+        banks = Author.objects.get(name="Iain Banks")
+        self.assertEqual(Book.objects.get(title="Excession").author, banks)
+        self.assertEqual(AuthorSummary.objects.get(author=banks).book_count, 1)
+        self.assertEqual(Author.objects.count(), 2)
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_ndjson_import_resumes_from_checkpoint(self):
+        lines = [
+            {'title': f"Earthsea {i}", 'publication_year': 1968 + i, 'author': "Ursula Le Guin"}
+            for i in range(5)
+        ]
+        path = self.write('books.ndjson', '\n'.join(json.dumps(line) for line in lines))
+        with open(f'{path}.checkpoint', 'w') as handle:
+            json.dump({'rows': 3}, handle)
+
+        out, _ = self.run_import(path, '--resume')
+        self.assertIn('resuming after row 3', out)
+        self.assertEqual(
+            sorted(Book.objects.filter(title__startswith="Earthsea").values_list('title', flat=True)),
+            ["Earthsea 3", "Earthsea 4"],
+        )
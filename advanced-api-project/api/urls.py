@@ -4,8 +4,14 @@ from . import views
 urlpatterns = [
     # Book endpoints
     path('books/', views.BookListView.as_view(), name='book-list'),
+    path('books/suggest/', views.BookSuggestView.as_view(), name='book-suggest'),
+    path('books/export/', views.BookExportView.as_view(), name='book-export'),
+    path('books/bulk/', views.BookBulkView.as_view(), name='book-bulk'),
     path('books/create/', views.BookCreateView.as_view(), name='book-create'),
     path('books/<int:pk>/', views.BookDetailView.as_view(), name='book-detail'),
     path('books/<int:pk>/update/', views.BookUpdateView.as_view(), name='book-update'),
     path('books/<int:pk>/delete/', views.BookDeleteView.as_view(), name='book-delete'),
+
+    # Author endpoints
+    path('authors/catalog/', views.AuthorCatalogView.as_view(), name='author-catalog'),
 ]
\ No newline at end of file
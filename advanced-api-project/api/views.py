@@ -1,16 +1,24 @@
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, AllowAny
-from .models import Book
-from .serializers import BookSerializer
+from .models import Author, Book
+from .serializers import AuthorCatalogSerializer, BookSerializer, book_list_serializer
+from .bulk import BulkError, bulk_create_books, bulk_delete_books, bulk_update_books
+from .caching import BOOKS_VERSION, ConditionalGetMixin
+from .facets import FacetedListMixin
+from .search import book_index
+from advanced_api_project.exports import NDJSONExportMixin
+from advanced_api_project.fast_serializers import FastListMixin
 
 from django_filters import rest_framework
 from rest_framework import filters
 
 
-class BookListView(generics.ListAPIView):
+class BookListView(ConditionalGetMixin, FacetedListMixin, FastListMixin, generics.ListAPIView):
 
   """
     DetailView for retrieving a single book by ID.
@@ -18,6 +26,7 @@ class BookListView(generics.ListAPIView):
     """
   queryset = Book.objects.all()
   serializer_class = BookSerializer
+  fast_serializer = book_list_serializer
   permission_classes = [AllowAny]
   
   # Add filtering capabilities
@@ -25,16 +34,55 @@ class BookListView(generics.ListAPIView):
   filter_backends = [rest_framework.DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
   filterset_fields = ['publication_year', 'author']
   
-  # Add search capabilities
-  search_fields = ['title', 'author__name']
+  # Add search capabilities (search_text holds "title author_name", no join needed)
+  search_fields = ['search_text']
 
     # Add search and ordering capabilities
 
   ordering_fields = ['title', 'publication_year']
   ordering = ['title']
 
+  # Conditional GET: answer 304 without re-serializing unchanged lists
+  version_key = BOOKS_VERSION
 
-class BookDetailView(generics.RetrieveAPIView):
+  # ?facets=1 adds per-year and per-author counts for the filtered books
+  facet_fields = {
+      'publication_year': ('publication_year', None),
+      'author': ('author', 'author__name'),
+  }
+  facet_version_key = BOOKS_VERSION
+
+
+class BookExportView(NDJSONExportMixin, BookListView):
+  """
+    ExportView streaming every matching book as NDJSON.
+    Accepts the same filter, search and ordering parameters as BookListView.
+    """
+  export_filename = 'books.ndjson'
+
+
+class BookSuggestView(APIView):
+  """
+    SuggestView for autocomplete: GET /api/books/suggest/?q=<prefix>.
+    Answers from the in-memory prefix index and fetches only the hits.
+    """
+  permission_classes = [AllowAny]
+  max_limit = 50
+
+  def get(self, request):
+      query = request.query_params.get('q', '')
+      try:
+          limit = max(1, min(int(request.query_params.get('limit', 10)), self.max_limit))
+      except ValueError:
+          limit = 10
+
+      ids = book_index.suggest(query, limit)
+      rows = Book.objects.filter(pk__in=ids).values_list('pk', 'title', 'author__name')
+      by_id = {pk: {'id': pk, 'title': title, 'author': name} for pk, title, name in rows}
+      return Response([by_id[pk] for pk in ids if pk in by_id])
+
+
+class BookDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """
     DetailView for retrieving a single book by ID.
     Provides a read-only endpoint to retrieve a specific Book instance.
@@ -42,6 +90,7 @@ class BookDetailView(generics.RetrieveAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [AllowAny]
+    version_key = BOOKS_VERSION
 
 
 
@@ -76,4 +125,49 @@ class BookDeleteView(generics.DestroyAPIView):
     """
   queryset = Book.objects.all()
   serializer_class = BookSerializer
-  permission_classes = [IsAuthenticated]
\ No newline at end of file
+  permission_classes = [IsAuthenticated]
+
+
+class BookBulkView(APIView):
+  """
+    BulkView for writing many books in one request.
+    POST creates a list of books, PATCH updates a list of {"id": ..., <fields>}
+    and DELETE removes {"ids": [...]}. A batch is validated as a whole and
+    written in one transaction; any invalid item rejects the whole batch
+    with {"errors": [{"index": i, "errors": {...}}]}.
+    """
+  permission_classes = [IsAuthenticated]
+
+  def post(self, request):
+      return self._run(bulk_create_books, request.data,
+                       lambda books: BookSerializer(books, many=True).data,
+                       status.HTTP_201_CREATED)
+
+  def patch(self, request):
+      return self._run(bulk_update_books, request.data,
+                       lambda books: BookSerializer(books, many=True).data,
+                       status.HTTP_200_OK)
+
+  def delete(self, request):
+      ids = request.data.get('ids') if isinstance(request.data, dict) else None
+      return self._run(bulk_delete_books, ids,
+                       lambda deleted: {'deleted': deleted},
+                       status.HTTP_200_OK)
+
+  def _run(self, operation, payload, represent, success_status):
+      try:
+          result = operation(payload)
+      except BulkError as exc:
+          return Response({'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+      return Response(represent(result), status=success_status)
+
+
+class AuthorCatalogView(generics.ListAPIView):
+  """
+    CatalogView listing authors with their books and book statistics.
+    Renders in two queries regardless of the number of authors:
+    authors joined with their materialized summary, then all books.
+    """
+  queryset = Author.objects.select_related('summary').prefetch_related('books')
+  serializer_class = AuthorCatalogSerializer
+  permission_classes = [AllowAny]
@@ -166,6 +166,44 @@ DATABASES = {
     }
 }
 
+# Cache
+# Shared by every worker: search results and pages are keyed on version
+# counters that any process (web workers, the admin) may bump. Create the
+# table with `python manage.py createcachetable`.
+# The database backend culls itself down to MAX_ENTRIES on every write and
+# defaults to 300, fewer than the distinct searches of a busy day. Set
+# DJANGO_REDIS_URL to use Redis, which skips the row count on each write.
+#
+# Permission sets are checked on nearly every request, so they stay in each
+# process. Their keys carry the user's permissions_version, which is read
+# with the user row, so a change is seen everywhere once it commits.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {
+            # Search results and book list fragments
+            'MAX_ENTRIES': 100_000,
+            # Cull a tenth of the entries when full rather than a third
+            'CULL_FREQUENCY': 10,
+        },
+    },
+    'permissions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'permissions',
+        'OPTIONS': {
+            # One set per recently active user and superuser flag
+            'MAX_ENTRIES': 10_000,
+        },
+    },
+}
+
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['DJANGO_REDIS_URL'],
+    }
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -187,6 +225,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom user model
 AUTH_USER_MODEL = 'bookshelf.CustomUser'
 
+# Permission sets are cached across requests (see bookshelf/backends.py)
+AUTHENTICATION_BACKENDS = ['bookshelf.backends.CachedPermissionsBackend']
+
 # ============ EMAIL CONFIGURATION ============
 
 if DEBUG:
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class BookshelfConfig(AppConfig):
     name = 'bookshelf'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,61 @@
+# bookshelf/backends.py
+"""
+Authentication backend with permission sets cached across requests.
+
+ModelBackend caches permissions on the user object only, so every request
+(which loads a fresh user) pays two queries for user and group permissions
+on its first permission check. CachedPermissionsBackend keeps each user's
+permission set in the process-local `permissions` cache, keyed by the
+user's `permissions_version` column. That column comes with the user row
+every request loads anyway, so a warm check runs no query at all, and
+every process sees a change as soon as it commits.
+
+invalidate_permissions() replaces the version of the users a change
+affects, in the same transaction as the change. Changes to group
+membership, group permissions and user permissions call it
+(see bookshelf.signals), and create_groups goes through the same signals.
+
+The user row is loaded together with the user's profile, so role checks
+in relationship_app need no query of their own either.
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+from .models import CustomUser, new_version
+
+
+PERMISSIONS_CACHE = 'permissions'
+PERMISSIONS_TIMEOUT = 60 * 60
+
+
+def invalidate_permissions(users):
+    """Make the cached permission sets of the `users` queryset stale."""
+    users.update(permissions_version=new_version())
+
+
+class CachedPermissionsBackend(ModelBackend):
+    """ModelBackend whose permission sets survive the request."""
+
+    def get_user(self, user_id):
+        try:
+            user = CustomUser._default_manager.select_related('userprofile').get(pk=user_id)
+        except CustomUser.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            cache = caches[PERMISSIONS_CACHE]
+            # Superusers hold every permission, so the flag is part of the key.
+            key = (
+                f'permissions:{user_obj.pk}:{int(user_obj.is_superuser)}:'
+                f'{user_obj.permissions_version}'
+            )
+            permissions = cache.get(key)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, permissions, PERMISSIONS_TIMEOUT)
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
@@ -1,10 +1,52 @@
 # bookshelf/forms.py
 from django import forms
 from django.core.exceptions import ValidationError
-from django.utils.html import strip_tags
+from django.db import IntegrityError, transaction
 from django.utils.translation import gettext_lazy as _
-import re
+from .isbn import ISBN_RE, equivalents, isbn_registry, strip_separators, to_isbn13
 from .models import Book, Library, CustomUser
+from .sanitization import (
+    ATTACK_PATTERNS_RE, AUTHOR_NAME_RE, DIGIT_RE, EMAIL_RE, IP_RANGE_RE,
+    LOWERCASE_RE, UNSAFE_SEARCH_CHARS_RE, UNSAFE_TEXT_CHARS_RE, UPPERCASE_RE,
+    clean_text, strip_html,
+)
+
+
+# Pure cleaning functions behind BookForm, also used by bulk imports
+
+def clean_book_title(title):
+    """Strip HTML tags and excess whitespace from a title and check its length."""
+    title = clean_text(title)
+    if len(title) < 2:
+        raise ValidationError(_('Title must be at least 2 characters long.'))
+    if len(title) > 200:
+        raise ValidationError(_('Title cannot exceed 200 characters.'))
+    return title
+
+
+def clean_book_author(author):
+    """Strip HTML tags and excess whitespace from an author name and check it."""
+    author = clean_text(author)
+    # Allow letters, spaces, hyphens, apostrophes
+    if not AUTHOR_NAME_RE.match(author):
+        raise ValidationError(_('Author name contains invalid characters.'))
+    if len(author) < 2:
+        raise ValidationError(_('Author name must be at least 2 characters long.'))
+    if len(author) > 100:
+        raise ValidationError(_('Author name cannot exceed 100 characters.'))
+    return author
+
+
+def normalize_isbn(isbn):
+    """Validate an ISBN-10 or ISBN-13 and return it as canonical ISBN-13."""
+    isbn = strip_separators(isbn)
+    if not ISBN_RE.match(isbn):
+        raise ValidationError(_('ISBN must be 10 or 13 digits.'))
+    canonical = to_isbn13(isbn)
+    if canonical is None:
+        raise ValidationError(_('ISBN check digit is invalid.'))
+    return canonical
+
 
 class BookForm(forms.ModelForm):
     class Meta:
@@ -38,63 +80,64 @@ class BookForm(forms.ModelForm):
     
     def clean_title(self):
         """Sanitize and validate book title."""
-        title = self.cleaned_data.get('title', '')
-        
-        # Strip HTML tags
-        title = strip_tags(title)
-        
-        # Remove excessive whitespace
-        title = ' '.join(title.split())
-        
-        # Validate length
-        if len(title) < 2:
-            raise ValidationError(_('Title must be at least 2 characters long.'))
-        if len(title) > 200:
-            raise ValidationError(_('Title cannot exceed 200 characters.'))
-        
-        return title
+        return clean_book_title(self.cleaned_data.get('title', ''))
     
     def clean_author(self):
         """Sanitize and validate author name."""
-        author = self.cleaned_data.get('author', '')
-        
-        # Strip HTML tags
-        author = strip_tags(author)
-        
-        # Remove excessive whitespace
-        author = ' '.join(author.split())
-        
-        # Validate format (allow letters, spaces, hyphens, apostrophes)
-        if not re.match(r'^[A-Za-z\s\-\'\.]+$', author):
-            raise ValidationError(_('Author name contains invalid characters.'))
-        
-        if len(author) < 2:
-            raise ValidationError(_('Author name must be at least 2 characters long.'))
-        if len(author) > 100:
-            raise ValidationError(_('Author name cannot exceed 100 characters.'))
-        
-        return author
+        return clean_book_author(self.cleaned_data.get('author', ''))
     
     def clean_isbn(self):
-        """Validate ISBN format."""
-        isbn = self.cleaned_data.get('isbn', '')
-        
-        # Remove any hyphens or spaces
-        isbn = re.sub(r'[-\s]', '', isbn)
-        
-        # Validate length and format
-        if not re.match(r'^\d{10,13}$', isbn):
-            raise ValidationError(_('ISBN must be 10-13 digits.'))
+        """Validate ISBN format and check it is not taken by another book."""
+        isbn = normalize_isbn(self.cleaned_data.get('isbn', ''))
         
-        # Check for duplicate ISBN (excluding current instance)
-        if self.instance and self.instance.pk:
-            if Book.objects.filter(isbn=isbn).exclude(pk=self.instance.pk).exists():
-                raise ValidationError(_('A book with this ISBN already exists.'))
-        else:
-            if Book.objects.filter(isbn=isbn).exists():
-                raise ValidationError(_('A book with this ISBN already exists.'))
+        # The registry answers most lookups without a query
+        if isbn_registry.exists(isbn, exclude_pk=self.instance.pk):
+            raise ValidationError(_('A book with this ISBN already exists.'))
         
         return isbn
+    
+    def validate_unique(self):
+        # isbn is the only unique field: clean_isbn checks it and save()
+        # handles the race with concurrent inserts.
+        pass
+    
+    def save(self, commit=True):
+        """
+        Save the book. If another book took the ISBN since validation, add
+        the isbn error and return None so the view re-renders the form.
+        Any other integrity error propagates.
+        """
+        if not commit:
+            return super().save(commit=False)
+        try:
+            with transaction.atomic():
+                return super().save()
+        except IntegrityError:
+            isbn = self.cleaned_data['isbn']
+            taken = Book.objects.filter(isbn__in=equivalents(isbn))
+            if self.instance.pk is not None:
+                taken = taken.exclude(pk=self.instance.pk)
+            if not taken.exists():
+                raise
+            isbn_registry.add(isbn)
+            self.add_error('isbn', _('A book with this ISBN already exists.'))
+            return None
+
+
+class BookImportForm(BookForm):
+    """
+    BookForm's field rules without its per-row queries, for bulk imports.
+    The importer resolves libraries by name and checks ISBN uniqueness
+    once per batch instead.
+    """
+    class Meta(BookForm.Meta):
+        fields = ['title', 'author', 'isbn', 'published_date']
+
+    def __init__(self, *args, **kwargs):
+        forms.ModelForm.__init__(self, *args, **kwargs)
+
+    def clean_isbn(self):
+        return normalize_isbn(self.cleaned_data.get('isbn', ''))
 
 # ============ EXAMPLE FORM FOR SECURITY DEMONSTRATION ============
 
@@ -167,11 +210,11 @@ class ExampleForm(forms.Form):
         user_input = self.cleaned_data.get('user_input', '')
         
         # 1. Strip HTML/JavaScript tags
-        user_input = strip_tags(user_input)
+        user_input = strip_html(user_input)
         
         # 2. Remove potentially dangerous characters
         # Allow alphanumeric, spaces, and basic punctuation
-        user_input = re.sub(r'[<>{}[\]]', '', user_input)
+        user_input = UNSAFE_TEXT_CHARS_RE.sub('', user_input)
         
         # 3. Limit length (already done by max_length, but double-check)
         if len(user_input) > 500:
@@ -182,25 +225,9 @@ class ExampleForm(forms.Form):
             raise ValidationError(_('Input must be at least 10 characters.'))
         
         # 5. Check for common attack patterns
-        attack_patterns = [
-            r'javascript:', 
-            r'onclick=', 
-            r'onload=', 
-            r'alert\(', 
-            r'<script',
-            r'</script>',
-            r'SELECT.*FROM',
-            r'INSERT.*INTO',
-            r'DELETE.*FROM',
-            r'DROP.*TABLE',
-            r'UNION.*SELECT'
-        ]
-        
-        input_lower = user_input.lower()
-        for pattern in attack_patterns:
-            if re.search(pattern, input_lower):
-                # Log suspicious input (in real app, you'd log this)
-                raise ValidationError(_('Input contains suspicious content.'))
+        if ATTACK_PATTERNS_RE.search(user_input.lower()):
+            # Log suspicious input (in real app, you'd log this)
+            raise ValidationError(_('Input contains suspicious content.'))
         
         return user_input
     
@@ -209,7 +236,7 @@ class ExampleForm(forms.Form):
         email = self.cleaned_data.get('email', '').strip().lower()
         
         # Basic email validation (Django does this, but we add extra)
-        if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+        if not EMAIL_RE.match(email):
             raise ValidationError(_('Please enter a valid email address.'))
         
         # Check for disposable email domains (example)
@@ -261,11 +288,11 @@ class SecureSearchForm(forms.Form):
         query = self.cleaned_data.get('search_query', '')
         
         # Remove HTML tags
-        query = strip_tags(query)
+        query = strip_html(query)
         
         # Remove potentially dangerous characters but keep useful ones
         # Allow alphanumeric, spaces, hyphens, apostrophes, commas, periods
-        query = re.sub(r'[<>{}[\]\\|;]', '', query)
+        query = UNSAFE_SEARCH_CHARS_RE.sub('', query)
         
         # Trim whitespace
         query = query.strip()
@@ -324,15 +351,15 @@ class UserRegistrationForm(forms.ModelForm):
             raise ValidationError(_('This password is too common. Please choose a stronger one.'))
         
         # Check for at least one digit
-        if not re.search(r'\d', password1):
+        if not DIGIT_RE.search(password1):
             raise ValidationError(_('Password must contain at least one number.'))
         
         # Check for at least one uppercase letter
-        if not re.search(r'[A-Z]', password1):
+        if not UPPERCASE_RE.search(password1):
             raise ValidationError(_('Password must contain at least one uppercase letter.'))
         
         # Check for at least one lowercase letter
-        if not re.search(r'[a-z]', password1):
+        if not LOWERCASE_RE.search(password1):
             raise ValidationError(_('Password must contain at least one lowercase letter.'))
         
         return password1
@@ -414,7 +441,7 @@ class SecuritySettingsForm(forms.Form):
         
         # Simple IP range validation (in production, use proper IP validation)
         for ip_range in ranges:
-            if ip_range and not re.match(r'^\d{1,3}(\.\d{1,3}){0,3}(/\d{1,2})?$', ip_range):
+            if ip_range and not IP_RANGE_RE.match(ip_range):
                 raise ValidationError(
                     _('Invalid IP range format: %(range)s. Use format like 192.168.1.0/24'),
                     params={'range': ip_range}
@@ -0,0 +1,153 @@
+# bookshelf/isbn.py
+"""
+ISBN canonicalization and an in-process registry of the ISBNs in use.
+
+Books store ISBN-13. The registry keeps a bloom filter of every canonical
+ISBN in the Book table, built on first use and extended by the post_save
+signal and bulk imports. A miss means the ISBN is free without touching the
+database; a hit is confirmed with one query. Rows written by other processes
+can be missed, so the unique constraint stays the final word: saves turn an
+IntegrityError into the same "already exists" error.
+"""
+import hashlib
+import math
+import re
+import threading
+
+from .models import Book
+
+
+SEPARATORS_RE = re.compile(r'[-\s]')
+ISBN_RE = re.compile(r'^(?:\d{9}[\dX]|\d{13})$')
+
+
+def isbn10_check_digit(body):
+    remainder = (11 - sum((10 - i) * int(d) for i, d in enumerate(body)) % 11) % 11
+    return 'X' if remainder == 10 else str(remainder)
+
+
+def isbn13_check_digit(body):
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(body))
+    return str((10 - total % 10) % 10)
+
+
+def strip_separators(value):
+    return SEPARATORS_RE.sub('', value).upper()
+
+
+def to_isbn13(isbn):
+    """
+    Canonical ISBN-13 for a separator-free ISBN-10 or ISBN-13, or None when
+    the check digit is wrong. Callers check the format with ISBN_RE first.
+    """
+    if len(isbn) == 10:
+        if isbn10_check_digit(isbn[:9]) != isbn[9]:
+            return None
+        body = '978' + isbn[:9]
+        return body + isbn13_check_digit(body)
+    if isbn13_check_digit(isbn[:12]) != isbn[12]:
+        return None
+    return isbn
+
+
+def equivalents(isbn13):
+    """The spellings a canonical ISBN may be stored under, legacy ISBN-10 included."""
+    if isbn13.startswith('978'):
+        body = isbn13[3:12]
+        return [isbn13, body + isbn10_check_digit(body)]
+    return [isbn13]
+
+
+def canonical_or_raw(isbn):
+    """Canonical form of a stored value; rows predating validation stay as they are."""
+    isbn = strip_separators(isbn)
+    return (to_isbn13(isbn) if ISBN_RE.match(isbn) else None) or isbn
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class ISBNRegistry:
+    """Bloom filter of the canonical ISBNs in the Book table, built lazily."""
+
+    error_rate = 0.01
+    min_capacity = 10_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bloom = None
+
+    def clear(self):
+        self.bloom = None
+
+    def ensure_loaded(self):
+        if self.bloom is None:
+            with self._lock:
+                if self.bloom is None:
+                    self.load()
+
+    def load(self):
+        isbns = [
+            canonical_or_raw(isbn)
+            for isbn in Book.objects.values_list('isbn', flat=True).iterator(chunk_size=10_000)
+        ]
+        # Headroom so the false positive rate holds while the table grows
+        bloom = BloomFilter(max(self.min_capacity, len(isbns) * 2), self.error_rate)
+        for isbn in isbns:
+            bloom.add(isbn)
+        self.bloom = bloom
+
+    def add(self, isbn):
+        bloom = self.bloom
+        if bloom is None:
+            return
+        bloom.add(canonical_or_raw(isbn))
+        if bloom.count > bloom.capacity:
+            self.clear()  # rebuilt at the next lookup with room to grow
+
+    def might_exist(self, isbn13):
+        self.ensure_loaded()
+        return isbn13 in self.bloom
+
+    def exists(self, isbn13, exclude_pk=None):
+        """Whether a book other than `exclude_pk` already has this ISBN."""
+        if not self.might_exist(isbn13):
+            return False
+        books = Book.objects.filter(isbn__in=equivalents(isbn13))
+        if exclude_pk is not None:
+            books = books.exclude(pk=exclude_pk)
+        return books.exists()
+
+    def existing(self, isbns, use_filter=True):
+        """The subset of canonical `isbns` already taken, in at most one query."""
+        candidates = [isbn for isbn in isbns if not use_filter or self.might_exist(isbn)]
+        if not candidates:
+            return set()
+        lookup = {spelling: isbn for isbn in candidates for spelling in equivalents(isbn)}
+        stored = Book.objects.filter(isbn__in=lookup).values_list('isbn', flat=True)
+        return {lookup[isbn] for isbn in stored}
+
+
+isbn_registry = ISBNRegistry()
@@ -0,0 +1,51 @@
+# bookshelf/management/commands/benchmark_forms.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookshelf.forms import (
+    BookImportForm, ExampleForm, SecureSearchForm, UserRegistrationForm,
+)
+
+
+SAMPLES = {
+    # BookForm's field rules without the library/ISBN queries
+    'BookForm': (BookImportForm, [
+        {'title': 'The Left Hand of Darkness', 'author': 'Ursula K. Le Guin',
+         'isbn': '9780441478125', 'published_date': '1969-03-01'},
+        {'title': '<b>Dune</b>  Messiah', 'author': 'Frank  Herbert',
+         'isbn': '0-399-12813-8', 'published_date': '1969-10-15'},
+    ]),
+    'ExampleForm': (ExampleForm, [
+        {'user_input': 'A thoughtful review of the catalog search page.',
+         'email': 'Reader@Example.com', 'rating': '4', 'category': 'fiction',
+         'agree_terms': 'on'},
+        {'user_input': '<p>Great <em>selection</em> of {classic} novels!</p>',
+         'email': 'reader@example.org', 'rating': '3', 'category': 'other',
+         'agree_terms': 'on'},
+    ]),
+    'SecureSearchForm': (SecureSearchForm, [
+        {'search_query': 'le guin'},
+        {'search_query': '<script>alert(1)</script> dune'},
+    ]),
+    'UserRegistrationForm': (UserRegistrationForm, [
+        {'email': 'new.reader@example.com', 'username': 'newreader',
+         'date_of_birth': '1990-05-17', 'password1': 'Secret123', 'password2': 'Secret123'},
+    ]),
+}
+
+
+class Command(BaseCommand):
+    help = 'Measures validated forms per second for the bookshelf forms (needs a migrated database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        for name, (form_class, samples) in SAMPLES.items():
+            start = time.perf_counter()
+            for i in range(iterations):
+                form_class(data=samples[i % len(samples)]).is_valid()
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{name}: {iterations / elapsed:,.0f} forms/sec')
@@ -0,0 +1,57 @@
+# bookshelf/management/commands/benchmark_import.py
+import random
+import string
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from bookshelf.isbn import isbn10_check_digit, isbn13_check_digit
+from bookshelf.management.commands.import_books import validate_chunk, validated_chunks
+
+
+class Command(BaseCommand):
+    help = 'Measures import_books validation throughput for several worker counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        def word():
+            return ''.join(rng.choices(string.ascii_letters, k=rng.randint(3, 9)))
+
+        rows = []
+        for i in range(options['rows']):
+            title = ' '.join(word() for _ in range(rng.randint(1, 6)))
+            if i % 10 == 0:
+                title = f'<em>{title}</em>'
+            body = f'{rng.randrange(10 ** 9):09d}'
+            if i % 4:
+                isbn = f'978{body}' + isbn13_check_digit(f'978{body}')
+            else:
+                isbn = f'{body[0]}-{body[1:4]}-{body[4:]}-' + isbn10_check_digit(body)
+            rows.append({
+                'title': title,
+                'author': f'{word()} {word()}',
+                'isbn': isbn,
+                'published_date': f'{rng.randint(1900, 2024)}-{rng.randint(1, 12):02d}-01',
+                'library': f'Branch {i % 20}',
+            })
+
+        for workers in options['workers']:
+            source = iter(rows)
+            chunks = iter(lambda: list(islice(source, options['chunk_size'])), [])
+            start = time.perf_counter()
+            valid = sum(
+                len(books) for _, (books, _) in validated_chunks(chunks, validate_chunk, workers)
+            )
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'workers={workers}: {len(rows)} rows validated ({valid} valid) '
+                f'in {elapsed:.2f}s, {len(rows) / elapsed:.0f} rows/sec'
+            )
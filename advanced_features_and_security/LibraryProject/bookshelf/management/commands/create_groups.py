@@ -1,43 +1,145 @@
 # bookshelf/management/commands/create_groups.py
-from django.core.management.base import BaseCommand
+"""
+Brings the default groups in line with GROUP_PERMISSIONS.
+
+The manifest is the whole truth: permissions a group holds but the manifest
+does not list are removed. Every permission named is loaded in one query and
+the current grants in another; only groups whose permission set differs get
+a single permissions.set(), so re-running the command is cheap and changes
+nothing. Everything happens in one transaction. permissions.set() sends
+m2m_changed, which makes the members' cached permission sets stale (see
+bookshelf.signals).
+"""
+from collections import defaultdict
+
 from django.contrib.auth.models import Group, Permission
-from django.contrib.contenttypes.models import ContentType
-from bookshelf.models import Book, Library
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+
+# Every permission of the model
+ALL = '__all__'
+
+# group name -> {'app_label.model': [codenames] or ALL}
+GROUP_PERMISSIONS = {
+    'Viewers': {
+        'bookshelf.book': ['can_view'],
+        'bookshelf.library': ['can_view'],
+    },
+    'Editors': {
+        'bookshelf.book': ['can_view', 'can_create', 'can_edit'],
+        'bookshelf.library': ['can_view', 'can_create', 'can_edit'],
+    },
+    'Admins': {
+        'bookshelf.book': ALL,
+        'bookshelf.library': ALL,
+    },
+}
+
+
+def load_permissions(manifest):
+    """{'app_label.model': {codename: permission id}} for every model named."""
+    models = {model for grants in manifest.values() for model in grants}
+    query = Q(pk__in=[])
+    for model in models:
+        app_label, _, model_name = model.partition('.')
+        query |= Q(content_type__app_label=app_label, content_type__model=model_name)
+    permissions = defaultdict(dict)
+    rows = Permission.objects.filter(query).values_list(
+        'pk', 'content_type__app_label', 'content_type__model', 'codename',
+    )
+    for pk, app_label, model_name, codename in rows:
+        permissions[f'{app_label}.{model_name}'][codename] = pk
+    return permissions
+
+
+def resolve(manifest, permissions):
+    """
+    {group name: {permission id: 'model.codename'}} for the manifest.
+    Raises CommandError naming every permission that does not exist.
+    """
+    resolved, missing = {}, []
+    for group, grants in manifest.items():
+        wanted = resolved[group] = {}
+        for model, codenames in grants.items():
+            available = permissions.get(model, {})
+            if codenames == ALL:
+                codenames = sorted(available)
+            for codename in codenames:
+                if codename in available:
+                    wanted[available[codename]] = f'{model}.{codename}'
+                else:
+                    missing.append(f'{model}.{codename}')
+    if missing:
+        raise CommandError(
+            'Unknown permissions (run migrate first?): ' + ', '.join(sorted(set(missing)))
+        )
+    return resolved
+
 
 class Command(BaseCommand):
     help = 'Creates default groups with permissions'
-    
-    def handle(self, *args, **kwargs):
-        # Get content types
-        book_content_type = ContentType.objects.get_for_model(Book)
-        library_content_type = ContentType.objects.get_for_model(Library)
-        
-        # Get permissions
-        book_permissions = Permission.objects.filter(content_type=book_content_type)
-        library_permissions = Permission.objects.filter(content_type=library_content_type)
-        
-        # Create Viewers group (can_view only)
-        viewers_group, created = Group.objects.get_or_create(name='Viewers')
-        viewers_group.permissions.clear()
-        can_view_book = Permission.objects.get(codename='can_view', content_type=book_content_type)
-        can_view_library = Permission.objects.get(codename='can_view', content_type=library_content_type)
-        viewers_group.permissions.add(can_view_book, can_view_library)
-        self.stdout.write(self.style.SUCCESS('Created/Updated Viewers group'))
-        
-        # Create Editors group (can_view, can_create, can_edit)
-        editors_group, created = Group.objects.get_or_create(name='Editors')
-        editors_group.permissions.clear()
-        for perm in book_permissions.filter(codename__in=['can_view', 'can_create', 'can_edit']):
-            editors_group.permissions.add(perm)
-        for perm in library_permissions.filter(codename__in=['can_view', 'can_create', 'can_edit']):
-            editors_group.permissions.add(perm)
-        self.stdout.write(self.style.SUCCESS('Created/Updated Editors group'))
-        
-        # Create Admins group (all permissions)
-        admins_group, created = Group.objects.get_or_create(name='Admins')
-        admins_group.permissions.clear()
-        for perm in book_permissions:
-            admins_group.permissions.add(perm)
-        for perm in library_permissions:
-            admins_group.permissions.add(perm)
-        self.stdout.write(self.style.SUCCESS('Created/Updated Admins group'))
\ No newline at end of file
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report the changes without writing them',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.verbosity = options['verbosity']
+        with transaction.atomic():
+            changed = self.apply(GROUP_PERMISSIONS, dry_run)
+            if dry_run:
+                transaction.set_rollback(True)
+        if not changed:
+            self.stdout.write(self.style.SUCCESS('Groups are up to date'))
+
+    def apply(self, manifest, dry_run):
+        """Sync the groups with `manifest`; returns whether anything changed."""
+        wanted = resolve(manifest, load_permissions(manifest))
+
+        groups = {group.name: group for group in Group.objects.filter(name__in=manifest)}
+        new = [name for name in manifest if name not in groups]
+        if new and not dry_run:
+            Group.objects.bulk_create([Group(name=name) for name in new])
+            groups.update((group.name, group) for group in Group.objects.filter(name__in=new))
+
+        current = defaultdict(set)
+        grants = Group.permissions.through.objects.filter(
+            group_id__in=[group.pk for group in groups.values()],
+        ).values_list('group_id', 'permission_id')
+        for group_id, permission_id in grants:
+            current[group_id].add(permission_id)
+
+        changed = bool(new)
+        prefix = '[dry run] ' if dry_run else ''
+        for name, permissions in wanted.items():
+            group = groups.get(name)
+            created = name in new
+            held = set() if group is None else current[group.pk]
+            added = permissions.keys() - held
+            removed = held - permissions.keys()
+            if not (created or added or removed):
+                continue
+            changed = True
+            if not dry_run:
+                group.permissions.set(list(permissions))
+            action = 'Created' if created else 'Updated'
+            self.stdout.write(self.style.SUCCESS(
+                f'{prefix}{action} {name} group: +{len(added)} -{len(removed)}'
+            ))
+            if self.verbosity > 1:
+                self.write_details(permissions, added, removed)
+        return changed
+
+    def write_details(self, permissions, added, removed):
+        for label in sorted(permissions[pk] for pk in added):
+            self.stdout.write(f'  + {label}')
+        removed = Permission.objects.filter(pk__in=removed).values_list(
+            'content_type__app_label', 'content_type__model', 'codename',
+        )
+        for label in sorted('.'.join(row) for row in removed):
+            self.stdout.write(f'  - {label}')
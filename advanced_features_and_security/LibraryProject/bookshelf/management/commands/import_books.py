@@ -0,0 +1,209 @@
+# bookshelf/management/commands/import_books.py
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from bookshelf.forms import BookImportForm
+from bookshelf.isbn import isbn_registry
+from bookshelf.search import invalidate_search
+from bookshelf.models import Book, Library
+
+
+def read_rows(path, fmt):
+    """Stream dicts from a CSV file with a header row or from NDJSON."""
+    with open(path, newline='', encoding='utf-8') as source:
+        if fmt == 'csv':
+            yield from csv.DictReader(source)
+            return
+        for number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise CommandError(f'{path}:{number}: invalid JSON ({exc})')
+
+
+def library_name(row):
+    name = row.get('library')
+    name = name.strip() if isinstance(name, str) else ''
+    return name if len(name) <= Library._meta.get_field('name').max_length else ''
+
+
+def validate_chunk(chunk):
+    """
+    Run the BookForm field rules over one chunk; needs no database, so it
+    can run in a worker process. Returns `(books, errors)` keyed by position
+    in the chunk, with books as `(cleaned_data, library name)` pairs.
+    """
+    books, errors = {}, {}
+    for index, row in enumerate(chunk):
+        if not isinstance(row, dict):
+            errors[index] = {'__all__': ['Expected an object.']}
+            continue
+        form = BookImportForm(data=row)
+        row_errors = {} if form.is_valid() else {
+            field: [str(message) for message in messages]
+            for field, messages in form.errors.items()
+        }
+        library = library_name(row)
+        if not library:
+            row_errors['library'] = ['This field is required.']
+        if row_errors:
+            errors[index] = row_errors
+            continue
+        books[index] = (form.cleaned_data, library)
+    return books, errors
+
+
+def validated_chunks(chunks, validate, workers):
+    """
+    Yield `(chunk size, validate(chunk))` in input order.
+
+    With more than one worker, chunks are validated in a process pool while
+    the caller writes earlier results; at most two chunks per worker are in
+    flight, so memory stays bounded however large the input is.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield len(chunk), validate(chunk)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=django.setup) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), executor.submit(validate, chunk)))
+            if len(pending) >= workers * 2:
+                size, future = pending.popleft()
+                yield size, future.result()
+        while pending:
+            size, future = pending.popleft()
+            yield size, future.result()
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports books from CSV or NDJSON rows with title, author, isbn, '
+        'published_date and library (a name; missing libraries are created). '
+        'Rows are validated with the BookForm rules and inserted in chunks, '
+        'one transaction per chunk.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ndjson'],
+                            help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--checkpoint',
+                            help='Progress file, defaults to <path>.checkpoint')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip the rows recorded in the checkpoint file')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes validating chunks; this process does all writes')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        chunk_size = options['chunk_size']
+
+        done = self.load_checkpoint(checkpoint) if options['resume'] else 0
+        rows = islice(read_rows(path, fmt), done, None)
+        if done:
+            self.stdout.write(f'resuming after row {done}')
+
+        # First library wins when names repeat, matching the import order
+        self.library_ids = {}
+        for name, pk in Library.objects.order_by('-pk').values_list('name', 'pk'):
+            self.library_ids[name] = pk
+        imported = skipped = 0
+        start = time.perf_counter()
+
+        chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+        for size, (books, errors) in validated_chunks(chunks, validate_chunk, options['workers']):
+            created = self.write_chunk(books, errors)
+            for index, row_errors in sorted(errors.items()):
+                self.stderr.write(f'row {done + index + 1}: {json.dumps(row_errors)}')
+
+            done += size
+            imported += created
+            skipped += len(errors)
+            self.save_checkpoint(checkpoint, done)
+
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{done} rows read, {imported} imported, '
+                              f'{imported / elapsed:.0f} rows/sec')
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} books, skipped {skipped} rows in {elapsed:.1f}s '
+            f'({imported / elapsed if elapsed else 0:.0f} rows/sec)'
+        ))
+
+    def write_chunk(self, books, errors):
+        """Check ISBNs, create libraries and insert; returns books created."""
+        isbns = {}
+        for index, (data, _) in books.items():
+            if data['isbn'] in isbns:
+                errors[index] = {'isbn': ['Duplicates an earlier row in this chunk.']}
+            isbns.setdefault(data['isbn'], index)
+
+        # The registry rules out most ISBNs without a query. Rows inserted by
+        # another process are invisible to it; the unique constraint catches
+        # those and the chunk is retried against the table itself.
+        for use_filter in (True, False):
+            for isbn in isbn_registry.existing(isbns, use_filter=use_filter):
+                errors[isbns[isbn]] = {'isbn': ['A book with this ISBN already exists.']}
+            valid = [entry for index, entry in books.items() if index not in errors]
+            try:
+                with transaction.atomic():
+                    library_ids = self.create_libraries({library for _, library in valid})
+                    Book.objects.bulk_create([
+                        Book(**data, library_id=library_ids[library])
+                        for data, library in valid
+                    ], batch_size=500)
+            except IntegrityError:
+                if not use_filter:
+                    raise
+                continue
+            self.library_ids = library_ids
+            break
+
+        # bulk_create sends no signals
+        for data, _ in valid:
+            isbn_registry.add(data['isbn'])
+        if valid:
+            invalidate_search()
+        return len(valid)
+
+    def create_libraries(self, names):
+        """The name -> id map extended with libraries created for `names`."""
+        missing = [Library(name=name, location='') for name in names - self.library_ids.keys()]
+        created = Library.objects.bulk_create(missing)
+        return {**self.library_ids, **{library.name: library.pk for library in created}}
+
+    @staticmethod
+    def load_checkpoint(checkpoint):
+        try:
+            with open(checkpoint) as handle:
+                return json.load(handle)['rows']
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def save_checkpoint(checkpoint, rows):
+        # Written after the chunk commits; a crash in between re-reads that
+        # chunk on resume and its rows are then skipped as duplicate ISBNs.
+        with open(f'{checkpoint}.tmp', 'w') as handle:
+            json.dump({'rows': rows}, handle)
+        os.replace(f'{checkpoint}.tmp', checkpoint)
@@ -0,0 +1,62 @@
+from django.db import migrations
+
+
+FTS_TABLE = 'bookshelf_book_fts'
+
+CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, author, content='bookshelf_book', content_rowid='id'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON bookshelf_book BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, author) VALUES (new.id, new.title, new.author);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON bookshelf_book BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE ON bookshelf_book BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO {FTS_TABLE}(rowid, title, author) VALUES (new.id, new.title, new.author);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def fts5_available(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def create_fts(apps, schema_editor):
+    # The index only backs the optional "fts5" search backend
+    if fts5_available(schema_editor):
+        for statement in CREATE_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookshelf', '0002_author_alter_book_options_alter_customuser_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookshelf', '0003_book_fts'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='book',
+            options={'permissions': [('can_view', 'Can view book'), ('can_create', 'Can create book'), ('can_edit', 'Can edit book'), ('can_delete', 'Can delete book')]},
+        ),
+        migrations.AlterModelOptions(
+            name='library',
+            options={'permissions': [('can_view', 'Can view library'), ('can_create', 'Can create library'), ('can_edit', 'Can edit library'), ('can_delete', 'Can delete library')]},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookshelf', '0004_book_library_permissions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='role',
+            field=models.CharField(choices=[('Admin', 'Admin'), ('Librarian', 'Librarian'), ('Member', 'Member')], default='Member', max_length=20),
+        ),
+    ]
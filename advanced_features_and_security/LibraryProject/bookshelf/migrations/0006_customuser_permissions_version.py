@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:38
+
+import bookshelf.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookshelf', '0005_userprofile_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='permissions_version',
+            field=models.CharField(default=bookshelf.models.new_version, editable=False, max_length=32),
+        ),
+    ]
@@ -1,8 +1,15 @@
+from uuid import uuid4
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 
+
+def new_version():
+    return uuid4().hex
+
+
 # Custom User Model
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, username, date_of_birth, password=None, **extra_fields):
@@ -50,6 +57,9 @@ class CustomUser(AbstractUser):
         max_length=255,
         unique=True,
     )
+    # Key of the user's cached permission set; replaced whenever the
+    # user's groups or permissions change (see bookshelf.backends)
+    permissions_version = models.CharField(max_length=32, default=new_version, editable=False)
     
     objects = CustomUserManager()
     
@@ -63,6 +73,17 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        # Only invalidate_permissions changes permissions_version, so an
+        # instance loaded before the change must not write the old one back.
+        updating = not (self._state.adding or kwargs.get('force_insert'))
+        if updating and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'permissions_version'
+            ]
+        super().save(*args, **kwargs)
+
 # Library and Book models
 
 # Updating the Library model to include permissions:
@@ -130,7 +151,14 @@ class Librarian(models.Model):
         return f"{self.user.username} - {self.employee_id}"
 
 class UserProfile(models.Model):
+    ROLE_CHOICES = (
+        ('Admin', 'Admin'),
+        ('Librarian', 'Librarian'),
+        ('Member', 'Member'),
+    )
+
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='Member')
     phone_number = models.CharField(max_length=20, blank=True)
     address = models.TextField(blank=True)
     
@@ -0,0 +1,66 @@
+# bookshelf/sanitization.py
+"""
+Input cleaning shared by the bookshelf forms.
+
+Patterns are compiled once at import. strip_tags() re-runs an HTML parser
+until its output is stable, so it is skipped for values without a '<' and
+its results are kept in an LRU cache, as are the cleaned titles and names
+that the same users submit again and again.
+"""
+import re
+from functools import lru_cache
+
+from django.utils.html import strip_tags
+
+
+CACHE_SIZE = 4096
+
+AUTHOR_NAME_RE = re.compile(r'^[A-Za-z\s\-\'\.]+$')
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+IP_RANGE_RE = re.compile(r'^\d{1,3}(\.\d{1,3}){0,3}(/\d{1,2})?$')
+
+# Characters removed from free text and from search queries
+UNSAFE_TEXT_CHARS_RE = re.compile(r'[<>{}[\]]')
+UNSAFE_SEARCH_CHARS_RE = re.compile(r'[<>{}[\]\\|;]')
+
+# Searched in the lowercased input, as ExampleForm always has
+ATTACK_PATTERNS_RE = re.compile('|'.join([
+    r'javascript:',
+    r'onclick=',
+    r'onload=',
+    r'alert\(',
+    r'<script',
+    r'</script>',
+    r'SELECT.*FROM',
+    r'INSERT.*INTO',
+    r'DELETE.*FROM',
+    r'DROP.*TABLE',
+    r'UNION.*SELECT',
+]))
+
+DIGIT_RE = re.compile(r'\d')
+UPPERCASE_RE = re.compile(r'[A-Z]')
+LOWERCASE_RE = re.compile(r'[a-z]')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _strip_tags(value):
+    return strip_tags(value)
+
+
+def strip_html(value):
+    """strip_tags(), skipped when the value cannot contain a tag."""
+    if '<' not in value:
+        return value
+    return _strip_tags(value)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def clean_text(value):
+    """Strip HTML tags and collapse runs of whitespace to single spaces."""
+    return ' '.join(strip_html(value).split())
+
+
+def clear_caches():
+    _strip_tags.cache_clear()
+    clean_text.cache_clear()
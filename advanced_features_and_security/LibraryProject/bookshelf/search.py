@@ -0,0 +1,137 @@
+# bookshelf/search.py
+"""
+Book search behind the secure search page.
+
+Queries are normalized with SecureSearchForm, ranked by field weight and
+match position, and the top results for each normalized query are cached.
+Every Book write bumps a version counter that is part of the cache key, so
+stale result lists are never served; they simply expire.
+
+Two backends share that interface:
+- "orm" (default) ranks substring matches in SQL on any database;
+- "fts5" uses the SQLite FTS5 index over title/author created by migration
+  0003, matching word prefixes and ranking with bm25.
+Pick one with the BOOKSHELF_SEARCH_BACKEND setting.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Lower, StrIndex
+
+from .forms import SecureSearchForm
+from .models import Book
+from .versions import bump_version, get_version
+
+
+SEARCH_VERSION = 'bookshelf-search'
+SEARCH_TIMEOUT = 60 * 5
+TOP_N = 10
+
+# A title match outranks an author match at the same position
+FIELD_WEIGHTS = {'title': 2.0, 'author': 1.0}
+
+FTS_TABLE = 'bookshelf_book_fts'
+TOKEN_RE = re.compile(r'\w+')
+
+
+def get_search_version():
+    return get_version(SEARCH_VERSION)
+
+
+def invalidate_search():
+    """Make every cached result list stale; called on any Book write."""
+    bump_version(SEARCH_VERSION)
+
+
+def normalize_query(raw):
+    """The sanitized, lowercased, single-spaced query, or '' when invalid."""
+    form = SecureSearchForm(data={'search_query': raw})
+    if not form.is_valid():
+        return ''
+    return ' '.join(form.cleaned_data['search_query'].lower().split())
+
+
+class ORMSearchBackend:
+    """Substring matches scored as weight / position, best first."""
+
+    name = 'orm'
+
+    def search(self, query, limit):
+        positions = {
+            field: StrIndex(Lower(field), Value(query)) for field in FIELD_WEIGHTS
+        }
+        score = sum(
+            (
+                Case(
+                    When(**{f'{field}_position__gt': 0},
+                         then=Value(weight) / F(f'{field}_position')),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                )
+                for field, weight in FIELD_WEIGHTS.items()
+            ),
+            Value(0.0),
+        )
+        books = (
+            Book.objects
+            .filter(Q(title__icontains=query) | Q(author__icontains=query))
+            .annotate(**{f'{field}_position': expr for field, expr in positions.items()})
+            .annotate(score=score)
+            .order_by('-score', 'title', 'pk')
+        )
+        return list(books.values('id', 'title', 'author')[:limit])
+
+
+class FTS5SearchBackend:
+    """Word-prefix matches from the SQLite FTS5 index, ranked with weighted bm25."""
+
+    name = 'fts5'
+
+    def search(self, query, limit):
+        terms = TOKEN_RE.findall(query)
+        if not terms:
+            return []
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in FIELD_WEIGHTS.values())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+                [match, limit],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        books = {
+            book['id']: book
+            for book in Book.objects.filter(pk__in=ids).values('id', 'title', 'author')
+        }
+        return [books[pk] for pk in ids if pk in books]
+
+
+BACKENDS = {backend.name: backend for backend in (ORMSearchBackend, FTS5SearchBackend)}
+
+
+def get_backend():
+    return BACKENDS[getattr(settings, 'BOOKSHELF_SEARCH_BACKEND', 'orm')]()
+
+
+def search_books(raw_query, limit=TOP_N):
+    """
+    Top `limit` books for a raw query as dicts with id, title and author.
+    Returns `(normalized query, results)`.
+    """
+    query = normalize_query(raw_query)
+    if not query:
+        return query, []
+
+    backend = get_backend()
+    digest = hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+    key = f'book-search:{backend.name}:{get_search_version()}:{limit}:{digest}'
+    results = cache.get(key)
+    if results is None:
+        results = backend.search(query, limit)
+        cache.set(key, results, SEARCH_TIMEOUT)
+    return query, results
@@ -0,0 +1,60 @@
+# bookshelf/signals.py
+from django.contrib.auth.models import Group, Permission
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .backends import invalidate_permissions
+from .isbn import isbn_registry
+from .models import Book, CustomUser
+from .search import invalidate_search
+
+
+@receiver(post_save, sender=Book)
+def register_isbn(sender, instance, **kwargs):
+    isbn_registry.add(instance.isbn)
+
+
+@receiver([post_save, post_delete], sender=Book)
+def invalidate_search_results(sender, instance, **kwargs):
+    invalidate_search()
+
+
+def permission_holders(sender, instance, reverse, pk_set):
+    """The users whose permissions an m2m change on `sender` affects."""
+    users = CustomUser.objects.all()
+    if sender is Group.permissions.through:
+        if not reverse:
+            return users.filter(groups=instance)
+        if pk_set is None:
+            return users.filter(groups__permissions=instance)
+        return users.filter(groups__in=pk_set)
+    # CustomUser.groups and CustomUser.user_permissions
+    if not reverse:
+        return users.filter(pk=instance.pk)
+    if pk_set is not None:
+        return users.filter(pk__in=pk_set)
+    # A group or permission losing every user it had
+    field = 'groups' if sender is CustomUser.groups.through else 'user_permissions'
+    return users.filter(**{field: instance})
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_permission_sets(sender, instance, action, reverse, pk_set, **kwargs):
+    # A clear is handled before the rows go, while they still name the users
+    if action in ('post_add', 'post_remove', 'pre_clear'):
+        invalidate_permissions(permission_holders(sender, instance, reverse, pk_set))
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_group_members(sender, instance, **kwargs):
+    invalidate_permissions(CustomUser.objects.filter(groups=instance))
+
+
+@receiver(pre_delete, sender=Permission)
+def invalidate_permission_holders(sender, instance, **kwargs):
+    invalidate_permissions(CustomUser.objects.filter(
+        Q(user_permissions=instance) | Q(groups__permissions=instance)
+    ))
@@ -2,11 +2,33 @@ from django.test import TestCase
 
 # Create your tests here.
 # bookshelf/tests.py
-from django.test import TestCase, Client
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.core.cache import cache, caches
+from django.contrib.auth.decorators import permission_required
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.http import HttpResponse
 from django.urls import reverse
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from .backends import PERMISSIONS_CACHE
+from .management.commands import create_groups
+from .management.commands.create_groups import ALL
+from .forms import BookForm, SecureSearchForm, normalize_isbn
+from .isbn import isbn_registry
+from .search import search_books
 from .models import CustomUser, Book, Library
+from .versions import check_shared_cache
+
+
+# Query counts below are the app's own; the shared cache backend would add its
+# queries to them.
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
 
 class PermissionTests(TestCase):
     def setUp(self):
@@ -95,4 +117,304 @@ class PermissionTests(TestCase):
         
         # Should get 403 Forbidden, not redirect to login
         response = self.client.get(reverse('book_list'))
-        self.assertEqual(response.status_code, 403)
\ No newline at end of file
+        self.assertEqual(response.status_code, 403)
+
+
+class ImportBooksCommandTests(TestCase):
+    def setUp(self):
+        self.library = Library.objects.create(name='Central', location='Main Street')
+        Book.objects.create(
+            title='Existing Book',
+            author='Test Author',
+            isbn='1234567890123',
+            library=self.library,
+            published_date='2023-01-01'
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'books.csv')
+        with open(self.path, 'w', encoding='utf-8') as handle:
+            handle.write(
+                'title,author,isbn,published_date,library\n'
+                'Dune,Frank Herbert,9780441172719,1965-08-01,Central\n'
+                'Emma,Jane Austen,0141439580,1815-12-23,East Branch\n'
+                'Copy,Test Author,1234567890123,2023-01-01,Central\n'
+                '<b>X</b>,F0o,12,2023-01-01,Central\n'
+            )
+
+    def test_import_validates_with_form_rules(self):
+        """Valid rows are inserted, libraries created by name, bad rows reported."""
+        out, err = StringIO(), StringIO()
+        call_command('import_books', self.path, '--chunk-size', '3', stdout=out, stderr=err)
+
+        self.assertIn('Imported 2 books, skipped 2 rows', out.getvalue())
+        self.assertIn('row 3: {"isbn"', err.getvalue())
+        self.assertIn('row 4:', err.getvalue())
+        self.assertEqual(Book.objects.get(isbn='9780441172719').library, self.library)
+        self.assertEqual(Book.objects.get(isbn='9780141439587').library.name, 'East Branch')
+        self.assertFalse(os.path.exists(self.path + '.checkpoint'))
+
+
+
+class ISBNRegistryTests(TestCase):
+    def setUp(self):
+        isbn_registry.clear()
+        self.library = Library.objects.create(name='Central', location='Main Street')
+        self.book = Book.objects.create(
+            title='Emma',
+            author='Jane Austen',
+            isbn='0141439580',  # stored before ISBNs were canonicalized
+            library=self.library,
+            published_date='1815-12-23'
+        )
+
+    def form(self, isbn, instance=None):
+        return BookForm(data={
+            'title': 'Dune',
+            'author': 'Frank Herbert',
+            'isbn': isbn,
+            'library': self.library.pk,
+            'published_date': '1965-08-01',
+        }, instance=instance)
+
+    def test_normalize_isbn(self):
+        """ISBN-10 is converted to ISBN-13 and check digits are verified."""
+        self.assertEqual(normalize_isbn('0-441-17271-7'), '9780441172719')
+        self.assertEqual(normalize_isbn('978 0441172719'), '9780441172719')
+        self.assertEqual(normalize_isbn('080442957X'), '9780804429573')
+        for invalid in ['0441172718', '9780441172710', '12345']:
+            with self.assertRaises(ValidationError):
+                normalize_isbn(invalid)
+
+    def test_new_isbn_needs_no_query(self):
+        """Once loaded, the bloom filter answers for unknown ISBNs."""
+        isbn_registry.ensure_loaded()
+        with self.assertNumQueries(0):
+            self.assertFalse(isbn_registry.exists('9780441172719'))
+
+    def test_duplicate_matches_legacy_isbn10(self):
+        form = self.form('978-0-14-143958-7')
+        self.assertFalse(form.is_valid())
+        self.assertIn('isbn', form.errors)
+        self.assertTrue(self.form('9780141439587', instance=self.book).is_valid())
+
+    def test_save_reports_conflict_from_another_writer(self):
+        """A row the registry has not seen is caught by the unique constraint."""
+        form = self.form('0441172717')
+        self.assertTrue(form.is_valid())
+        Book.objects.bulk_create([Book(
+            title='Dune', author='Frank Herbert', isbn='9780441172719',
+            library=self.library, published_date='1965-08-01'
+        )])
+        self.assertIsNone(form.save())
+        self.assertIn('isbn', form.errors)
+        self.assertEqual(Book.objects.filter(isbn='9780441172719').count(), 1)
+
+    def test_save_reraises_other_integrity_errors(self):
+        """Only a taken ISBN becomes a form error."""
+        form = self.form('0441172717')
+        self.assertTrue(form.is_valid())
+        error = IntegrityError('NOT NULL constraint failed: bookshelf_book.library_id')
+        with patch('django.forms.ModelForm.save', side_effect=error):
+            with self.assertRaises(IntegrityError):
+                form.save()
+        self.assertNotIn('isbn', form.errors)
+
+
+class SanitizationTests(TestCase):
+    def test_strip_html_fast_path(self):
+        """Values without '<' are returned untouched; others match strip_tags."""
+        from django.utils.html import strip_tags
+        from .sanitization import clean_text, strip_html
+
+        plain = 'Le Guin & friends > everyone'
+        self.assertIs(strip_html(plain), plain)
+        for value in ['<b>Dune</b>', 'a < b', '<<script>x</script>', '<p>1</p><p>2']:
+            self.assertEqual(strip_html(value), strip_tags(value))
+        self.assertEqual(clean_text('  <em>The</em>\n Dispossessed '), 'The Dispossessed')
+
+    def test_search_form_still_sanitizes(self):
+        form = SecureSearchForm(data={'search_query': '<b>dune</b>; {messiah}'})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['search_query'], 'dune messiah')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BookSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        library = Library.objects.create(name='Central', location='Main Street')
+        for title, author, isbn in [
+            ('Dune Messiah', 'Frank Herbert', '9780441172696'),
+            ('Children of Dune', 'Frank Herbert', '9780441104024'),
+            ('Sandworms', 'Brian Dune', '9780765312938'),
+            ('Emma', 'Jane Austen', '9780141439587'),
+        ]:
+            Book.objects.create(title=title, author=author, isbn=isbn,
+                                library=library, published_date='1970-01-01')
+
+    def titles(self, query):
+        return [book['title'] for book in search_books(query)[1]]
+
+    def test_ranked_by_field_weight_and_position(self):
+        self.assertEqual(self.titles('DUNE'), ['Dune Messiah', 'Children of Dune', 'Sandworms'])
+        self.assertEqual(search_books('  <b>Dune</b>  ')[0], 'dune')
+        self.assertEqual(self.titles('x'), [])
+
+    def test_results_cached_until_a_book_changes(self):
+        self.titles('dune')
+        with self.assertNumQueries(0):
+            self.titles('Dune ')
+        Book.objects.filter(title='Emma').get().delete()
+        Book.objects.create(title='Dune Road', author='Anon', isbn='9780000000002',
+                            library=Library.objects.get(), published_date='2000-01-01')
+        self.assertIn('Dune Road', self.titles('dune'))
+
+    @override_settings(BOOKSHELF_SEARCH_BACKEND='fts5')
+    def test_fts5_backend(self):
+        self.assertEqual(self.titles('dun mess'), ['Dune Messiah'])
+        self.assertEqual(set(self.titles('dune')), {'Dune Messiah', 'Children of Dune', 'Sandworms'})
+        self.assertEqual(self.titles('dune')[-1], 'Sandworms')
+
+
+class CachedPermissionsBackendTests(TestCase):
+    # Runs against the configured CACHES: the shared default cache is a
+    # database table, so any cache round trip would show up as a query.
+    def setUp(self):
+        caches[PERMISSIONS_CACHE].clear()
+        self.user = CustomUser.objects.create_user(
+            email='viewer@example.com', username='viewer', date_of_birth='2000-01-01',
+        )
+        self.group = Group.objects.create(name='Viewers')
+        book_content_type = ContentType.objects.get_for_model(Book)
+        self.group.permissions.add(
+            Permission.objects.get(codename='can_view', content_type=book_content_type)
+        )
+        self.factory = RequestFactory()
+
+        @permission_required('bookshelf.can_view', raise_exception=True)
+        def view(request):
+            return HttpResponse('ok')
+        self.view = view
+
+    def get(self):
+        """A request with a freshly loaded user, as AuthenticationMiddleware gives."""
+        request = self.factory.get('/')
+        request.user = CustomUser.objects.get(pk=self.user.pk)
+        try:
+            return self.view(request).status_code
+        except PermissionDenied:
+            return 403
+
+    def test_warm_requests_run_no_queries(self):
+        self.assertEqual(self.get(), 403)
+        self.user.groups.add(self.group)
+        self.assertEqual(self.get(), 200)
+        user = CustomUser.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm('bookshelf.can_view'))
+            self.assertFalse(user.has_perm('bookshelf.can_delete'))
+
+    def test_stale_user_save_keeps_revocation(self):
+        self.user.groups.add(self.group)
+        stale = CustomUser.objects.get(pk=self.user.pk)
+        self.assertEqual(self.get(), 200)
+        self.group.user_set.remove(self.user)
+        stale.first_name = 'Renamed'
+        stale.save()
+        self.assertEqual(self.get(), 403)
+        self.assertEqual(CustomUser.objects.get(pk=self.user.pk).first_name, 'Renamed')
+
+    def test_process_local_cache_is_rejected(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with self.settings(CACHES=LOCMEM_CACHES):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['bookshelf.E001'])
+
+    def test_group_changes_invalidate(self):
+        self.user.groups.add(self.group)
+        self.assertEqual(self.get(), 200)
+        self.group.permissions.clear()
+        self.assertEqual(self.get(), 403)
+        self.group.permissions.add(Permission.objects.get(codename='can_view', content_type__model='book'))
+        self.assertEqual(self.get(), 200)
+        self.user.groups.remove(self.group)
+        self.assertEqual(self.get(), 403)
+
+    def test_clears_and_deletes_invalidate(self):
+        self.group.user_set.add(self.user)
+        self.assertEqual(self.get(), 200)
+        self.group.user_set.clear()
+        self.assertEqual(self.get(), 403)
+
+        permission = Permission.objects.get(codename='can_view', content_type__model='book')
+        self.user.user_permissions.add(permission)
+        self.assertEqual(self.get(), 200)
+        permission.user_set.clear()
+        self.assertEqual(self.get(), 403)
+
+        self.user.groups.add(self.group)
+        self.assertEqual(self.get(), 200)
+        self.group.delete()
+        self.assertEqual(self.get(), 403)
+
+    def test_create_groups_invalidates(self):
+        call_command('create_groups', stdout=StringIO())
+        editors = Group.objects.get(name='Editors')
+        self.user.groups.add(editors)
+        self.assertTrue(CustomUser.objects.get(pk=self.user.pk).has_perm('bookshelf.can_edit'))
+        editors.permissions.clear()
+        self.assertFalse(CustomUser.objects.get(pk=self.user.pk).has_perm('bookshelf.can_edit'))
+        call_command('create_groups', stdout=StringIO())
+        self.assertTrue(CustomUser.objects.get(pk=self.user.pk).has_perm('bookshelf.can_edit'))
+
+
+class CreateGroupsCommandTests(TestCase):
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('create_groups', *args, stdout=out)
+        return out.getvalue()
+
+    def codenames(self, name):
+        return sorted(Group.objects.get(name=name).permissions.values_list('codename', flat=True))
+
+    def test_groups_match_manifest(self):
+        self.run_command()
+        self.assertEqual(self.codenames('Viewers'), ['can_view', 'can_view'])
+        self.assertEqual(len(self.codenames('Editors')), 6)
+        self.assertEqual(Group.objects.get(name='Admins').permissions.count(), 16)
+
+    def test_rerun_changes_nothing(self):
+        self.run_command()
+        # Permissions, groups and grants, plus the savepoint pair
+        with self.assertNumQueries(5):
+            self.assertIn('up to date', self.run_command())
+
+    def test_extra_permissions_are_removed(self):
+        self.run_command()
+        viewers = Group.objects.get(name='Viewers')
+        viewers.permissions.add(Permission.objects.get(codename='can_delete', content_type__model='book'))
+        self.assertIn('Updated Viewers group: +0 -1', self.run_command())
+        self.assertEqual(self.codenames('Viewers'), ['can_view', 'can_view'])
+
+    def test_dry_run_writes_nothing(self):
+        out = self.run_command('--dry-run')
+        self.assertIn('[dry run] Created Admins group: +16 -0', out)
+        self.assertFalse(Group.objects.exists())
+
+    def test_unknown_permission_fails_before_writing(self):
+        manifest = {'Broken': {'bookshelf.book': ['can_view', 'can_fly']}}
+        with patch.dict(create_groups.GROUP_PERMISSIONS, manifest, clear=True):
+            with self.assertRaisesMessage(CommandError, 'bookshelf.book.can_fly'):
+                self.run_command()
+        self.assertFalse(Group.objects.exists())
+
+    def test_many_groups_use_a_set_per_group(self):
+        manifest = {
+            f'Group {i}': {'bookshelf.book': ALL, 'auth.group': ['view_group']}
+            for i in range(200)
+        }
+        with patch.dict(create_groups.GROUP_PERMISSIONS, manifest, clear=True):
+            self.run_command()
+            self.assertEqual(Group.permissions.through.objects.count(), 200 * 9)
+            with self.assertNumQueries(5):
+                self.run_command()
@@ -0,0 +1,33 @@
+"""
+Version tokens for the library's cached search results and book list pages.
+
+Both caches put a version in their keys, and Book writes replace the
+version. The token is random rather than a counter. If the cache evicts it, the replacement therefore never matches a
+key that stale results are still cached under.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+
+
+def get_version(name):
+    return cache.get_or_set(f'version:{name}', lambda: uuid4().hex, timeout=None)
+
+
+def bump_version(name):
+    cache.set(f'version:{name}', uuid4().hex, timeout=None)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """A book saved through one worker must show up in every worker's results."""
+    if settings.CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache':
+        return []
+    return [checks.Error(
+        'The default cache is local to each process, so books saved through '
+        'one worker stay missing from the searches and pages others cached.',
+        hint='Use a shared backend such as DatabaseCache or RedisCache.',
+        id='bookshelf.E001',
+    )]
@@ -1,5 +1,8 @@
 # Add this import at the top
+from django.shortcuts import redirect, render
+
 from .forms import ExampleForm, SecureSearchForm, UserRegistrationForm, SecuritySettingsForm
+from .search import search_books
 
 # Add this view function
 def example_form_view(request):
@@ -42,17 +45,14 @@ def secure_search_demo(request):
     """Demonstrate secure search form."""
     form = SecureSearchForm(request.GET or None)
     results = []
+    query = ''
     
     if form.is_valid():
-        query = form.cleaned_data.get('search_query')
-        if query:
-            # Safe search using Django ORM
-            results = Book.objects.filter(
-                Q(title__icontains=query) | Q(author__icontains=query)
-            )[:10]
+        # Normalized, ranked and cached by the search service
+        query, results = search_books(form.cleaned_data.get('search_query', ''))
     
     return render(request, 'bookshelf/secure_search.html', {
         'form': form,
         'results': results,
-        'query': form.cleaned_data.get('search_query', '') if form.is_valid() else ''
-    })
\ No newline at end of file
+        'query': query,
+    })
@@ -0,0 +1,70 @@
+"""
+Paginated book listing.
+
+Pages are keyset paginated on the primary key: `?after=<id>` starts the page
+after that book, so any page costs the same as the first. A page's rows are
+only fetched when the template renders them. The template caches each page
+as a fragment keyed by its cursor, the user's book permissions and a version
+counter that every book write bumps (see signals.py), so warm pages run no
+book queries.
+"""
+from django.utils.functional import cached_property
+
+from bookshelf.models import Book
+from bookshelf.versions import bump_version, get_version
+
+
+PAGE_SIZE = 50
+# The largest id a 64-bit primary key column holds; larger cursors would
+# overflow the query parameter
+MAX_CURSOR = 2 ** 63 - 1
+BOOK_LIST_VERSION = 'book-list'
+
+
+def get_book_list_version():
+    return get_version(BOOK_LIST_VERSION)
+
+
+def invalidate_book_list():
+    """Make every cached page of the book list stale."""
+    bump_version(BOOK_LIST_VERSION)
+
+
+def parse_cursor(value):
+    """The book id a page starts after, or None for the first page."""
+    try:
+        after = int(value)
+    except (TypeError, ValueError):
+        return None
+    return after if 0 < after <= MAX_CURSOR else None
+
+
+class BookPage:
+    """The books after `after`, queried on first access."""
+
+    def __init__(self, after=None, size=PAGE_SIZE):
+        self.after = after
+        self.size = size
+
+    def get_queryset(self):
+        # The template links to the library by id, so no join is needed
+        queryset = Book.objects.only('title', 'author', 'library_id').order_by('pk')
+        if self.after is not None:
+            queryset = queryset.filter(pk__gt=self.after)
+        return queryset
+
+    @cached_property
+    def _rows(self):
+        # One extra row tells whether there is a next page
+        return list(self.get_queryset()[:self.size + 1])
+
+    @property
+    def books(self):
+        return self._rows[:self.size]
+
+    @property
+    def next_after(self):
+        """The cursor of the next page, or None on the last page."""
+        if len(self._rows) > self.size:
+            return self._rows[self.size - 1].pk
+        return None
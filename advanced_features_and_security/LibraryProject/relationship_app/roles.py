@@ -0,0 +1,41 @@
+"""
+Role resolution for the role-based views.
+
+The authentication backend loads each request's user together with their
+bookshelf UserProfile (see bookshelf.backends), so `user_passes_test`
+checks read the role from memory at no cost. Because the role arrives with
+the user row, a profile edit applies from the next request on and nothing
+needs invalidating. A user loaded any other way has the role queried once
+and kept on the object. Users without a profile have no role.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.decorators import user_passes_test
+
+from bookshelf.models import UserProfile
+
+
+def get_role(user):
+    """The role of `user`, or None for anonymous users and missing profiles."""
+    if not user.is_authenticated:
+        return None
+    if not hasattr(user, '_role_cache'):
+        if get_user_model().userprofile.is_cached(user):
+            profile = getattr(user, 'userprofile', None)
+            user._role_cache = profile.role if profile else None
+        else:
+            user._role_cache = (
+                UserProfile.objects.filter(user_id=user.pk)
+                .values_list('role', flat=True)
+                .first()
+            )
+    return user._role_cache
+
+
+def has_role(user, *roles):
+    """Whether `user` holds any of `roles`."""
+    return get_role(user) in roles
+
+
+def role_required(*roles, **kwargs):
+    """user_passes_test() for users holding any of `roles`."""
+    return user_passes_test(lambda user: has_role(user, *roles), **kwargs)
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookshelf.models import Book
+
+from .listing import invalidate_book_list
+
+
+@receiver([post_save, post_delete], sender=Book)
+def invalidate_book_list_pages(sender, instance, **kwargs):
+    invalidate_book_list()
@@ -1,3 +1,122 @@
-from django.test import TestCase
+from django.contrib.auth import get_user
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, override_settings
 
-# Create your tests here.
+from bookshelf.backends import CachedPermissionsBackend
+from bookshelf.models import Book, CustomUser as User, Library, UserProfile
+
+from .listing import MAX_CURSOR, BookPage, get_book_list_version, parse_cursor
+from .roles import get_role, has_role, role_required
+
+
+# Query counts below are the app's own; the shared cache backend would add its
+# queries to them.
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class RoleTests(TestCase):
+    # Runs against the configured CACHES: a role check that went through the
+    # shared database cache would show up as a query.
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='librarian@example.com', username='librarian', date_of_birth='2000-01-01',
+        )
+        self.profile = UserProfile.objects.create(user=self.user, role='Librarian')
+
+    def fresh_user(self):
+        """The user as a new request loads it."""
+        return CachedPermissionsBackend().get_user(self.user.pk)
+
+    def test_role_comes_with_the_user(self):
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role(user), 'Librarian')
+            self.assertTrue(has_role(user, 'Librarian'))
+            self.assertFalse(has_role(user, 'Admin'))
+
+    def test_request_user_has_role_without_queries(self):
+        self.client.force_login(self.user)
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        user = get_user(request)
+        with self.assertNumQueries(0):
+            self.assertTrue(has_role(user, 'Librarian'))
+
+    def test_other_users_query_once(self):
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_role(user), 'Librarian')
+            self.assertFalse(has_role(user, 'Admin'))
+
+    def test_multiple_roles_in_one_check(self):
+        user = self.fresh_user()
+        self.assertTrue(has_role(user, 'Admin', 'Librarian'))
+        self.assertFalse(has_role(user, 'Admin', 'Member'))
+
+        @role_required('Admin', 'Librarian')
+        def view(request):
+            return HttpResponse('ok')
+        request = RequestFactory().get('/')
+        request.user = user
+        with self.assertNumQueries(0):
+            self.assertEqual(view(request).status_code, 200)
+
+    def test_profile_save_is_seen_by_the_next_request(self):
+        get_role(self.fresh_user())
+        self.profile.role = 'Admin'
+        self.profile.save()
+        self.assertEqual(get_role(self.fresh_user()), 'Admin')
+
+    def test_missing_profile_and_anonymous_have_no_role(self):
+        self.profile.delete()
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_role(user))
+            self.assertFalse(has_role(user, 'Member'))
+            self.assertFalse(has_role(AnonymousUser(), 'Member'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BookListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        library = Library.objects.create(name='Central', location='Main St')
+        self.books = [
+            Book.objects.create(
+                title=f'Book {i}', author='Octavia E. Butler', isbn=f'97800000000{i:02d}',
+                library=library, published_date='1979-06-01',
+            )
+            for i in range(5)
+        ]
+
+    def render(self, after=None, size=2):
+        # What list_books renders, with a smaller page
+        return render_to_string('relationship_app/list_books.html', {
+            'page': BookPage(after=parse_cursor(after), size=size),
+            'book_list_version': get_book_list_version(),
+        })
+
+    def test_keyset_pages_without_per_row_queries(self):
+        with self.assertNumQueries(1):
+            first = self.render()
+        self.assertIn('Book 1 by Octavia E. Butler', first)
+        self.assertNotIn('Book 2', first)
+        self.assertIn(f'?after={self.books[1].pk}', first)
+        self.assertNotIn('Next page', self.render(after=str(self.books[3].pk)))
+
+    def test_out_of_range_cursor_starts_at_first_page(self):
+        for value in ['not-a-number', '0', '-5', str(MAX_CURSOR + 1), '9' * 40]:
+            self.assertIsNone(parse_cursor(value))
+            self.assertIn('Book 0', self.render(after=value))
+        self.assertEqual(parse_cursor(str(MAX_CURSOR)), MAX_CURSOR)
+
+    def test_cached_pages_follow_writes(self):
+        self.render()
+        with self.assertNumQueries(0):
+            self.assertIn('Book 0', self.render())
+        self.books[0].title = 'Kindred'
+        self.books[0].save()
+        self.assertIn('Kindred', self.render())
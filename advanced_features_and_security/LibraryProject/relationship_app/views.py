@@ -14,6 +14,9 @@ from django.http import HttpResponseForbidden
 from django.contrib.auth.mixins import PermissionRequiredMixin, LoginRequiredMixin
 from django.urls import reverse_lazy
 
+from .listing import BookPage, get_book_list_version, parse_cursor
+from .roles import has_role
+
 
 # from .forms import BookForm
 
@@ -54,13 +57,13 @@ def register(request):
 
 
 def is_admin(user):
-    return user.userprofile.role == 'Admin'
+    return has_role(user, 'Admin')
 
 def is_librarian(user):
-    return user.userprofile.role == 'Librarian'
+    return has_role(user, 'Librarian')
 
 def is_member(user):
-    return user.userprofile.role == 'Member'
+    return has_role(user, 'Member')
 
 
 @user_passes_test(is_admin)
@@ -115,8 +118,11 @@ def delete_book(request, book_id):
 # View to list books - requires can_view permission
 @permission_required('bookshelf.can_view', raise_exception=True)
 def list_books(request):
-    books = Book.objects.all()
-    return render(request, 'relationship_app/list_books.html', {'books': books})
+    page = BookPage(after=parse_cursor(request.GET.get('after')))
+    return render(request, 'relationship_app/list_books.html', {
+        'page': page,
+        'book_list_version': get_book_list_version(),
+    })
 
 # Class-based view for library detail - requires can_view permission
 class LibraryDetailView(PermissionRequiredMixin, DetailView):
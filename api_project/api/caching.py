@@ -0,0 +1,99 @@
+"""
+HTTP caching for the book endpoints.
+
+Book has no modification timestamp, so ConditionalGetMixin validates
+list and retrieve responses by ETag alone. The ETag is built from the
+request path, the user and the BOOKS_VERSION counter, which every book
+write bumps. A client that sends a matching If-None-Match gets
+304 Not Modified before the queryset is evaluated or serialized.
+
+The counter lives in the cache, so every worker must share that cache
+(see check_shared_cache). A version is a random token rather than a
+number. A counter that was evicted therefore never comes back with a
+value that stale ETags still carry.
+"""
+import hashlib
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import quote_etag
+from rest_framework.response import Response
+
+
+VERSION_KEY_PREFIX = 'version:'
+
+BOOKS_VERSION = 'books'
+
+
+def get_version(name):
+    """Return the current value of the named version counter."""
+    return cache.get_or_set(VERSION_KEY_PREFIX + name, lambda: uuid4().hex, timeout=None)
+
+
+def bump_version(name):
+    """Invalidate everything derived from the named version counter."""
+    cache.set(VERSION_KEY_PREFIX + name, uuid4().hex, timeout=None)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """A book write in one worker must change the ETags every worker sends."""
+    if settings.CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache':
+        return []
+    return [checks.Error(
+        'The default cache is local to each process, so a book write in one '
+        'worker leaves the other workers answering 304 with stale books.',
+        hint='Use a shared backend such as DatabaseCache or RedisCache.',
+        id='api.E001',
+    )]
+
+
+class ConditionalGetMixin:
+    """Answer list and retrieve with 304 while `version_key` is unchanged."""
+    version_key = BOOKS_VERSION
+    cache_max_age = 60
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(
+            request, [], lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        # get_object first, so books the user cannot see still 404
+        instance = self.get_object()
+        return self._conditional_response(
+            request, [instance.pk],
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def get_etag(self, request, parts):
+        user = request.user
+        parts = list(parts) + [
+            request.get_full_path(),
+            user.pk if user.is_authenticated else 'anon',
+            get_version(self.version_key),
+        ]
+        digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False)
+        return quote_etag(digest.hexdigest())
+
+    def _conditional_response(self, request, parts, render):
+        etag = self.get_etag(request, parts)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = render()
+
+        response['ETag'] = etag
+        if request.user.is_authenticated:
+            # Per-user payloads must never land in a shared cache.
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, max_age=self.cache_max_age)
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
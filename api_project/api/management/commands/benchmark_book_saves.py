@@ -0,0 +1,53 @@
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.http import HttpRequest
+
+from api.models import Book, current_request
+
+
+class Command(BaseCommand):
+    help = 'Measures Book.save() and bulk_create throughput; all writes are rolled back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=100_000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = options['books']
+
+        def books():
+            return (
+                Book(title=f'Book {i}', author='Benchmark', published_date=date(2000, 1, 1))
+                for i in range(count)
+            )
+
+        with transaction.atomic():
+            user = User.objects.create_user(username='benchmark-book-saves')
+
+            def run(label, func):
+                start = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f'{label}: {count} books in {elapsed:.2f}s, {count / elapsed:,.0f} books/sec')
+
+            def save_all():
+                for book in books():
+                    book.save()
+
+            run('save() outside a request', save_all)
+
+            request = HttpRequest()
+            request.user = user
+            token = current_request.set(request)
+            try:
+                run('save() with a request user', save_all)
+                run('bulk_create with a request user',
+                    lambda: Book.objects.bulk_create(books(), batch_size=options['batch_size']))
+            finally:
+                current_request.reset(token)
+
+            transaction.set_rollback(True)
@@ -0,0 +1,19 @@
+from .models import current_request
+
+
+class CurrentUserMiddleware:
+    """
+    Expose the requesting user to Book saves through the current_request
+    contextvar. The request itself is stored, not request.user, because DRF
+    authenticates later and replaces request.user with its own result.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
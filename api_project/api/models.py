@@ -1,7 +1,34 @@
+from contextvars import ContextVar
+
 from django.db import models
-from httpcore import request
 from django.contrib.auth.models import User
 
+
+# The current request, set by CurrentUserMiddleware. Its user is read when a
+# book needs an owner: by then DRF has authenticated the request and replaced
+# the session-only request.user with the token (or session) user.
+current_request = ContextVar('api_current_request', default=None)
+
+
+class BookManager(models.Manager):
+    def current_owner_id(self):
+        """Primary key of the requesting user, or None outside authenticated requests."""
+        user = getattr(current_request.get(), 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.pk
+        return None
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if any(obj.owner_id is None for obj in objs):
+            owner_id = self.current_owner_id()
+            if owner_id is not None:
+                for obj in objs:
+                    if obj.owner_id is None:
+                        obj.owner_id = owner_id
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 # Create your models here.
 class Book(models.Model):
     title = models.CharField(max_length=200)
@@ -13,20 +40,25 @@ class Book(models.Model):
         on_delete=models.CASCADE, 
         related_name='books',
         null=True,  # Allow null for existing records
-        blank=True
+        blank=True,
+        db_index=False,  # book_owner_published_idx covers owner lookups
     )
+
+    objects = BookManager()
+
     def __str__(self):
         return self.title
     
     def save(self, *args, **kwargs):
-        # Auto-set owner if not specified
-        if not self.owner_id:
-            from django.contrib.auth import get_user
-            try:
-                self.owner = get_user(self)
-            except:
-                pass
+        # New books default to the requesting user; outside a request
+        # (shell, fixtures, imports) they stay public.
+        if self._state.adding and self.owner_id is None:
+            self.owner_id = Book.objects.current_owner_id()
         super().save(*args, **kwargs)
     
     class Meta:
-        ordering = ['title']
\ No newline at end of file
+        ordering = ['title']
+        indexes = [
+            # Serves the visibility predicate and its newest-first ordering
+            models.Index(fields=['owner', 'published_date'], name='book_owner_published_idx'),
+        ]
\ No newline at end of file
@@ -1,6 +1,36 @@
+from django.db.models import Q
 from rest_framework import permissions
+from rest_framework.permissions import AND, NOT, OR
 
-class IsOwnerOrReadOnly(permissions.BasePermission):
+
+# Matches no rows; the predicate of a permission that denies the request
+NOTHING = Q(pk__in=[])
+
+
+class OwnerPermission(permissions.BasePermission):
+    """
+    Base for permissions granted to the owner of an object.
+
+    Ownership is checked on the `<owner_field>_id` column so that no user
+    row is fetched, and `queryset_predicate()` expresses the same rule as a
+    Q object for checking a whole list at once.
+    """
+    owner_field = 'owner'
+
+    def is_owner(self, request, obj):
+        # AnonymousUser.pk is None, which would match every unowned object
+        if not request.user.is_authenticated:
+            return False
+        return getattr(obj, f'{self.owner_field}_id') == request.user.pk
+
+    def queryset_predicate(self, request, view):
+        """Q object for the rows this permission allows, None for all rows."""
+        if not request.user.is_authenticated:
+            return NOTHING
+        return Q(**{f'{self.owner_field}_id': request.user.pk})
+
+
+class IsOwnerOrReadOnly(OwnerPermission):
     """
     Custom permission to only allow owners of an object to edit it.
     """
@@ -8,9 +38,14 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         # Read permissions are allowed to any request
         if request.method in permissions.SAFE_METHODS:
             return True
-        
+
         # Write permissions are only allowed to the owner
-        return obj.owner == request.user
+        return self.is_owner(request, obj)
+
+    def queryset_predicate(self, request, view):
+        if request.method in permissions.SAFE_METHODS:
+            return None
+        return super().queryset_predicate(request, view)
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """
@@ -20,15 +55,79 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         # Read permissions are allowed to any request
         if request.method in permissions.SAFE_METHODS:
             return True
-        
+
         # Write permissions are only allowed to admin users
         return request.user and request.user.is_staff
 
-class IsBookOwner(permissions.BasePermission):
+class IsBookOwner(OwnerPermission):
     """
     Custom permission to check if the user is the owner of the book.
     Assumes Book model has an 'owner' field (Foreign Key to User).
     """
     def has_object_permission(self, request, view, obj):
         # Check if the book belongs to the user
-        return obj.owner == request.user
\ No newline at end of file
+        return self.is_owner(request, obj)
+
+
+def permission_predicate(permission, request, view):
+    """
+    The Q object selecting the rows `permission` allows for this request,
+    or None when it allows every row.
+
+    Composed permissions (`A | B`, `A & B`, `~A`) are combined operand by
+    operand. Permissions without a `queryset_predicate()` only have a
+    request-level rule, so they allow every row or none.
+    """
+    if isinstance(permission, (AND, OR)):
+        left = permission_predicate(permission.op1, request, view)
+        right = permission_predicate(permission.op2, request, view)
+        if isinstance(permission, OR):
+            return None if left is None or right is None else left | right
+        if left is None or right is None:
+            return right if left is None else left
+        return left & right
+    if isinstance(permission, NOT):
+        predicate = permission_predicate(permission.op1, request, view)
+        return NOTHING if predicate is None else ~predicate
+    if hasattr(permission, 'queryset_predicate'):
+        return permission.queryset_predicate(request, view)
+    return None if permission.has_permission(request, view) else NOTHING
+
+
+class ActionPermissionsMixin:
+    """
+    Picks permissions per action from `permission_classes_by_action`,
+    falling back to `permission_classes`.
+
+    Permissions are stateless, so the instances for each action are built
+    once per view class instead of on every request.
+    """
+    permission_classes_by_action = {}
+
+    def get_action_permissions(self, action):
+        cls = type(self)
+        instances = cls.__dict__.get('_action_permissions')
+        if instances is None:
+            instances = {}
+            cls._action_permissions = instances
+        try:
+            return instances[action]
+        except KeyError:
+            classes = self.permission_classes_by_action.get(action, self.permission_classes)
+            instances[action] = permissions = tuple(permission() for permission in classes)
+            return permissions
+
+    def get_permissions(self):
+        return self.get_action_permissions(self.action)
+
+    def filter_permitted(self, queryset, action):
+        """
+        Narrow `queryset` to the objects the permissions of `action` allow,
+        as one predicate instead of an object check per row.
+        """
+        predicate = None
+        for permission in self.get_action_permissions(action):
+            rule = permission_predicate(permission, self.request, self)
+            if rule is not None:
+                predicate = rule if predicate is None else predicate & rule
+        return queryset if predicate is None else queryset.filter(predicate)
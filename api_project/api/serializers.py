@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from api_project.fast_serializers import FastReadSerializer
 from .models import Book
 from django.contrib.auth.models import User
 
@@ -8,6 +9,12 @@ class BookSerializer(serializers.ModelSerializer):
         model = Book
         fields = '__all__'
 
+
+# Read-only fast path producing BookSerializer's output, used by exports
+book_list_serializer = FastReadSerializer(
+    Book, ['id', 'title', 'author', 'published_date', 'created_at', 'owner']
+)
+
 class UserSerializer(serializers.ModelSerializer):
     # Write-only password field so it won't be returned in API responses
     password = serializers.CharField(write_only=True)
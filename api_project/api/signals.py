@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import BOOKS_VERSION, bump_version
+from .models import Book
+
+
+@receiver([post_save, post_delete], sender=Book)
+def invalidate_book_cache(sender, instance, **kwargs):
+    bump_version(BOOKS_VERSION)
@@ -1,3 +1,250 @@
-from django.test import TestCase
+import json
+from datetime import date
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.permissions import IsAdminUser
+from rest_framework.test import APIClient
+
+from .caching import BOOKS_VERSION, VERSION_KEY_PREFIX, bump_version, check_shared_cache
+from .middleware import CurrentUserMiddleware
+from .models import Book, current_request
+from .permissions import IsBookOwner, IsOwnerOrReadOnly, permission_predicate
+from .serializers import BookSerializer, book_list_serializer
+from .views import BookViewSet
+from .visibility import visible_books, visible_queryset
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='owner', password='pass12345')
+        self.book = Book.objects.create(
+            title='Public Book', author='Someone', published_date=date(2020, 1, 1)
+        )
+
+    def test_unchanged_list_returns_304(self):
+        etag = self.client.get('/api/books/')['ETag']
+        response = self.client.get('/api/books/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_is_per_user(self):
+        anonymous = self.client.get('/api/books/')
+        self.client.force_authenticate(user=self.user)
+        authenticated = self.client.get('/api/books/')
+
+        self.assertNotEqual(anonymous['ETag'], authenticated['ETag'])
+        self.assertIn('public', anonymous['Cache-Control'])
+        self.assertIn('private', authenticated['Cache-Control'])
+
+    def test_write_invalidates_etag(self):
+        etag = self.client.get(f'/api/books/{self.book.pk}/')['ETag']
+        Book.objects.create(title='Another', author='Else', published_date=date(2021, 1, 1))
+
+        response = self.client.get(f'/api/books/{self.book.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_evicted_version_does_not_revive_old_etags(self):
+        etags = {self.client.get('/api/books/')['ETag']}
+        for _ in range(3):
+            bump_version(BOOKS_VERSION)
+            etags.add(self.client.get('/api/books/')['ETag'])
+            # Eviction restarts the counter, which must not repeat a value
+            cache.delete(VERSION_KEY_PREFIX + BOOKS_VERSION)
+            etags.add(self.client.get('/api/books/')['ETag'])
+        self.assertEqual(len(etags), 7)
+
+    def test_process_local_cache_is_rejected(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['api.E001'])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='reader', password='pass12345')
+        Book.objects.create(title='Public', author='A', published_date=date(2020, 1, 1))
+        Book.objects.create(title='Private', author='B', published_date=date(2021, 1, 1), owner=self.user)
+
+    def test_fast_serializer_matches_model_serializer(self):
+        queryset = Book.objects.all()
+        self.assertEqual(
+            book_list_serializer.serialize(queryset),
+            [dict(item) for item in BookSerializer(queryset, many=True).data],
+        )
+
+    def test_export_respects_visibility(self):
+        response = self.client.get('/api/books/export/')
+        titles = [json.loads(line)['title'] for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(titles, ['Public'])
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/books/export/')
+        titles = [json.loads(line)['title'] for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(titles, ['Private', 'Public'])
+
+
+class VisibilityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', password='pass12345')
+        self.other = User.objects.create_user(username='other', password='pass12345')
+        self.staff = User.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        Book.objects.create(title='Public', author='A', published_date=date(2020, 1, 1))
+        Book.objects.create(title='Mine', author='B', published_date=date(2021, 1, 1), owner=self.owner)
+        Book.objects.create(title='Theirs', author='C', published_date=date(2022, 1, 1), owner=self.other)
+
+    def titles(self, user):
+        return sorted(visible_books(user).values_list('title', flat=True))
+
+    def test_visibility_rules(self):
+        self.assertEqual(self.titles(AnonymousUser()), ['Public'])
+        self.assertEqual(self.titles(self.owner), ['Mine', 'Public'])
+        self.assertEqual(self.titles(self.staff), ['Mine', 'Public', 'Theirs'])
+
+    def test_predicate_uses_owner_index(self):
+        plan = visible_books(self.owner).order_by('-published_date').explain()
+        self.assertIn('book_owner_published_idx', plan)
+
+    def test_hot_user_ids_cached_until_books_change(self):
+        with patch('api.visibility.HOT_USER_THRESHOLD', 1):
+            visible_queryset(self.owner, use_cache=True)
+            cached = visible_queryset(self.owner, use_cache=True)
+            self.assertIn('"api_book"."id" IN', str(cached.query))
+            self.assertEqual(sorted(cached.values_list('title', flat=True)), ['Mine', 'Public'])
+
+            Book.objects.create(title='New', author='D', published_date=date(2023, 1, 1), owner=self.owner)
+            self.assertIn('New', visible_queryset(self.owner, use_cache=True).values_list('title', flat=True))
+
+
+class OwnerInjectionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='writer', password='pass12345')
+
+    def new_book(self, title='Book'):
+        return Book(title=title, author='A', published_date=date(2020, 1, 1))
+
+    def request_for(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+
+    def test_books_saved_outside_requests_stay_public(self):
+        book = self.new_book()
+        book.save()
+        self.assertIsNone(book.owner_id)
+
+    def test_request_user_becomes_owner(self):
+        def view(request):
+            book = self.new_book()
+            book.save()
+            Book.objects.bulk_create([self.new_book('Bulk')])
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.user = self.user
+        CurrentUserMiddleware(view)(request)
+
+        self.assertEqual(Book.objects.get(title='Book').owner, self.user)
+        self.assertEqual(Book.objects.get(title='Bulk').owner, self.user)
+        self.assertIsNone(current_request.get())
+
+    def test_token_authenticated_user_becomes_owner(self):
+        token = Token.objects.create(user=self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        data = {'title': 'Via token', 'author': 'A', 'published_date': '2020-01-01'}
+        # Leave the owner to the model, as any other save in the request would
+        with patch.object(BookViewSet, 'perform_create', lambda view, serializer: serializer.save()):
+            response = client.post('/api/books/', data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Book.objects.get(title='Via token').owner, self.user)
+
+    def test_anonymous_requests_and_updates_do_not_assign_owner(self):
+        book = self.new_book()
+        book.save()
+        token = current_request.set(self.request_for(AnonymousUser()))
+        try:
+            self.new_book('Anonymous').save()
+        finally:
+            current_request.reset(token)
+        token = current_request.set(self.request_for(self.user))
+        try:
+            book.title = 'Renamed'
+            book.save()
+        finally:
+            current_request.reset(token)
+        self.assertFalse(Book.objects.filter(owner__isnull=False).exists())
+
+
+class PermissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', password='pass12345')
+        self.other = User.objects.create_user(username='other', password='pass12345')
+        self.staff = User.objects.create_user(username='staff', password='pass12345', is_staff=True)
+        self.book = Book.objects.create(title='Mine', author='B', published_date=date(2021, 1, 1), owner=self.owner)
+        Book.objects.create(title='Public', author='A', published_date=date(2020, 1, 1))
+        Book.objects.create(title='Theirs', author='C', published_date=date(2022, 1, 1), owner=self.other)
+
+    def editable_titles(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/books/editable/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        return sorted(book['title'] for book in results)
+
+    def test_owner_check_does_not_load_user(self):
+        request = RequestFactory().patch('/')
+        request.user = self.owner
+        book = Book.objects.get(pk=self.book.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(IsBookOwner().has_object_permission(request, None, book))
+            self.assertTrue(IsOwnerOrReadOnly().has_object_permission(request, None, book))
+        request.user = self.other
+        self.assertFalse(IsBookOwner().has_object_permission(request, None, book))
+
+    def test_anonymous_user_does_not_own_unowned_books(self):
+        request = RequestFactory().patch('/')
+        request.user = AnonymousUser()
+        book = Book.objects.get(title='Public')
+        self.assertIsNone(book.owner_id)
+        self.assertFalse(IsBookOwner().has_object_permission(request, None, book))
+        self.assertFalse(IsOwnerOrReadOnly().has_object_permission(request, None, book))
+
+    def test_update_permissions(self):
+        client = APIClient()
+        url = f'/api/books/{self.book.pk}/'
+        client.force_authenticate(self.other)
+        self.assertEqual(client.patch(url, {'title': 'X'}).status_code, status.HTTP_404_NOT_FOUND)
+        client.force_authenticate(self.owner)
+        self.assertEqual(client.patch(url, {'title': 'Renamed'}).status_code, status.HTTP_200_OK)
+        client.force_authenticate(self.staff)
+        self.assertEqual(client.patch(url, {'title': 'Again'}).status_code, status.HTTP_200_OK)
+
+    def test_permissions_are_built_once_per_action(self):
+        BookViewSet.__dict__.get('_action_permissions', {}).clear()
+        with patch.object(IsAdminUser, '__init__', return_value=None) as init:
+            for _ in range(3):
+                APIClient().delete(f'/api/books/{self.book.pk}/')
+        self.assertEqual(init.call_count, 1)
+
+    def test_editable_is_one_predicate(self):
+        self.assertEqual(self.editable_titles(self.owner), ['Mine'])
+        self.assertEqual(self.editable_titles(self.staff), ['Mine', 'Public', 'Theirs'])
+
+        request = RequestFactory().get('/')
+        request.user = self.owner
+        predicate = permission_predicate((IsBookOwner | IsAdminUser)(), request, None)
+        self.assertEqual(list(Book.objects.filter(predicate)), [self.book])
+        request.user = self.staff
+        self.assertIsNone(permission_predicate((IsBookOwner | IsAdminUser)(), request, None))
@@ -1,58 +1,68 @@
 from django.shortcuts import render
 from .models import Book
-from .serializers import BookSerializer
+from .serializers import BookSerializer, book_list_serializer
 from rest_framework import generics, viewsets, filters
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
-from .permissions import IsAdminOrReadOnly, IsBookOwner
+from .permissions import ActionPermissionsMixin, IsAdminOrReadOnly, IsBookOwner
+from .caching import BOOKS_VERSION, ConditionalGetMixin
+from .visibility import visible_queryset
+from api_project.exports import ndjson_response
 
 # Create your views here.
 
 # Viewsets for full CRUD operations
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(ActionPermissionsMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    version_key = BOOKS_VERSION
+
+    # Permission classes per action; instances are reused across requests
+    permission_classes_by_action = {
+        # Allow anyone to view books
+        'list': [AllowAny],
+        'retrieve': [AllowAny],
+        'export': [AllowAny],
+        # Only authenticated users can create books
+        'create': [IsAuthenticated],
+        # Only owners or admins can update books
+        'update': [IsAuthenticated, IsBookOwner | IsAdminUser],
+        'partial_update': [IsAuthenticated, IsBookOwner | IsAdminUser],
+        # Only admins can delete books
+        'destroy': [IsAdminUser],
+    }
+    # Default to requiring authentication
+    permission_classes = [IsAuthenticated]
+
+    # Cache the visible id set of users who list books many times a minute
+    cache_visible_ids = False
 
-    # Set permission classes based on action
-    def get_permissions(self):
-        """
-        Instantiates and returns the list of permissions that this view requires.
-        """
-        if self.action == 'list' or self.action == 'retrieve':
-            # Allow anyone to view books
-            permission_classes = [AllowAny]
-        elif self.action == 'create':
-            # Only authenticated users can create books
-            permission_classes = [IsAuthenticated]
-        elif self.action == 'update' or self.action == 'partial_update':
-            # Only owners or admins can update books
-            permission_classes = [IsAuthenticated, IsBookOwner | IsAdminUser]
-        elif self.action == 'destroy':
-            # Only admins can delete books
-            permission_classes = [IsAdminUser]
-        else:
-            # Default to requiring authentication
-            permission_classes = [IsAuthenticated]
-        
-        return [permission() for permission in permission_classes]
-    
     # Filter queryset based on user permissions
     def get_queryset(self):
-        user = self.request.user
-        
-        if user.is_staff:
-            # Admins can see all books
-            return Book.objects.all()
-        elif user.is_authenticated:
-            # Authenticated users can see their own books + public books
-            return Book.objects.filter(owner=user) | Book.objects.filter(owner__isnull=True)
-        else:
-            # Anonymous users can only see public books
-            return Book.objects.filter(owner__isnull=True)
+        # Admins see all books, users their own + public books, anonymous
+        # users public books only; one predicate on owner_id.
+        return visible_queryset(self.request.user, use_cache=self.cache_visible_ids)
     
     # Auto-set owner when creating a book
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
+
+    # Stream every visible book as NDJSON
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        return ndjson_response(book_list_serializer, queryset, 'books.ndjson')
+
+    # Books the current user may update, checked as one predicate
+    @action(detail=False, methods=['get'])
+    def editable(self, request):
+        queryset = self.filter_permitted(self.filter_queryset(self.get_queryset()), 'update')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['author']
     search_fields = ['title', 'author', 'isbn']
@@ -0,0 +1,30 @@
+"""
+Streaming NDJSON export for the book API.
+
+Visible books are pulled with `.iterator(chunk_size=...)` and written one
+JSON document per line, so exporting every book a user can see keeps
+memory flat however many there are.
+"""
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+from .renderers import ORJSONRenderer
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def ndjson_response(fast_serializer, queryset, filename, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream FastReadSerializer dicts for `queryset` as newline-delimited JSON."""
+    render_row = fast_serializer.render_row
+    render = ORJSONRenderer().render
+    rows = fast_serializer.values(queryset).iterator(chunk_size=chunk_size)
+
+    def lines():
+        while chunk := list(islice(rows, chunk_size)):
+            yield b''.join(render(render_row(row)) + b'\n' for row in chunk)
+
+    response = StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
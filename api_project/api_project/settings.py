@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,6 +50,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.CurrentUserMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -84,6 +86,34 @@ DATABASES = {
 }
 
 
+# Cache
+# Shared by every worker: ETags and cached payloads are keyed on version
+# counters that any process may bump. Create the table with
+# `python manage.py createcachetable`.
+# The database backend culls itself down to MAX_ENTRIES on every write and
+# defaults to 300, fewer than one visible-id set per active user. Set
+# DJANGO_REDIS_URL to use Redis, which skips the row count on each write.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {
+            # One visible-id set per user, plus the version keys
+            'MAX_ENTRIES': 50_000,
+            # Cull a tenth of the entries when full rather than a third
+            'CULL_FREQUENCY': 10,
+        },
+    }
+}
+
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['DJANGO_REDIS_URL'],
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -134,6 +164,15 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',  # Default: Require authentication
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api_project.renderers.ORJSONRenderer',  # orjson when installed, stdlib json otherwise
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api_project.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -82,6 +83,42 @@ DATABASES = {
 }
 
 
+# Cache
+# Shared by every worker: cached pages and stats are keyed on version
+# counters that any process may bump. Create the table with
+# `python manage.py createcachetable`.
+# The database backend culls itself down to MAX_ENTRIES on every write and
+# defaults to 300, which the book list pages of a large catalogue outgrow.
+# Set DJANGO_REDIS_URL to use Redis, which skips the row count on each
+# write.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {
+            # Book list pages and library stats
+            'MAX_ENTRIES': 50_000,
+            # Cull a tenth of the entries when full rather than a third
+            'CULL_FREQUENCY': 10,
+        },
+    }
+}
+
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['DJANGO_REDIS_URL'],
+    }
+
+
+# Authentication
+# Loads each request's user together with their profile, so role checks
+# need no query of their own.
+
+AUTHENTICATION_BACKENDS = ['relationship_app.backends.ProfileModelBackend']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class RelationshipAppConfig(AppConfig):
     name = 'relationship_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,13 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+
+
+class ProfileModelBackend(ModelBackend):
+    """ModelBackend that loads the user's profile, and so their role, in the same query."""
+
+    def get_user(self, user_id):
+        try:
+            user = User._default_manager.select_related('userprofile').get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,94 @@
+"""
+Library inventory queries.
+
+Lookups by name join in the database instead of fetching the named row
+first; only an empty result costs a second query, to tell an unknown name
+(DoesNotExist, as a plain get() would raise) from one with nothing in it.
+Library pages prefetch their books with each book's author in one
+extra query. The per-library book count and author histogram come from
+one aggregate query and are cached. Adding or removing a library's books
+drops that library's entry. Book and author writes can touch any library,
+so they bump a version counter that is part of every key (see signals.py).
+"""
+from django.core.cache import cache
+from django.db.models import Count, Prefetch
+
+from .models import Author, Book, Library, Librarian
+from .versions import bump_version, get_version
+
+
+INVENTORY_VERSION = 'library-inventory'
+STATS_TIMEOUT = 60 * 60
+
+
+def _named(books, model, name):
+    """`books`, evaluated, or DoesNotExist when no `model` has that name."""
+    if not books and not model.objects.filter(name=name).exists():
+        raise model.DoesNotExist(f'{model._meta.object_name} matching query does not exist.')
+    return books
+
+
+def books_by_author(author_name):
+    return _named(Book.objects.filter(author__name=author_name), Author, author_name)
+
+
+def books_in_library(library_name):
+    return _named(Book.objects.filter(libraries__name=library_name), Library, library_name)
+
+
+def librarian_for_library(library_name):
+    try:
+        return Librarian.objects.select_related('library').get(library__name=library_name)
+    except Librarian.DoesNotExist:
+        if not Library.objects.filter(name=library_name).exists():
+            raise Library.DoesNotExist('Library matching query does not exist.') from None
+        raise
+
+
+def library_detail_queryset():
+    """Libraries with their books, ordered by title, and each book's author."""
+    books = Book.objects.select_related('author').order_by('title', 'pk')
+    return Library.objects.prefetch_related(Prefetch('books', queryset=books))
+
+
+def get_inventory_version():
+    return get_version(INVENTORY_VERSION)
+
+
+def invalidate_inventory():
+    """Make the stats of every library stale."""
+    bump_version(INVENTORY_VERSION)
+
+
+def stats_cache_key(library_id, version=None):
+    if version is None:
+        version = get_inventory_version()
+    return f'library-stats:{library_id}:{version}'
+
+
+def forget_library_stats(library_ids):
+    version = get_inventory_version()
+    cache.delete_many([stats_cache_key(pk, version) for pk in library_ids])
+
+
+def library_stats(library_id):
+    """
+    {'book_count': n, 'authors': [(author name, books), ...]} for a library,
+    authors with the most books first.
+    """
+    key = stats_cache_key(library_id)
+    stats = cache.get(key)
+    if stats is None:
+        # Filtering before annotating counts only this library's books.
+        authors = list(
+            Author.objects.filter(books__libraries=library_id)
+            .annotate(book_count=Count('books'))
+            .order_by('-book_count', 'name')
+            .values_list('name', 'book_count')
+        )
+        stats = {
+            'book_count': sum(count for _, count in authors),
+            'authors': authors,
+        }
+        cache.set(key, stats, STATS_TIMEOUT)
+    return stats
@@ -1,19 +1,16 @@
-from relationship_app.models import Author, Book, Library, Librarian
+from relationship_app.inventory import books_by_author, books_in_library, librarian_for_library
 
 
 # 1️⃣ Query all books by a specific author
 def get_books_by_author(author_name):
-    author = Author.objects.get(name=author_name)
-    return Book.objects.filter(author=author)
+    return books_by_author(author_name)
 
 
 # 2️⃣ List all books in a library
 def get_books_in_library(library_name):
-    library = Library.objects.get(name=library_name)
-    return library.books.all()
+    return books_in_library(library_name)
 
 
 # 3️⃣ Retrieve the librarian for a library
 def get_librarian_for_library(library_name):
-    library = Library.objects.get(name=library_name)
-    return Librarian.objects.get(library=library)
+    return librarian_for_library(library_name)
@@ -0,0 +1,41 @@
+"""
+Role resolution for the role-based views.
+
+ProfileModelBackend loads each request's user together with their
+UserProfile (see backends.py), so `user_passes_test` checks read the role
+from memory and cost no queries. The role is as current as the user row
+itself, so there is nothing to invalidate. Users loaded some other way
+have their role queried once and kept on the user object. Users without a
+profile have no role.
+"""
+from django.contrib.auth.decorators import user_passes_test
+from django.contrib.auth.models import User
+
+from .models import UserProfile
+
+
+def get_role(user):
+    """The role of `user`, or None for anonymous users and missing profiles."""
+    if not user.is_authenticated:
+        return None
+    if not hasattr(user, '_role_cache'):
+        if User.userprofile.is_cached(user):
+            profile = getattr(user, 'userprofile', None)
+            user._role_cache = profile.role if profile else None
+        else:
+            user._role_cache = (
+                UserProfile.objects.filter(user_id=user.pk)
+                .values_list('role', flat=True)
+                .first()
+            )
+    return user._role_cache
+
+
+def has_role(user, *roles):
+    """Whether `user` holds any of `roles`."""
+    return get_role(user) in roles
+
+
+def role_required(*roles, **kwargs):
+    """user_passes_test() for users holding any of `roles`."""
+    return user_passes_test(lambda user: has_role(user, *roles), **kwargs)
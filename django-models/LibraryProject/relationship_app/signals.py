@@ -0,0 +1,34 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .inventory import forget_library_stats, invalidate_inventory
+from .listing import invalidate_book_list
+from .models import Author, Book, Library
+
+
+@receiver(m2m_changed, sender=Library.books.through)
+def invalidate_library_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        forget_library_stats([instance.pk])
+    elif pk_set:
+        # Changed from the book side; pk_set holds the libraries
+        forget_library_stats(pk_set)
+    else:
+        # A book's libraries were cleared and are no longer known
+        invalidate_inventory()
+
+
+@receiver([post_save, post_delete], sender=Book)
+@receiver([post_save, post_delete], sender=Author)
+def invalidate_inventory_stats(sender, instance, created=False, **kwargs):
+    # A new book is in no library yet and a new author has no books
+    if not created:
+        invalidate_inventory()
+
+
+@receiver([post_save, post_delete], sender=Book)
+@receiver([post_save, post_delete], sender=Author)
+def invalidate_book_list_pages(sender, instance, **kwargs):
+    invalidate_book_list()
@@ -1,3 +1,195 @@
-from django.test import TestCase
+from django.contrib.auth import get_user
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, override_settings
 
-# Create your tests here.
+from .backends import ProfileModelBackend
+from .inventory import (
+    books_by_author,
+    books_in_library,
+    librarian_for_library,
+    library_detail_queryset,
+    library_stats,
+)
+from .listing import MAX_CURSOR, BookPage, get_book_list_version, parse_cursor
+from .models import Author, Book, Library, Librarian, UserProfile
+from .roles import get_role, has_role, role_required
+
+
+# Query counts below are the app's own; the shared cache backend would add its
+# queries to them.
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class RoleTests(TestCase):
+    # Runs against the configured CACHES: a role check that went through the
+    # shared database cache would show up as a query.
+    def setUp(self):
+        self.user = User.objects.create_user(username='librarian')
+        self.profile = UserProfile.objects.create(user=self.user, role='Librarian')
+
+    def fresh_user(self):
+        """The user as a new request loads it."""
+        return ProfileModelBackend().get_user(self.user.pk)
+
+    def test_role_comes_with_the_user(self):
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role(user), 'Librarian')
+            self.assertTrue(has_role(user, 'Librarian'))
+            self.assertFalse(has_role(user, 'Admin'))
+
+    def test_request_user_has_role_without_queries(self):
+        self.client.force_login(self.user)
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        user = get_user(request)
+        with self.assertNumQueries(0):
+            self.assertTrue(has_role(user, 'Librarian'))
+
+    def test_other_users_query_once(self):
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_role(user), 'Librarian')
+            self.assertFalse(has_role(user, 'Admin'))
+
+    def test_multiple_roles_in_one_check(self):
+        user = self.fresh_user()
+        self.assertTrue(has_role(user, 'Admin', 'Librarian'))
+        self.assertFalse(has_role(user, 'Admin', 'Member'))
+
+        @role_required('Admin', 'Librarian')
+        def view(request):
+            return HttpResponse('ok')
+        request = RequestFactory().get('/')
+        request.user = user
+        with self.assertNumQueries(0):
+            self.assertEqual(view(request).status_code, 200)
+
+    def test_profile_save_is_seen_by_the_next_request(self):
+        get_role(self.fresh_user())
+        self.profile.role = 'Admin'
+        self.profile.save()
+        self.assertEqual(get_role(self.fresh_user()), 'Admin')
+
+    def test_missing_profile_and_anonymous_have_no_role(self):
+        self.profile.delete()
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_role(user))
+            self.assertFalse(has_role(user, 'Member'))
+            self.assertFalse(has_role(AnonymousUser(), 'Member'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class InventoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        le_guin = Author.objects.create(name='Ursula K. Le Guin')
+        banks = Author.objects.create(name='Iain M. Banks')
+        self.books = [
+            Book.objects.create(title='The Dispossessed', author=le_guin),
+            Book.objects.create(title='The Left Hand of Darkness', author=le_guin),
+            Book.objects.create(title='Excession', author=banks),
+        ]
+        self.library = Library.objects.create(name='Central')
+        self.library.books.set(self.books)
+        Librarian.objects.create(name='Ada', library=self.library)
+
+    def test_lookups_by_name_are_single_queries(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(len(books_by_author('Ursula K. Le Guin')), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(books_in_library('Central')), 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(librarian_for_library('Central').library.name, 'Central')
+
+    def test_unknown_names_raise_does_not_exist(self):
+        with self.assertRaises(Author.DoesNotExist):
+            books_by_author('Nobody')
+        with self.assertRaises(Library.DoesNotExist):
+            books_in_library('Nowhere')
+        with self.assertRaises(Library.DoesNotExist):
+            librarian_for_library('Nowhere')
+
+        Author.objects.create(name='Unpublished')
+        self.assertEqual(list(books_by_author('Unpublished')), [])
+        Library.objects.create(name='Branch')
+        self.assertEqual(list(books_in_library('Branch')), [])
+        with self.assertRaises(Librarian.DoesNotExist):
+            librarian_for_library('Branch')
+
+    def test_detail_prefetches_books_and_authors(self):
+        with self.assertNumQueries(2):
+            library = library_detail_queryset().get(pk=self.library.pk)
+            rows = [(book.title, book.author.name) for book in library.books.all()]
+        self.assertEqual(rows[0], ('Excession', 'Iain M. Banks'))
+
+    def test_stats_are_cached(self):
+        expected = {
+            'book_count': 3,
+            'authors': [('Ursula K. Le Guin', 2), ('Iain M. Banks', 1)],
+        }
+        with self.assertNumQueries(1):
+            self.assertEqual(library_stats(self.library.pk), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(library_stats(self.library.pk), expected)
+
+    def test_stats_follow_writes(self):
+        library_stats(self.library.pk)
+        self.library.books.remove(self.books[2])
+        self.assertEqual(library_stats(self.library.pk)['authors'], [('Ursula K. Le Guin', 2)])
+
+        self.books[2].libraries.add(self.library)
+        self.assertEqual(library_stats(self.library.pk)['book_count'], 3)
+
+        self.books[0].delete()
+        self.assertEqual(library_stats(self.library.pk)['book_count'], 2)
+
+        author = self.books[2].author
+        author.name = 'Iain Banks'
+        author.save()
+        self.assertIn(('Iain Banks', 1), library_stats(self.library.pk)['authors'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BookListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = Author.objects.create(name='Octavia E. Butler')
+        self.books = [Book.objects.create(title=f'Book {i}', author=author) for i in range(5)]
+
+    def render(self, after=None, size=2):
+        # What list_books renders, with a smaller page
+        return render_to_string('relationship_app/list_books.html', {
+            'page': BookPage(after=parse_cursor(after), size=size),
+            'book_list_version': get_book_list_version(),
+        })
+
+    def test_keyset_pages(self):
+        with self.assertNumQueries(1):
+            first = self.render()
+        self.assertIn('Book 1 by Octavia E. Butler', first)
+        self.assertNotIn('Book 2', first)
+        self.assertIn(f'?after={self.books[1].pk}', first)
+
+        last = self.render(after=str(self.books[3].pk))
+        self.assertIn('Book 4', last)
+        self.assertNotIn('Next page', last)
+
+    def test_invalid_cursor_starts_at_first_page(self):
+        self.assertIn('Book 0', self.render(after='not-a-number'))
+        for value in ['0', '-5', str(MAX_CURSOR + 1), '9' * 40]:
+            self.assertIsNone(parse_cursor(value))
+        self.assertEqual(parse_cursor(str(MAX_CURSOR)), MAX_CURSOR)
+        self.assertNotIn('Book 0', self.render(after=str(MAX_CURSOR)))
+
+    def test_cached_pages_follow_writes(self):
+        self.render()
+        with self.assertNumQueries(0):
+            self.assertIn('Book 0', self.render())
+        self.books[0].title = 'Kindred'
+        self.books[0].save()
+        self.assertIn('Kindred', self.render())
@@ -0,0 +1,34 @@
+"""
+The version tokens behind the cached book list pages and library stats.
+
+A cached page or stats entry carries the version it was built from in its
+key, so replacing the version orphans all of them at once. The token is
+random rather than a counter: if the cache evicts it, the replacement can
+never match a key that stale entries still sit under.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+
+
+def get_version(name):
+    return cache.get_or_set(f'version:{name}', lambda: uuid4().hex, timeout=None)
+
+
+def bump_version(name):
+    cache.set(f'version:{name}', uuid4().hex, timeout=None)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Book and librarian edits from one worker must reach every other."""
+    if settings.CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache':
+        return []
+    return [checks.Error(
+        'The default cache is local to each process, so a book added through '
+        'one worker never shows up in the pages and stats the others cached.',
+        hint='Use a shared backend such as DatabaseCache or RedisCache.',
+        id='relationship_app.E001',
+    )]
@@ -13,17 +13,31 @@ from django.contrib.auth.decorators import user_passes_test
 from django.contrib.auth.decorators import permission_required
 
 from .forms import BookForm
+from .inventory import library_detail_queryset, library_stats
+from .listing import BookPage, get_book_list_version, parse_cursor
+from .roles import has_role
 
 # Create your views here.
 def list_books(request):
-  books = Book.objects.all()
-  return render(request, 'relationship_app/list_books.html', {'books': books})
+  page = BookPage(after=parse_cursor(request.GET.get('after')))
+  return render(request, 'relationship_app/list_books.html', {
+      'page': page,
+      'book_list_version': get_book_list_version(),
+  })
 
 class LibraryDetailView(DetailView):
-  mode =Library
+  model = Library
   template_name = 'relationship_app/library_detail.html'
   context_object_name = 'library'
 
+  def get_queryset(self):
+    return library_detail_queryset()
+
+  def get_context_data(self, **kwargs):
+    context = super().get_context_data(**kwargs)
+    context['stats'] = library_stats(self.object.pk)
+    return context
+
 class CustomLoginView(LoginView):
     template_name = 'relationship_app/login.html'
 
@@ -47,13 +61,13 @@ def register(request):
 
 
 def is_admin(user):
-    return user.userprofile.role == 'Admin'
+    return has_role(user, 'Admin')
 
 def is_librarian(user):
-    return user.userprofile.role == 'Librarian'
+    return has_role(user, 'Librarian')
 
 def is_member(user):
-    return user.userprofile.role == 'Member'
+    return has_role(user, 'Member')
 
 
 @user_passes_test(is_admin)
@@ -0,0 +1,128 @@
+"""
+Page and fragment caching for the blog.
+
+Anonymous GET responses are cached whole, per URL, by cache_anonymous_page.
+Pages with a form carry a per-visitor CSRF token, so their cached copy has
+the token swapped for the current visitor's on the way out. Authenticated
+responses are never shared. Their per-user chrome (navigation, profile card)
+is cached as template fragments keyed by the user and a per-user version
+that saving the user bumps (see signals.py).
+
+Version counters live in the cache, so every process must share it (see
+check_shared_cache). A version is a random token rather than a number, so a
+counter that was evicted never comes back with a value that stale pages
+are still cached under.
+"""
+import hashlib
+import re
+from functools import wraps
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import (
+  add_never_cache_headers, patch_cache_control, patch_response_headers, patch_vary_headers,
+)
+
+
+PAGE_TIMEOUT = getattr(settings, 'BLOG_PAGE_CACHE_SECONDS', 60 * 5)
+
+# The hidden input rendered by {% csrf_token %}
+CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+def page_cache_key(request, version_key=None):
+  url = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+  version = get_version(version_key) if version_key else 0
+  return f'blog-page:{url}:{version}'
+
+
+def cache_anonymous_page(timeout=PAGE_TIMEOUT, uses_csrf=False, version_key=None):
+  """
+  Cache a view's anonymous GET responses per URL.
+
+  With `uses_csrf`, the CSRF token in a cached page is replaced with the
+  visitor's own, and the page is kept out of shared caches. With
+  `version_key`, bumping that counter drops every cached copy.
+  """
+  def decorator(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+      if request.user.is_authenticated:
+        response = view(request, *args, **kwargs)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+      if request.method not in ('GET', 'HEAD'):
+        return view(request, *args, **kwargs)
+
+      key = page_cache_key(request, version_key)
+      cached = cache.get(key)
+      if cached is None:
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200 or response.streaming:
+          return response
+        if hasattr(response, 'render'):
+          # Class-based views return unrendered TemplateResponses
+          response.render()
+        cache.set(key, (response.content, response['Content-Type']), timeout)
+      else:
+        content, content_type = cached
+        if uses_csrf:
+          token = get_token(request).encode()
+          content = CSRF_INPUT_RE.sub(lambda match: match[1] + token + match[2], content)
+        response = HttpResponse(content, content_type=content_type)
+
+      if uses_csrf:
+        add_never_cache_headers(response)
+      else:
+        patch_response_headers(response, timeout)
+      # The page differs for logged-in users, who send a session cookie
+      patch_vary_headers(response, ['Cookie'])
+      return response
+    return wrapper
+  return decorator
+
+
+def get_version(name):
+  """The token that cached pages derived from `name` are keyed on."""
+  return cache.get_or_set(f'version:{name}', lambda: uuid4().hex, timeout=None)
+
+
+def bump_version(name):
+  """Orphan every page and fragment keyed on `name`."""
+  cache.set(f'version:{name}', uuid4().hex, timeout=None)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+  if settings.CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache':
+    return []
+  return [checks.Error(
+    'The default cache is local to each process, so a post edited through '
+    'one worker stays stale in the pages the others have cached.',
+    hint='Use a shared backend such as DatabaseCache or RedisCache.',
+    id='blog.E001',
+  )]
+
+
+def page_etag(request, *parts):
+  """
+  An ETag for a page built from `parts`, the URL and, for logged-in users,
+  the user and their chrome version.
+  """
+  parts = [request.get_full_path(), *parts]
+  user = request.user
+  if user.is_authenticated:
+    parts += [user.pk, get_profile_version(user.pk)]
+  return hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def get_profile_version(user_id):
+  return get_version(f'profile:{user_id}')
+
+
+def invalidate_profile(user_id):
+  """Make the cached chrome fragments of one user stale."""
+  bump_version(f'profile:{user_id}')
@@ -0,0 +1,9 @@
+from .caching import get_profile_version
+
+
+def profile_chrome(request):
+  """The version that keys the user's cached chrome fragments."""
+  user = getattr(request, 'user', None)
+  if user is None or not user.is_authenticated:
+    return {}
+  return {'profile_version': get_profile_version(user.pk)}
@@ -0,0 +1,60 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from blog.models import Post
+from blog.posts import encode_cursor
+
+
+ANONYMOUS_PAGES = ['home', 'login', 'register', 'posts']
+LOGGED_IN_PAGES = ['home', 'profile', 'posts']
+
+
+class Command(BaseCommand):
+  help = 'Measures requests/sec for anonymous and logged-in pages, cold and cached; all writes are rolled back'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--posts', type=int, default=100_000, help='Posts to create first')
+
+  def handle(self, *args, **options):
+    count = options['requests']
+
+    def run(label, client, url, cold):
+      client.get(url)
+      start = time.perf_counter()
+      for _ in range(count):
+        if cold:
+          cache.clear()
+        client.get(url)
+      elapsed = time.perf_counter() - start
+      self.stdout.write(f'{label} {url} ({"cold" if cold else "cached"}): {count / elapsed:,.0f} requests/sec')
+
+    with transaction.atomic():
+      user = User.objects.create_user(username='benchmark-pages', email='benchmark@example.com')
+      anonymous = Client(HTTP_HOST='localhost')
+      logged_in = Client(HTTP_HOST='localhost')
+      logged_in.force_login(user)
+
+      Post.objects.bulk_create(
+        (Post(title=f'Post {i}', content=f'Benchmark post {i}. ' * 20, author=user)
+         for i in range(options['posts'])),
+        batch_size=5000,
+      )
+      # A page deep in the list, halfway through the posts
+      middle = Post.objects.order_by('-published_date', '-id')[options['posts'] // 2:][:1]
+      deep_page = [f"{reverse('posts')}?after={encode_cursor(post)}" for post in middle]
+
+      for cold in (True, False):
+        for url in [reverse(name) for name in ANONYMOUS_PAGES] + deep_page:
+          run('anonymous', anonymous, url, cold)
+        for url in [reverse(name) for name in LOGGED_IN_PAGES] + deep_page:
+          run('logged in', logged_in, url, cold)
+
+      transaction.set_rollback(True)
+    cache.clear()
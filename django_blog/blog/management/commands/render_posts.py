@@ -0,0 +1,84 @@
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.caching import bump_version
+from blog.models import Post
+from blog.posts import POSTS_VERSION
+from blog.rendering import RENDERER_VERSION, render_markdown
+
+
+def render_chunk(rows):
+  """[(pk, html)] for [(pk, content)]; touches no database, so it runs in worker processes."""
+  return [(pk, render_markdown(content)) for pk, content in rows]
+
+
+def rendered_chunks(chunks, workers):
+  """
+  Yield render_chunk(chunk) in input order. With more than one worker the
+  chunks render in a process pool while the caller saves earlier ones; at
+  most two chunks per worker are in flight.
+  """
+  if workers <= 1:
+    for chunk in chunks:
+      yield render_chunk(chunk)
+    return
+
+  with ProcessPoolExecutor(workers) as executor:
+    pending = deque()
+    for chunk in chunks:
+      pending.append(executor.submit(render_chunk, chunk))
+      if len(pending) >= workers * 2:
+        yield pending.popleft().result()
+    while pending:
+      yield pending.popleft().result()
+
+
+class Command(BaseCommand):
+  help = (
+    'Renders the Markdown of posts saved by an older renderer version (or of '
+    'every post with --all) to HTML, in chunks, one transaction per chunk'
+  )
+
+  def add_arguments(self, parser):
+    parser.add_argument('--all', action='store_true', help='Render every post, not only stale ones')
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=1, help='Processes rendering chunks; this process does all writes')
+
+  def handle(self, *args, **options):
+    posts = Post.objects.order_by('pk')
+    if not options['all']:
+      posts = posts.exclude(content_html_version=RENDERER_VERSION)
+
+    def chunks():
+      # Keyset over the primary key, so chunks saved meanwhile are never re-read
+      after = 0
+      while True:
+        chunk = list(posts.filter(pk__gt=after).values_list('pk', 'content')[:options['chunk_size']])
+        if not chunk:
+          return
+        yield chunk
+        after = chunk[-1][0]
+
+    rendered = 0
+    start = time.perf_counter()
+    for chunk in rendered_chunks(chunks(), options['workers']):
+      with transaction.atomic():
+        Post.objects.bulk_update(
+          [Post(pk=pk, content_html=html, content_html_version=RENDERER_VERSION) for pk, html in chunk],
+          ['content_html', 'content_html_version'],
+        )
+      rendered += len(chunk)
+      self.stdout.write(f'{rendered} posts rendered')
+
+    if rendered:
+      # bulk_update sends no signals; cached post pages embed the old HTML
+      bump_version(POSTS_VERSION)
+    elapsed = time.perf_counter() - start
+    self.stdout.write(self.style.SUCCESS(
+      f'Rendered {rendered} posts with renderer version {RENDERER_VERSION} in {elapsed:.1f}s '
+      f'({rendered / elapsed if elapsed else 0:.0f} posts/sec)'
+    ))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['published_date', 'id'], name='post_published_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_post_updated_at_post_published_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,16 +1,44 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from .rendering import RENDERER_VERSION, render_markdown
+
 # Create your models here.
 class Post(models.Model):
   title = models.CharField(max_length=200)
   content = models.TextField()
+  # The Markdown content as sanitized HTML, rendered on save
+  content_html = models.TextField(blank=True, editable=False)
+  content_html_version = models.PositiveSmallIntegerField(default=0, editable=False)
   published_date = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
   author = models.ForeignKey(
     User,
     on_delete=models.CASCADE,
     related_name='posts'
   )
 
+  class Meta:
+    indexes = [
+      # Serves the newest-first keyset pagination of the post list
+      models.Index(fields=['published_date', 'id'], name='post_published_id_idx'),
+    ]
+
   def __str__(self):
-    return self.title
\ No newline at end of file
+    return self.title
+
+  def save(self, *args, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or 'content' in update_fields:
+      self.render_content()
+      if update_fields is not None:
+        kwargs['update_fields'] = {*update_fields, 'content_html', 'content_html_version'}
+    super().save(*args, **kwargs)
+
+  def render_content(self):
+    self.content_html = render_markdown(self.content)
+    self.content_html_version = RENDERER_VERSION
+
+  @property
+  def html_is_stale(self):
+    return self.content_html_version != RENDERER_VERSION
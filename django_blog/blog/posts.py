@@ -0,0 +1,121 @@
+"""
+Post listing and rendering.
+
+The post list is keyset paginated newest first on (published_date, id),
+which the post_published_id_idx index serves, so page 5,000 costs what page
+one does. A cursor names the last post of the previous page.
+
+Each post's HTML is rendered once per revision (its updated_at) and cached;
+a page of posts is one get_many, and only the posts that missed load their
+compiled content, in a single query. Posts compiled by an older Markdown
+renderer are re-rendered then and saved, in one more query.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from .rendering import RENDERER_VERSION
+
+
+PAGE_SIZE = 20
+POST_HTML_TIMEOUT = 60 * 60 * 24
+POSTS_VERSION = 'posts'
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def to_microseconds(value):
+  return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def encode_cursor(post):
+  return f'{to_microseconds(post.published_date)}-{post.pk}'
+
+
+# Bounds of a valid cursor: datetime's range, and the largest id a 64-bit
+# primary key column holds
+MAX_TIMESTAMP = to_microseconds(datetime.max.replace(tzinfo=dt_timezone.utc))
+MAX_ID = 2 ** 63 - 1
+
+
+def decode_cursor(value):
+  """(published_date, id) from a cursor, or None when it is missing or invalid."""
+  try:
+    timestamp, pk = (int(part) for part in value.split('-'))
+  except (AttributeError, ValueError):
+    return None
+  if not (0 <= timestamp <= MAX_TIMESTAMP and 0 < pk <= MAX_ID):
+    return None
+  return EPOCH + timedelta(microseconds=timestamp), pk
+
+
+def post_page(cursor=None, size=PAGE_SIZE):
+  """The posts after `cursor` with their authors, and the next cursor or None."""
+  posts = (
+    Post.objects.select_related('author')
+    .only('title', 'published_date', 'updated_at', 'author__username')
+    .order_by('-published_date', '-id')
+  )
+  if cursor is not None:
+    published_date, pk = cursor
+    # Equivalent to (published_date, id) < cursor, written so that the
+    # database seeks into the index instead of scanning it from the top
+    posts = posts.filter(published_date__lte=published_date).exclude(
+      published_date=published_date, id__gte=pk,
+    )
+  posts = list(posts[:size + 1])
+  next_cursor = encode_cursor(posts[size - 1]) if len(posts) > size else None
+  return posts[:size], next_cursor
+
+
+def post_html_key(kind, post):
+  return f'post-html:{kind}:{post.pk}:{to_microseconds(post.updated_at)}:{RENDERER_VERSION}'
+
+
+def render_posts(posts, kind='summary'):
+  """
+  The cached `blog/post_<kind>.html` rendering of each post, in order.
+  `posts` may defer content and content_html; the HTML is loaded for cache
+  misses only.
+  """
+  keys = [post_html_key(kind, post) for post in posts]
+  cached = cache.get_many(keys) if keys else {}
+
+  missed = [post for post, key in zip(posts, keys) if key not in cached]
+  if missed:
+    compiled = ensure_rendered([post.pk for post in missed])
+    rendered = {}
+    for post in missed:
+      post.content_html = compiled.get(post.pk, '')
+      rendered[post_html_key(kind, post)] = render_to_string(
+        f'blog/post_{kind}.html', {'post': post},
+      )
+    cache.set_many(rendered, POST_HTML_TIMEOUT)
+    cached.update(rendered)
+
+  return [mark_safe(cached[key]) for key in keys]
+
+
+def ensure_rendered(pks):
+  """
+  {pk: content_html} for the given posts. Posts rendered by an older
+  renderer are rendered again and saved without touching updated_at.
+  """
+  compiled = {}
+  stale = []
+  rows = Post.objects.filter(pk__in=pks).values_list('pk', 'content_html', 'content_html_version')
+  for pk, html, version in rows:
+    if version == RENDERER_VERSION:
+      compiled[pk] = html
+    else:
+      stale.append(pk)
+  if stale:
+    posts = list(Post.objects.filter(pk__in=stale).only('content'))
+    for post in posts:
+      post.render_content()
+      compiled[post.pk] = post.content_html
+    Post.objects.bulk_update(posts, ['content_html', 'content_html_version'])
+  return compiled
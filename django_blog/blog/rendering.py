@@ -0,0 +1,148 @@
+"""
+Markdown to sanitized HTML for post content.
+
+Supports the Markdown most posts use: headings, paragraphs, emphasis,
+inline code, fenced code blocks, block quotes, lists, links and rules.
+
+The output is safe by construction. All source text is HTML-escaped before
+any markup is added. The only tags emitted are the ones below, and link
+targets must be http(s), mailto or site-relative. Raw HTML in a post is
+shown as text.
+
+Posts store their rendered HTML with the RENDERER_VERSION that produced
+it. Bump the version whenever the output changes, then re-render stored
+posts with `manage.py render_posts`. Posts not yet re-rendered are
+refreshed when they are next displayed.
+
+This module does not touch Django, so process pool workers can import it
+without setting Django up.
+"""
+import re
+from html import escape
+
+
+RENDERER_VERSION = 2
+
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+RULE_RE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+QUOTE_RE = re.compile(r'^\s*>\s?(.*)$')
+BULLET_RE = re.compile(r'^\s*[-*+]\s+(.*)$')
+NUMBERED_RE = re.compile(r'^\s*\d{1,9}[.)]\s+(.*)$')
+
+CODE_SPAN_RE = re.compile(r'(`+)(.+?)\1', re.S)
+LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+STRONG_RE = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*|(?<!\w)__(?=\S)(.+?)(?<=\S)__(?!\w)', re.S)
+EM_RE = re.compile(r'\*(?=\S)(.+?)(?<=\S)\*|(?<!\w)_(?=\S)(.+?)(?<=\S)_(?!\w)', re.S)
+# Browsers read a backslash after the leading slash as `//`, another host
+SAFE_URL_RE = re.compile(r'^(https?://|mailto:|/(?![/\\])|#)', re.I)
+# Stands in for a finished link while emphasis is applied. Escaped text
+# never contains `<`, so it cannot be forged from post content.
+LINK_PLACEHOLDER_RE = re.compile(r'<(\d+)>')
+
+
+def _emphasis(text):
+  text = STRONG_RE.sub(lambda match: f'<strong>{match[1] or match[2]}</strong>', text)
+  return EM_RE.sub(lambda match: f'<em>{match[1] or match[2]}</em>', text)
+
+
+def _link(match):
+  text, url = _emphasis(match[1]), match[2]
+  if not SAFE_URL_RE.match(url):
+    return text
+  return f'<a href="{url}" rel="nofollow">{text}</a>'
+
+
+def _format(text):
+  """Links and emphasis in already escaped text."""
+  links = []
+
+  def stash(match):
+    # Emphasis must not reach into the href, so links are set aside
+    links.append(_link(match))
+    return f'<{len(links) - 1}>'
+
+  text = _emphasis(LINK_RE.sub(stash, text))
+  return LINK_PLACEHOLDER_RE.sub(lambda match: links[int(match[1])], text)
+
+
+def render_inline(text):
+  """One block's text as escaped HTML with inline markup applied."""
+  parts = []
+  position = 0
+  # Code spans are taken out first so nothing inside them is formatted
+  for match in CODE_SPAN_RE.finditer(text):
+    parts.append(_format(escape(text[position:match.start()])))
+    parts.append(f'<code>{escape(match[2].strip())}</code>')
+    position = match.end()
+  parts.append(_format(escape(text[position:])))
+  return ''.join(parts)
+
+
+def render_markdown(text):
+  """Sanitized HTML for a Markdown document."""
+  lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+  html = []
+  paragraph = []
+  items, list_tag = [], None
+  i = 0
+
+  def flush():
+    nonlocal list_tag
+    if paragraph:
+      html.append(f'<p>{render_inline(" ".join(paragraph))}</p>')
+      paragraph.clear()
+    if items:
+      rendered = ''.join(f'<li>{render_inline(item)}</li>' for item in items)
+      html.append(f'<{list_tag}>{rendered}</{list_tag}>')
+      items.clear()
+      list_tag = None
+
+  while i < len(lines):
+    line = lines[i]
+    fence = FENCE_RE.match(line)
+    if fence:
+      flush()
+      code = []
+      i += 1
+      while i < len(lines) and not lines[i].lstrip().startswith(fence[1]):
+        code.append(lines[i])
+        i += 1
+      html.append(f'<pre><code>{escape(chr(10).join(code))}</code></pre>')
+      i += 1
+      continue
+
+    if not line.strip():
+      flush()
+    elif heading := HEADING_RE.match(line):
+      flush()
+      level = len(heading[1])
+      html.append(f'<h{level}>{render_inline(heading[2])}</h{level}>')
+    elif RULE_RE.match(line):
+      flush()
+      html.append('<hr>')
+    elif QUOTE_RE.match(line):
+      flush()
+      quoted = []
+      while i < len(lines) and (quote := QUOTE_RE.match(lines[i])):
+        quoted.append(quote[1])
+        i += 1
+      html.append(f'<blockquote>{render_markdown(chr(10).join(quoted))}</blockquote>')
+      continue
+    elif (item := BULLET_RE.match(line) or NUMBERED_RE.match(line)):
+      tag = 'ul' if BULLET_RE.match(line) else 'ol'
+      if paragraph or tag != list_tag:
+        flush()
+      list_tag = tag
+      items.append(item[1])
+    elif items and line.startswith((' ', '\t')):
+      # An indented line continues the previous list item
+      items[-1] += ' ' + line.strip()
+    else:
+      if items:
+        flush()
+      paragraph.append(line.strip())
+    i += 1
+
+  flush()
+  return '\n'.join(html)
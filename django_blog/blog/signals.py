@@ -0,0 +1,22 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_version, invalidate_profile
+from .models import Post
+from .posts import POSTS_VERSION
+
+
+@receiver(post_save, sender=User)
+def invalidate_profile_chrome(sender, instance, update_fields=None, **kwargs):
+  # Logging in only touches last_login, which no page shows
+  if update_fields == frozenset({'last_login'}):
+    return
+  invalidate_profile(instance.pk)
+  # Post pages show the author's name
+  bump_version(POSTS_VERSION)
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+  bump_version(POSTS_VERSION)
@@ -1,3 +1,191 @@
-from django.test import TestCase
+import re
+from io import StringIO
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import views
+from .models import Post
+from .posts import MAX_ID, MAX_TIMESTAMP, decode_cursor, post_page
+from .rendering import RENDERER_VERSION, render_markdown
+
+
+class PageCacheTests(TestCase):
+  def setUp(self):
+    cache.clear()
+    self.user = User.objects.create_user(username='writer', email='writer@example.com')
+
+  def test_anonymous_pages_are_cached_per_url(self):
+    with patch.object(views, 'render', wraps=views.render) as render:
+      first = self.client.get(reverse('home'))
+      second = self.client.get(reverse('home'))
+      self.client.get(reverse('home') + '?page=2')
+    self.assertEqual(render.call_count, 2)
+    self.assertEqual(first.content, second.content)
+    self.assertIn('Cookie', second['Vary'])
+    self.assertIn('max-age', second['Cache-Control'])
+
+  def test_logged_in_pages_are_not_cached(self):
+    self.client.get(reverse('home'))
+    self.client.force_login(self.user)
+    response = self.client.get(reverse('home'))
+    self.assertContains(response, 'Logout')
+    self.assertIn('no-cache', response['Cache-Control'])
+
+  def test_csrf_pages_get_the_visitors_token(self):
+    visitors = [Client(enforce_csrf_checks=True), Client(enforce_csrf_checks=True)]
+    with patch.object(views, 'render', wraps=views.render) as render:
+      pages = [visitor.get(reverse('login')) for visitor in visitors]
+    self.assertEqual(render.call_count, 1)
+    self.assertIn('no-cache', pages[1]['Cache-Control'])
+
+    # The cached page's token works for the second visitor only
+    token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', pages[1].content.decode())[1]
+    data = {'username': 'writer', 'password': 'wrong', 'csrfmiddlewaretoken': token}
+    self.assertEqual(visitors[1].post(reverse('login'), data).status_code, 200)
+    self.assertEqual(visitors[0].post(reverse('login'), data).status_code, 403)
+
+  def test_profile_chrome_follows_user_changes(self):
+    self.client.force_login(self.user)
+    self.assertContains(self.client.get(reverse('profile')), 'writer@example.com')
+    self.user.email = 'new@example.com'
+    self.user.save()
+    response = self.client.get(reverse('profile'))
+    self.assertContains(response, 'new@example.com')
+    self.assertNotContains(response, 'writer@example.com')
+
+
+class PostViewTests(TestCase):
+  def setUp(self):
+    cache.clear()
+    self.author = User.objects.create_user(username='writer')
+    start = timezone.now()
+    self.posts = []
+    # Posts 1 and 2 share a timestamp, so the id breaks the tie
+    for i, minutes in enumerate([0, 1, 1, 2, 3]):
+      post = Post.objects.create(title=f'Post {i}', content=f'Body of post {i}', author=self.author)
+      Post.objects.filter(pk=post.pk).update(published_date=start + timedelta(minutes=minutes))
+      self.posts.append(post)
+    self.viewer = User.objects.create_user(username='reader')
+
+  def test_keyset_pages_are_newest_first(self):
+    titles, cursor = [], None
+    while True:
+      posts, cursor = post_page(decode_cursor(cursor), size=2)
+      titles += [post.title for post in posts]
+      if cursor is None:
+        break
+    expected = list(Post.objects.order_by('-published_date', '-id').values_list('title', flat=True))
+    self.assertEqual(titles, expected)
+    self.assertEqual(len(set(titles)), 5)
+
+  def test_out_of_range_cursors_start_at_first_page(self):
+    for cursor in ['99999999999999999999-1', '253402300800000000-1', f'1-{MAX_ID + 1}', '1-0', 'abc', '1-2-3']:
+      self.assertIsNone(decode_cursor(cursor))
+      response = self.client.get(reverse('posts'), {'after': cursor})
+      self.assertContains(response, 'Post 4')
+    self.assertIsNotNone(decode_cursor(f'{MAX_TIMESTAMP}-{MAX_ID}'))
+
+  def test_pages_seek_into_index(self):
+    cursor = decode_cursor(post_page(size=2)[1])
+    with CaptureQueriesContext(connection) as queries:
+      post_page(cursor, size=2)
+    plan = connection.cursor().execute('EXPLAIN QUERY PLAN ' + queries[0]['sql']).fetchall()
+    self.assertIn('SEARCH blog_post USING INDEX post_published_id_idx', str(plan))
+
+  def test_list_renders_cached_posts(self):
+    self.client.force_login(self.viewer)
+    self.client.get(reverse('posts'))
+    with patch('blog.posts.render_to_string') as render:
+      response = self.client.get(reverse('posts'))
+    render.assert_not_called()
+    self.assertContains(response, 'Body of post 4')
+    self.assertContains(response, 'by writer')
+
+  def test_edit_refreshes_post_html(self):
+    self.client.get(reverse('post_detail', args=[self.posts[0].pk]))
+    self.posts[0].content = 'Rewritten'
+    self.posts[0].save()
+    response = self.client.get(reverse('post_detail', args=[self.posts[0].pk]))
+    self.assertContains(response, 'Rewritten')
+    self.assertContains(self.client.get(reverse('posts')), 'Rewritten')
+
+  def test_detail_conditional_get(self):
+    url = reverse('post_detail', args=[self.posts[0].pk])
+    etag = self.client.get(url)['ETag']
+    self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+    self.posts[0].title = 'Renamed'
+    self.posts[0].save()
+    self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    self.assertEqual(self.client.get(reverse('post_detail', args=[999])).status_code, 404)
+
+
+class MarkdownTests(TestCase):
+  def setUp(self):
+    cache.clear()
+    self.author = User.objects.create_user(username='writer')
+
+  def test_markdown_to_html(self):
+    html = render_markdown(
+      '# Title\n\nSome *em*, **strong** and `a*b*`.\n\n- one\n- two\n\n> quoted\n\n'
+      '```\n<b>code</b>\n```\n\n[site](https://example.com)'
+    )
+    self.assertInHTML('<h1>Title</h1>', html)
+    self.assertInHTML('<p>Some <em>em</em>, <strong>strong</strong> and <code>a*b*</code>.</p>', html)
+    self.assertInHTML('<ul><li>one</li><li>two</li></ul>', html)
+    self.assertInHTML('<blockquote><p>quoted</p></blockquote>', html)
+    self.assertInHTML('<pre><code>&lt;b&gt;code&lt;/b&gt;</code></pre>', html)
+    self.assertInHTML('<a href="https://example.com" rel="nofollow">site</a>', html)
+
+  def test_markdown_is_sanitized(self):
+    html = render_markdown(
+      '<script>alert(1)</script>\n\n[click](javascript:alert(1)) [x](/" onclick="y)'
+    )
+    self.assertNotIn('<script', html)
+    self.assertNotIn('href="javascript', html)
+    self.assertNotIn('" onclick', html)
+
+  def test_emphasis_stays_out_of_link_targets(self):
+    html = render_markdown('[*a*](https://x.com/a_b_c/*d*) and *e*')
+    self.assertEqual(
+      html,
+      '<p><a href="https://x.com/a_b_c/*d*" rel="nofollow"><em>a</em></a> and <em>e</em></p>',
+    )
+
+  def test_backslash_after_leading_slash_is_not_linked(self):
+    html = render_markdown(r'[x](/\evil.com) [y](/\/evil.com) [z](/ok)')
+    self.assertEqual(html, '<p>x y <a href="/ok" rel="nofollow">z</a></p>')
+
+  def test_rendered_on_save(self):
+    post = Post.objects.create(title='Post', content='Hello **world**', author=self.author)
+    self.assertEqual(post.content_html, '<p>Hello <strong>world</strong></p>')
+    post.content = 'Changed'
+    post.save(update_fields=['content'])
+    post.refresh_from_db()
+    self.assertEqual((post.content_html, post.content_html_version), ('<p>Changed</p>', RENDERER_VERSION))
+
+  def test_stale_html_is_rendered_when_shown(self):
+    post = Post.objects.create(title='Post', content='Fresh *text*', author=self.author)
+    Post.objects.filter(pk=post.pk).update(content_html='<p>old</p>', content_html_version=0)
+    response = self.client.get(reverse('post_detail', args=[post.pk]))
+    self.assertContains(response, '<em>text</em>', html=True)
+    post.refresh_from_db()
+    self.assertEqual(post.content_html_version, RENDERER_VERSION)
+
+  def test_render_posts_command(self):
+    Post.objects.bulk_create(
+      Post(title=f'Post {i}', content=f'Post *{i}*', author=self.author) for i in range(5)
+    )
+    current = Post.objects.create(title='Current', content='Current', author=self.author)
+    call_command('render_posts', workers=2, chunk_size=2, stdout=StringIO())
+    self.assertFalse(Post.objects.exclude(content_html_version=RENDERER_VERSION).exists())
+    self.assertEqual(Post.objects.get(title='Post 3').content_html, '<p>Post <em>3</em></p>')
+    self.assertEqual(Post.objects.get(pk=current.pk).content_html, '<p>Current</p>')
@@ -0,0 +1,13 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+  path('', views.home_view, name='home'),
+  path('register/', views.register_view, name='register'),
+  path('login/', views.login_view, name='login'),
+  path('logout/', views.logout_view, name='logout'),
+  path('profile/', views.profile_view, name='profile'),
+  path('posts/', views.PostListView.as_view(), name='posts'),
+  path('posts/<int:pk>/', views.PostDetailView.as_view(), name='post_detail'),
+]
@@ -3,10 +3,23 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.views.generic import DetailView, ListView
+from .caching import cache_anonymous_page, get_version, page_etag
 from .forms import CustomUserCreationForm
+from .models import Post
+from .posts import POSTS_VERSION, decode_cursor, post_page, render_posts
 # Create your views here.
 
+# Home page, cached whole for anonymous visitors
+@cache_anonymous_page()
+def home_view(request):
+  return render(request, "blog/home.html")
+
+
 # Registration view
+@cache_anonymous_page(uses_csrf=True)
 def register_view(request):
   if request.method == "POST":
     form = CustomUserCreationForm(request.POST)
@@ -16,10 +29,11 @@ def register_view(request):
       return redirect("/")
   else:
     form = CustomUserCreationForm()
-    return render(request, "blog/register.html", {"form": form})
+  return render(request, "blog/register.html", {"form": form})
   
 
 # Login view
+@cache_anonymous_page(uses_csrf=True)
 def login_view(request):
   if request.method == "POST":
     form = AuthenticationForm(request, data=request.POST)
@@ -29,7 +43,7 @@ def login_view(request):
       return redirect("/")
   else:
     form = AuthenticationForm()
-    return render(request, "blog/login.html", {"form": form})
+  return render(request, "blog/login.html", {"form": form})
   
 
 # Logout view
@@ -40,4 +54,44 @@ def logout_view(request):
 # Profile view (read-only, for now)
 @login_required
 def profile_view(request):
-  return render(request, "blog/profile.html")
\ No newline at end of file
+  return render(request, "blog/profile.html")
+
+
+# Post ETags: the list changes with any post, a post page with its own row
+def post_list_etag(request, *args, **kwargs):
+  return page_etag(request, get_version(POSTS_VERSION))
+
+def post_detail_etag(request, pk):
+  row = Post.objects.filter(pk=pk).values_list('updated_at', 'author__username').first()
+  return page_etag(request, *row) if row else None
+
+
+# Newest posts first, paginated with an ?after=<cursor> link
+@method_decorator(condition(etag_func=post_list_etag), name='dispatch')
+@method_decorator(cache_anonymous_page(version_key=POSTS_VERSION), name='dispatch')
+class PostListView(ListView):
+  template_name = 'blog/post_list.html'
+  context_object_name = 'posts'
+
+  def get_queryset(self):
+    posts, self.next_cursor = post_page(decode_cursor(self.request.GET.get('after')))
+    return posts
+
+  def get_context_data(self, **kwargs):
+    context = super().get_context_data(**kwargs)
+    context['items'] = list(zip(self.object_list, render_posts(self.object_list)))
+    context['next_cursor'] = self.next_cursor
+    return context
+
+
+# A single post; its body comes from the rendered-HTML cache
+@method_decorator(condition(etag_func=post_detail_etag), name='dispatch')
+@method_decorator(cache_anonymous_page(version_key=POSTS_VERSION), name='dispatch')
+class PostDetailView(DetailView):
+  template_name = 'blog/post_detail.html'
+  queryset = Post.objects.select_related('author').defer('content', 'content_html')
+
+  def get_context_data(self, **kwargs):
+    context = super().get_context_data(**kwargs)
+    context['body'] = render_posts([self.object], 'body')[0]
+    return context
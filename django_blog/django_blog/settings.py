@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -62,6 +63,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.profile_chrome',
             ],
         },
     },
@@ -83,6 +85,37 @@ DATABASES = {
 }
 
 
+# Cache
+# Anonymous pages are cached whole; logged-in users get cached fragments.
+# Shared by every worker, since any process may bump the version counters
+# the cached pages are keyed on. Create the table with
+# `python manage.py createcachetable`.
+# The database backend culls itself down to MAX_ENTRIES on every write and
+# defaults to 300, far below one rendered body per post. Set
+# DJANGO_REDIS_URL to use Redis, which skips the row count on each write.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {
+            # Rendered post bodies, anonymous pages and profile fragments
+            'MAX_ENTRIES': 500_000,
+            # Cull a tenth of the entries when full rather than a third
+            'CULL_FREQUENCY': 10,
+        },
+    }
+}
+
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['DJANGO_REDIS_URL'],
+    }
+
+BLOG_PAGE_CACHE_SECONDS = 60 * 5
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from social_media_api.fast_serializers import FastReadSerializer
 from .models import Notification
 
 
@@ -7,4 +8,10 @@ class NotificationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Notification
-        fields = ['id', 'actor', 'verb', 'timestamp', 'read']
\ No newline at end of file
+        fields = ['id', 'actor', 'verb', 'timestamp', 'read']
+
+
+# List fast path; CustomUser.__str__ is the username, matching StringRelatedField.
+notification_list_serializer = FastReadSerializer(Notification, [
+    'id', ('actor', 'actor__username'), 'verb', 'timestamp', 'read',
+])
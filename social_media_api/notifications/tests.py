@@ -1,3 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import Notification
+from .serializers import NotificationSerializer, notification_list_serializer
+
+
+User = get_user_model()
+
+
+class NotificationFastPathTests(TestCase):
+    def setUp(self):
+        self.recipient = User.objects.create_user(username='erin', password='pass12345')
+        self.actor = User.objects.create_user(username='frank', password='pass12345')
+        content_type = ContentType.objects.get_for_model(User)
+        for verb in ('followed you', 'liked your post'):
+            Notification.objects.create(
+                recipient=self.recipient, actor=self.actor, verb=verb,
+                content_type=content_type, object_id=self.recipient.pk,
+            )
+
+    def test_matches_model_serializer(self):
+        queryset = Notification.objects.order_by('-timestamp')
+        self.assertEqual(
+            notification_list_serializer.serialize(queryset),
+            [dict(item) for item in NotificationSerializer(queryset, many=True).data],
+        )
+
+    def test_list_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=self.recipient)
+        response = client.get('/api/notifications/')
+
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['results'][0]['actor'], 'frank')
+
+    def test_export_streams_ndjson(self):
+        client = APIClient()
+        client.force_authenticate(user=self.recipient)
+        response = client.get('/api/notifications/export/')
+        lines = b''.join(response.streaming_content).splitlines()
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(lines), 2)
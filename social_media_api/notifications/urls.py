@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import NotificationListView
+from .views import NotificationListView, NotificationExportView
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notifications'),
+    path('export/', NotificationExportView.as_view(), name='notifications-export'),
 ]
\ No newline at end of file
@@ -3,14 +3,25 @@ from django.shortcuts import render
 # Create your views here.
 from rest_framework import generics, permissions
 from .models import Notification
-from .serializers import NotificationSerializer
+from social_media_api.exports import export_rows, ndjson_response
+from social_media_api.fast_serializers import FastListMixin
+from .serializers import NotificationSerializer, notification_list_serializer
 
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(FastListMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
+    fast_serializer = notification_list_serializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         return Notification.objects.filter(
             recipient=self.request.user
-        ).order_by('-timestamp')
\ No newline at end of file
+        ).order_by('-timestamp')
+
+
+class NotificationExportView(NotificationListView):
+    """Stream all of the user's notifications as NDJSON."""
+
+    def list(self, request, *args, **kwargs):
+        rows = export_rows(self.fast_serializer, self.get_queryset())
+        return ndjson_response(rows, 'notifications.ndjson')
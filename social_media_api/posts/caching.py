@@ -0,0 +1,118 @@
+"""
+HTTP caching for the post endpoints.
+
+A post's `updated_at` moves whenever the post itself is edited, but not
+when someone comments on it or the author renames their account, and the
+list embeds both. ConditionalGetMixin therefore validates with an ETag
+built from the newest `updated_at`, the row count and the POSTS_VERSION
+counter, which comment and author writes bump (see signals). It sends
+Last-Modified for a single post, where the timestamp alone is enough to
+answer If-Modified-Since.
+
+POSTS_VERSION lives in the cache, so every worker must share that cache
+(see check_shared_cache). A version is a random token rather than a
+number. A counter that was evicted therefore never comes back with a
+value that stale ETags still carry.
+"""
+import hashlib
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+POSTS_VERSION = 'posts'
+
+
+def get_version(name):
+    """Return the current value of the named version counter."""
+    return cache.get_or_set(f'version:{name}', lambda: uuid4().hex, timeout=None)
+
+
+def bump_version(name):
+    """Invalidate every ETag built on the named version counter."""
+    cache.set(f'version:{name}', uuid4().hex, timeout=None)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """A comment written through one worker must change every worker's ETags."""
+    if settings.CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache':
+        return []
+    return [checks.Error(
+        'The default cache is local to each process, so new comments and '
+        'renamed authors leave the other workers answering 304 with stale posts.',
+        hint='Use a shared backend such as DatabaseCache or RedisCache.',
+        id='posts.E001',
+    )]
+
+
+class ConditionalGetMixin:
+    """ETag and Last-Modified handling for the list and retrieve actions."""
+    last_modified_field = 'updated_at'
+    version_key = POSTS_VERSION
+    cache_max_age = 60
+
+    def list(self, request, *args, **kwargs):
+        summary = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            last_modified=Max(self.last_modified_field),
+            count=Count('pk'),
+        )
+        # A deletion can lower the count without moving the max timestamp,
+        # so lists are only ever validated by ETag.
+        return self._conditional_response(
+            request, [summary['last_modified'], summary['count']],
+            summary['last_modified'], False,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = getattr(instance, self.last_modified_field)
+        return self._conditional_response(
+            request, [instance.pk, last_modified], last_modified, True,
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def get_etag(self, request, parts):
+        user = request.user
+        parts = list(parts) + [
+            request.get_full_path(),
+            user.pk if user.is_authenticated else 'anon',
+            get_version(self.version_key),
+        ]
+        digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False)
+        return quote_etag(digest.hexdigest())
+
+    def _conditional_response(self, request, parts, last_modified,
+                              check_last_modified, render):
+        etag = self.get_etag(request, parts)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=timestamp if check_last_modified else None,
+        )
+        if response is None:
+            response = render()
+
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        if request.user.is_authenticated:
+            # Per-user payloads must never land in a shared cache.
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, max_age=self.cache_max_age)
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
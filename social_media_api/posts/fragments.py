@@ -0,0 +1,70 @@
+"""
+Versioned cache of serialized post fragments.
+
+Each post is rendered once per `(post_id, version)` and stored as a plain
+dict. List renders fetch every fragment with a single `get_many` and only
+go back to the database for the posts that missed.
+"""
+import threading
+
+from django.core.cache import cache
+
+
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+
+class FragmentCache:
+    """Cache rendered representations keyed on an object's pk and version."""
+
+    def __init__(self, prefix, timeout=FRAGMENT_TIMEOUT):
+        self.prefix = prefix
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def key(self, obj):
+        return f'{self.prefix}:{obj.pk}:{obj.version}'
+
+    def get(self, obj, render):
+        return self.get_many([obj], lambda objs: [render(obj) for obj in objs])[0]
+
+    def get_many(self, objs, render_many):
+        """
+        Return the fragment for every obj, served from cache where possible.
+
+        `render_many(missed)` must return fragments in the order given.
+        """
+        objs = list(objs)
+        keys = [self.key(obj) for obj in objs]
+        cached = cache.get_many(keys) if keys else {}
+
+        missed = [obj for obj, key in zip(objs, keys) if key not in cached]
+        if missed:
+            rendered = dict(zip((self.key(obj) for obj in missed), render_many(missed)))
+            cache.set_many(rendered, self.timeout)
+            cached.update(rendered)
+
+        self._record(hits=len(objs) - len(missed), misses=len(missed))
+        return [cached[key] for key in keys]
+
+    def _record(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters for this process since the last reset."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+post_fragments = FragmentCache('post-fragment')
@@ -0,0 +1,62 @@
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from posts.models import Comment, Post
+from posts.serializers import PostSerializer
+from social_media_api.renderers import ORJSONRenderer
+
+
+def measure(func):
+    """Return (cpu_seconds, peak_bytes_allocated) for func."""
+    # Timed and traced separately: tracemalloc slows allocation-heavy code.
+    start = time.process_time()
+    func()
+    elapsed = time.process_time() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+class Command(BaseCommand):
+    help = 'Compares JSONRenderer and ORJSONRenderer on serialized posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        payload = self.build_payload(options['count'])
+
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            cpu, peak = measure(lambda: renderer.render(payload))
+            self.stdout.write(
+                f'{type(renderer).__name__:<16} cpu={cpu * 1000:8.1f}ms '
+                f'peak_alloc={peak / 1024:10.1f}KiB bytes={len(renderer.render(payload))}'
+            )
+
+    def build_payload(self, count):
+        # Rows are rolled back; render() bypasses the fragment cache so no
+        # fragments for throwaway ids are left behind.
+        with transaction.atomic():
+            author = get_user_model().objects.create_user(username='benchmark-renderer')
+            posts = Post.objects.bulk_create(
+                Post(author=author, title=f'Post {i}', content='Lorem ipsum ' * 20)
+                for i in range(count)
+            )
+            Comment.objects.bulk_create(
+                Comment(post=post, author=author, content='Nice post')
+                for post in posts[::10]
+            )
+            queryset = Post.objects.filter(author=author).select_related('author') \
+                .prefetch_related('comments__author')
+            serializer = PostSerializer()
+            payload = [serializer.render(post) for post in queryset]
+            transaction.set_rollback(True)
+        return payload
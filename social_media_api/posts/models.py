@@ -2,6 +2,7 @@ from django.db import models
 
 # Create your models here.
 from django.db import models
+from django.db.models import F
 from django.conf import settings
 
 
@@ -15,10 +16,26 @@ class Post(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped on every edit and comment write; keys the serialized-post cache.
+    version = models.PositiveIntegerField(default=1, editable=False)
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        # Incremented in the UPDATE itself: this instance's version may be
+        # behind a comment write, and reusing a cached version would serve
+        # the old fragment.
+        self.version = F('version') + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['version'])
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
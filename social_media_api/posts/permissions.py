@@ -1,20 +1,49 @@
 from rest_framework import permissions
 
+# Fields naming the owner of an object, in order of preference
+OWNER_FIELDS = ('author', 'user')
+
+
+def owner_field(model):
+    """The name of the first owner field `model` has, or None."""
+    names = {field.name for field in model._meta.concrete_fields}
+    return next((name for name in OWNER_FIELDS if name in names), None)
+
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
     Allow read-only access to anyone.
     Allow write access only to the owner.
+
+    Ownership is compared on the owner's id column, so checking it never
+    loads the user row.
     """
 
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
+        # AnonymousUser.pk is None, which would match an object without owner
+        if not request.user.is_authenticated:
+            return False
+
+        field = owner_field(type(obj))
+        if field is None:
+            return False
+        return getattr(obj, f'{field}_id') == request.user.pk
+
+
+class SharedPermissionsMixin:
+    """
+    Build the view's permission instances once per view class.
+
+    Permissions are stateless, so there is no need to instantiate
+    `permission_classes` again on every request.
+    """
 
-        if hasattr(obj, 'author'):
-            return obj.author == request.user
-        
-        elif hasattr(obj, 'user'):
-            return obj.author == request.user
-        
-        return False
\ No newline at end of file
+    def get_permissions(self):
+        cls = type(self)
+        instances = cls.__dict__.get('_permissions')
+        if instances is None:
+            instances = tuple(permission() for permission in self.permission_classes)
+            cls._permissions = instances
+        return instances
@@ -1,5 +1,11 @@
+from collections import defaultdict
+
+from django.db import models
 from rest_framework import serializers
+from social_media_api.exports import EXPORT_CHUNK_SIZE, batched
+from social_media_api.fast_serializers import FastReadSerializer
 from .models import Post, Comment
+from .fragments import post_fragments
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -11,6 +17,49 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['author']
 
 
+# Read-only fast paths mirroring the ModelSerializers' output, for list actions
+comment_list_serializer = FastReadSerializer(Comment, [
+    'id', 'post', ('author', 'author__username'), 'content', 'created_at', 'updated_at',
+])
+post_list_serializer = FastReadSerializer(Post, [
+    'id', ('author', 'author__username'), 'title', 'content', 'created_at', 'updated_at',
+])
+
+
+def render_posts(posts):
+    """PostSerializer output for `posts` in two queries, without model instances."""
+    return render_post_ids([post.pk for post in posts])
+
+
+def render_post_ids(ids):
+    comments = defaultdict(list)
+    for comment in comment_list_serializer.serialize(
+        Comment.objects.filter(post_id__in=ids).order_by('pk')
+    ):
+        comments[comment['post']].append(comment)
+
+    rows = {
+        row['id']: row
+        for row in post_list_serializer.serialize(Post.objects.filter(pk__in=ids))
+    }
+    return [{**rows[pk], 'comments': comments[pk]} for pk in ids]
+
+
+def export_posts(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream PostSerializer output for `queryset`, one chunk of posts at a time."""
+    ids = queryset.values_list('pk', flat=True).iterator(chunk_size=chunk_size)
+    for chunk in batched(ids, chunk_size):
+        yield from render_post_ids(chunk)
+
+
+class CachedPostListSerializer(serializers.ListSerializer):
+    """Stitch post fragments together with one cache round trip."""
+
+    def to_representation(self, data):
+        posts = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return post_fragments.get_many(posts, render_posts)
+
+
 class PostSerializer(serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
     comments = CommentSerializer(many=True, read_only=True)
@@ -18,4 +67,12 @@ class PostSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = ['id', 'author', 'title', 'content', 'created_at', 'updated_at', 'comments']
-        read_only_fields = ['author']
\ No newline at end of file
+        read_only_fields = ['author']
+        list_serializer_class = CachedPostListSerializer
+
+    def render(self, instance):
+        """Uncached representation, used to fill fragment cache misses."""
+        return super().to_representation(instance)
+
+    def to_representation(self, instance):
+        return post_fragments.get(instance, self.render)
\ No newline at end of file
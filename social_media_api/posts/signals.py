@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import POSTS_VERSION, bump_version
+from .models import Comment, Post
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_post_cache(sender, instance, **kwargs):
+    """Nested comments are part of every post payload."""
+    bump_version(POSTS_VERSION)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def bump_post_version(sender, instance, **kwargs):
+    """Re-key the parent's serialized fragment after any comment write."""
+    Post.objects.filter(pk=instance.post_id).update(version=F('version') + 1)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def bump_user_post_versions(sender, instance, created, update_fields=None, **kwargs):
+    """Post fragments show the usernames of the author and commenters."""
+    # Logging in only touches last_login, which no fragment shows
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    posts = Post.objects.filter(Q(author=instance) | Q(comments__author=instance))
+    if posts.update(version=F('version') + 1):
+        bump_version(POSTS_VERSION)
@@ -1,3 +1,273 @@
-from django.test import TestCase
+import json
+import tracemalloc
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from accounts.models import Profile
+
+from .fragments import post_fragments
+from .models import Comment, Post
+from .permissions import IsOwnerOrReadOnly
+from .serializers import (
+    CommentSerializer,
+    PostSerializer,
+    comment_list_serializer,
+    render_posts,
+)
+from .views import PostViewSet
+
+
+User = get_user_model()
+
+# Query counts below are the app's own; the shared cache backend would add its
+# queries to them.
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='alice', password='pass12345')
+        self.post = Post.objects.create(author=self.user, title='Hello', content='World')
+
+    def test_list_returns_304_when_etag_matches(self):
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_changes_on_comment_write(self):
+        etag = self.client.get('/api/posts/')['ETag']
+        Comment.objects.create(post=self.post, author=self.user, content='First')
+
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_changes_on_delete(self):
+        Post.objects.create(author=self.user, title='Second', content='Post')
+        etag = self.client.get('/api/posts/')['ETag']
+        self.post.delete()
+
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_returns_304_when_etag_matches(self):
+        url = f'/api/posts/{self.post.pk}/'
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cache_control_anonymous_vs_authenticated(self):
+        response = self.client.get('/api/posts/')
+        self.assertIn('public', response['Cache-Control'])
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/posts/')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Authorization', response['Vary'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PostFragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        post_fragments.reset_stats()
+        self.user = User.objects.create_user(username='bob', password='pass12345')
+        self.posts = [
+            Post.objects.create(author=self.user, title=f'Post {i}', content='Body')
+            for i in range(3)
+        ]
+        Comment.objects.create(post=self.posts[0], author=self.user, content='Nice')
+
+    def render(self):
+        return PostSerializer(Post.objects.order_by('pk'), many=True).data
+
+    def test_warm_render_matches_and_skips_db(self):
+        cold = self.render()
+        queryset = Post.objects.order_by('pk')
+        with self.assertNumQueries(1):
+            warm = PostSerializer(queryset, many=True).data
+
+        self.assertEqual(cold, warm)
+        self.assertEqual(post_fragments.stats()['hits'], 3)
+
+    def test_comment_write_refreshes_only_its_post(self):
+        self.render()
+        Comment.objects.create(post=self.posts[1], author=self.user, content='Late')
+        post_fragments.reset_stats()
+
+        data = self.render()
+        self.assertEqual(len(data[1]['comments']), 1)
+        self.assertEqual(post_fragments.stats(), {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3})
+
+    def test_post_edit_bumps_version(self):
+        post = self.posts[2]
+        PostSerializer(post).data
+        post.title = 'Edited'
+        post.save()
+
+        self.assertEqual(PostSerializer(post).data['title'], 'Edited')
+
+    def test_stale_instance_save_gets_a_new_version(self):
+        post = Post.objects.get(pk=self.posts[1].pk)
+        self.render()
+        # Bumps the row's version behind `post`'s back
+        Comment.objects.create(post=post, author=self.user, content='Late')
+        self.render()
+        post.title = 'Edited'
+        post.save()
+
+        self.assertEqual(post.version, Post.objects.get(pk=post.pk).version)
+        self.assertEqual(self.render()[1]['title'], 'Edited')
+
+    def test_username_change_refreshes_fragments(self):
+        commenter = User.objects.create_user(username='carol', password='pass12345')
+        Comment.objects.create(post=self.posts[2], author=commenter, content='Hi')
+        self.render()
+        self.user.username = 'robert'
+        self.user.save()
+        commenter.username = 'caroline'
+        commenter.save()
+
+        data = self.render()
+        self.assertEqual({post['author'] for post in data}, {'robert'})
+        self.assertEqual(data[2]['comments'][0]['author'], 'caroline')
+
+
+class FastReadSerializerTests(TestCase):
+    """The list fast paths must match the ModelSerializers field for field."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='carol', password='pass12345')
+        self.other = User.objects.create_user(username='dave', password='pass12345')
+        self.posts = [
+            Post.objects.create(author=user, title=f'Post {i}', content='Body')
+            for i, user in enumerate([self.user, self.other, self.user])
+        ]
+        for post in self.posts[:2]:
+            Comment.objects.create(post=post, author=self.other, content='One')
+            Comment.objects.create(post=post, author=self.user, content='Two')
+
+    def test_comments_match_model_serializer(self):
+        queryset = Comment.objects.order_by('-created_at', '-pk')
+        self.assertEqual(
+            comment_list_serializer.serialize(queryset),
+            [dict(item) for item in CommentSerializer(queryset, many=True).data],
+        )
+
+    def test_posts_match_model_serializer(self):
+        serializer = PostSerializer()
+        expected = [serializer.render(post) for post in self.posts]
+        self.assertEqual(render_posts(self.posts), expected)
+
+    def test_comment_list_endpoint_uses_fast_path(self):
+        client = APIClient()
+        response = client.get('/api/comments/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(response.data['results'][0]['author'], 'carol')
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='gina', password='pass12345')
+        self.follower = User.objects.create_user(username='hank', password='pass12345')
+
+    def create_posts(self, count):
+        Post.objects.bulk_create(
+            Post(author=self.user, title=f'Post {i}', content='Lorem ipsum ' * 10)
+            for i in range(count)
+        )
+
+    def consume_export(self):
+        """Return (line_count, peak traced bytes) for streaming the export."""
+        tracemalloc.start()
+        response = self.client.get('/api/posts/export/')
+        lines = sum(chunk.count(b'\n') for chunk in response.streaming_content)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return lines, peak
+
+    def test_export_matches_serializer(self):
+        self.create_posts(3)
+        Comment.objects.create(post=Post.objects.first(), author=self.user, content='Hi')
+
+        response = self.client.get('/api/posts/export/?search=Post 1')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        expected = PostSerializer().render(Post.objects.get(title='Post 1'))
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(rows, [json.loads(json.dumps(expected))])
+
+    def test_export_memory_stays_flat(self):
+        self.create_posts(2000)
+        small_lines, small_peak = self.consume_export()
+        self.create_posts(6000)
+        large_lines, large_peak = self.consume_export()
+
+        self.assertEqual((small_lines, large_lines), (2000, 8000))
+        # Four times the rows may not need meaningfully more memory.
+        self.assertLess(large_peak, small_peak * 1.5)
+
+    def test_feed_export_only_includes_followed_authors(self):
+        self.create_posts(2)
+        Post.objects.create(author=self.follower, title='Own post', content='Body')
+        follower_profile = Profile.objects.create(user=self.follower)
+        follower_profile.following.add(Profile.objects.create(user=self.user))
+
+        self.client.force_authenticate(user=self.follower)
+        response = self.client.get('/api/feed/export/')
+        titles = [json.loads(line)['title'] for line in b''.join(response.streaming_content).splitlines()]
+
+        self.assertEqual(sorted(titles), ['Post 0', 'Post 1'])
+
+
+class PermissionTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='pass12345')
+        self.other = User.objects.create_user(username='other', password='pass12345')
+        self.post = Post.objects.create(author=self.author, title='Mine', content='Body')
+        Post.objects.create(author=self.other, title='Theirs', content='Body')
+
+    def view(self, method, user):
+        view = PostViewSet(action='partial_update', format_kwarg=None)
+        view.request = Request(getattr(RequestFactory(), method)('/'))
+        view.request.user = user
+        return view
+
+    def test_owner_check_does_not_load_user(self):
+        view = self.view('patch', self.author)
+        post = Post.objects.get(pk=self.post.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(IsOwnerOrReadOnly().has_object_permission(view.request, view, post))
+        view.request.user = self.other
+        self.assertFalse(IsOwnerOrReadOnly().has_object_permission(view.request, view, post))
+
+    def test_anonymous_user_does_not_own_unowned_objects(self):
+        view = self.view('patch', AnonymousUser())
+        unowned = Post(title='Draft', content='Body')
+        self.assertIsNone(unowned.author_id)
+        self.assertFalse(IsOwnerOrReadOnly().has_object_permission(view.request, view, unowned))
+
+    def test_write_by_non_owner_is_forbidden(self):
+        client = APIClient()
+        client.force_authenticate(self.other)
+        response = client.patch(f'/api/posts/{self.post.pk}/', {'title': 'X'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIs(
+            PostViewSet(action='list').get_permissions(),
+            PostViewSet(action='list').get_permissions(),
+        )
@@ -1,5 +1,5 @@
 from rest_framework.routers import DefaultRouter
-from .views import PostViewSet, CommentViewSet, feed_view, LikePostView, UnlikePostView
+from .views import PostViewSet, CommentViewSet, feed_view, feed_export_view, LikePostView, UnlikePostView
 from django.urls import path
 
 router = DefaultRouter()
@@ -8,6 +8,7 @@ router.register('comments', CommentViewSet, basename='comment')
 
 urlpatterns = router.urls + [
     path('feed/', feed_view, name='feed'),
+    path('feed/export/', feed_export_view, name='feed-export'),
     path('posts/<int:pk>/like/', LikePostView.as_view(), name='like-post'),
     path('posts/<int:pk>/unlike/', UnlikePostView.as_view(), name='unlike-post'),
 ]
\ No newline at end of file
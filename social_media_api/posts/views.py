@@ -1,12 +1,16 @@
 from rest_framework import viewsets, permissions, filters, generics, status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 
 from .models import Post, Comment, Like
-from .serializers import PostSerializer, CommentSerializer
-from .permissions import IsOwnerOrReadOnly
+from .serializers import PostSerializer, CommentSerializer, comment_list_serializer, export_posts
+from .permissions import SharedPermissionsMixin, IsOwnerOrReadOnly
+from .caching import POSTS_VERSION, ConditionalGetMixin
+from social_media_api.exports import ndjson_response
+from social_media_api.fast_serializers import FastListMixin
 from notifications.models import Notification
 
 
@@ -14,24 +18,42 @@ from notifications.models import Notification
 # POST VIEWSET
 # =========================
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(SharedPermissionsMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all().order_by('-created_at')
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     filter_backends = [filters.SearchFilter]
     search_fields = ['title', 'content']
 
+    # Conditional GET validators
+    last_modified_field = 'updated_at'
+    version_key = POSTS_VERSION
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # Fragments are keyed on (id, version); the rest comes from cache.
+            queryset = queryset.only('id', 'version')
+        return queryset
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every matching post as NDJSON."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return ndjson_response(export_posts(queryset), 'posts.ndjson')
+
 
 # =========================
 # COMMENT VIEWSET
 # =========================
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(SharedPermissionsMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all().order_by('-created_at')
     serializer_class = CommentSerializer
+    fast_serializer = comment_list_serializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
 
     def perform_create(self, serializer):
@@ -96,11 +118,23 @@ class UnlikePostView(generics.GenericAPIView):
 # FEED VIEW
 # =========================
 
+def get_feed_queryset(user):
+    """Posts by the users `user` follows (following lives on Profile)."""
+    following_users = get_user_model().objects.filter(profile__followers__user=user)
+    return Post.objects.filter(author__in=following_users).order_by('-created_at')
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def feed_view(request):
-    following_users = request.user.following.all()
-    posts = Post.objects.filter(author__in=following_users).order_by('-created_at')
+    posts = get_feed_queryset(request.user)
 
     serializer = PostSerializer(posts, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def feed_export_view(request):
+    """Stream the whole feed as NDJSON."""
+    return ndjson_response(export_posts(get_feed_queryset(request.user)), 'feed.ndjson')
@@ -0,0 +1,92 @@
+"""
+Read-only fast path for post, comment and notification lists.
+
+A FastReadSerializer compiles a model and a field list into a function
+that turns `.values_list()` tuples straight into the dicts the matching
+ModelSerializer would produce, skipping model instantiation and DRF's
+per-field machinery. ModelSerializers stay in charge of writes.
+
+The rows here are ids, text, usernames and timestamps, so timestamps are
+the only values that need converting.
+"""
+from django.db import models
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+def _resolve(model, lookup):
+    """Follow a `__` lookup path and return the final model field."""
+    *relations, name = lookup.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    field = model._meta.get_field(name)
+    if field.is_relation:
+        # values_list('post') yields the raw key, exactly like PrimaryKeyRelatedField
+        field = field.target_field
+    return field
+
+
+class FastReadSerializer:
+    """
+    Render rows of `model` as dicts keyed by output field name.
+
+    `fields` lists output names in order; use a `(name, lookup)` pair when
+    the value comes from elsewhere, e.g. `('author', 'author__username')`
+    for `ReadOnlyField(source='author.username')`.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.names = []
+        self.lookups = []
+        for field in fields:
+            name, lookup = field if isinstance(field, tuple) else (field, field)
+            self.names.append(name)
+            self.lookups.append(lookup)
+        self.render_row = self._compile()
+
+    def _compile(self):
+        names = tuple(self.names)
+        to_timestamp = serializers.DateTimeField().to_representation
+        timestamps = tuple(
+            index for index, lookup in enumerate(self.lookups)
+            if isinstance(_resolve(self.model, lookup), models.DateTimeField)
+        )
+
+        def render_row(row):
+            values = list(row)
+            for index in timestamps:
+                if values[index] is not None:
+                    values[index] = to_timestamp(values[index])
+            return dict(zip(names, values))
+        return render_row
+
+    def values(self, queryset):
+        """Narrow `queryset` to the tuples render_row expects."""
+        return queryset.values_list(*self.lookups)
+
+    def render(self, rows):
+        render_row = self.render_row
+        return [render_row(row) for row in rows]
+
+    def serialize(self, queryset):
+        return self.render(self.values(queryset))
+
+
+class FastListMixin:
+    """
+    Serve the `list` action from a FastReadSerializer.
+
+    Views set `fast_serializer`; pagination and filtering work unchanged
+    because they only ever see the values_list queryset.
+    """
+    fast_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.fast_serializer.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.fast_serializer.render(page))
+
+        return Response(self.fast_serializer.render(queryset))
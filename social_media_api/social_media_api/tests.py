@@ -0,0 +1,35 @@
+import datetime
+import decimal
+import json
+import uuid
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from .renderers import ORJSONParser, ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    payload = {
+        'when': datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        'day': datetime.date(2024, 5, 1),
+        'price': decimal.Decimal('9.50'),
+        'uid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'label': gettext_lazy('Title'),
+        'text': 'line\u2028separator',
+        'items': [1, 2.5, None, True],
+    }
+
+    def test_output_matches_stock_renderer(self):
+        expected = JSONRenderer().render(self.payload)
+        self.assertEqual(ORJSONRenderer().render(self.payload), expected)
+
+    def test_indented_output_falls_back(self):
+        rendered = ORJSONRenderer().render(self.payload, 'application/json; indent=4')
+        self.assertEqual(json.loads(rendered)['price'], 9.5)
+
+    def test_parser_round_trip(self):
+        body = ORJSONRenderer().render({'title': 'Hello', 'tags': ['a']})
+        self.assertEqual(ORJSONParser().parse(BytesIO(body)), {'title': 'Hello', 'tags': ['a']})